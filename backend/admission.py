@@ -0,0 +1,184 @@
+# backend/admission.py
+"""
+시뮬레이션 admission control
+
+시뮬레이션 비용은 (추적 항목 수) × (개월 수) × (경로 수) 에 거의 비례한다.
+100년짜리 플랜에 보유 항목이 수십 개인 유저 한 명이 보통 플랜 수백 개 분량을 차지할 수 있으므로
+전역/유저별로 동시 실행 수와 비용 합계에 상한을 두고, 넘치는 요청은 잠깐 대기시킨 뒤
+그래도 자리가 없으면 AdmissionRejected 를 던진다 (라우트에서 429 또는 캐시된 결과로 대체).
+
+환경 변수
+- SIM_GLOBAL_MAX_CONCURRENCY / SIM_GLOBAL_MAX_COST: 프로세스 전체 상한 (기본 4 / 20,000,000)
+- SIM_USER_MAX_CONCURRENCY / SIM_USER_MAX_COST: 유저별 상한 (기본 2 / 5,000,000)
+- SIM_ADMISSION_WAIT_SEC: 자리가 날 때까지 기다리는 최대 시간 (기본 2초)
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, Callable, Optional
+
+from backend import deadline as request_deadline
+
+SIM_GLOBAL_MAX_CONCURRENCY = int(os.getenv("SIM_GLOBAL_MAX_CONCURRENCY", "4"))
+SIM_GLOBAL_MAX_COST = int(os.getenv("SIM_GLOBAL_MAX_COST", "20000000"))
+SIM_USER_MAX_CONCURRENCY = int(os.getenv("SIM_USER_MAX_CONCURRENCY", "2"))
+SIM_USER_MAX_COST = int(os.getenv("SIM_USER_MAX_COST", "5000000"))
+SIM_ADMISSION_WAIT_SEC = float(os.getenv("SIM_ADMISSION_WAIT_SEC", "2"))
+
+# cancelled 콜백이 있을 때 대기 중 취소 여부를 확인하는 간격(초)
+_CANCEL_POLL_SEC = 0.2
+
+# 잉여 저축/잉여 투자/비상 부채 트래커는 항상 존재
+_BASE_TRACKERS = 3
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionCancelled(Exception):
+    """대기 중에 cancelled() 가 참이 됨 (작업 취소)"""
+
+
+def simulation_months(start_date: date, expected_death_year: Optional[int]) -> int:
+    if not expected_death_year:
+        return 0
+    return max(0, (expected_death_year - start_date.year) * 12 + 13 - start_date.month)
+
+
+def estimate_cost(snapshot: dict[str, Any], months: int, paths: int = 1) -> int:
+    """시뮬레이션 비용 추정치: 월 루프에서 매달 건드리는 항목 수 × 개월 수 × 경로 수"""
+    assets = snapshot.get("assets", [])
+    trackers = (
+        len(snapshot.get("savings", []))
+        + len(snapshot.get("investments", []))
+        + len(snapshot.get("debts", []))
+        + len(assets)
+        + sum(1 for a in assets if float(a.get("loan_amount") or 0.0) > 0)
+        + _BASE_TRACKERS
+    )
+    flows = len(snapshot.get("revenues", [])) + len(snapshot.get("expenses", [])) + len(snapshot.get("taxes", []))
+    return (trackers + flows) * max(1, months) * max(1, paths)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        global_max_concurrency: int = SIM_GLOBAL_MAX_CONCURRENCY,
+        global_max_cost: int = SIM_GLOBAL_MAX_COST,
+        user_max_concurrency: int = SIM_USER_MAX_CONCURRENCY,
+        user_max_cost: int = SIM_USER_MAX_COST,
+        default_wait: float = SIM_ADMISSION_WAIT_SEC,
+    ):
+        self.global_max_concurrency = global_max_concurrency
+        self.global_max_cost = global_max_cost
+        self.user_max_concurrency = user_max_concurrency
+        self.user_max_cost = user_max_cost
+        self.default_wait = default_wait
+
+        self._inflight = 0
+        self._cost = 0
+        self._user_inflight: dict[int, int] = {}
+        self._user_cost: dict[int, int] = {}
+        self._cond: Optional[asyncio.Condition] = None
+        self.admitted = 0
+        self.rejected = 0
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _fits(self, user_id: int, cost: int) -> bool:
+        user_inflight = self._user_inflight.get(user_id, 0)
+        user_cost = self._user_cost.get(user_id, 0)
+
+        if self._inflight >= self.global_max_concurrency:
+            return False
+        if user_inflight >= self.user_max_concurrency:
+            return False
+        # 상한보다 큰 요청 하나는 혼자 실행될 때만 허용 (아니면 영원히 못 들어감)
+        if self._inflight > 0 and self._cost + cost > self.global_max_cost:
+            return False
+        if user_inflight > 0 and user_cost + cost > self.user_max_cost:
+            return False
+        return True
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        user_id: int,
+        cost: int,
+        wait: Optional[float] = -1.0,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        wait: 자리가 날 때까지 기다릴 최대 시간(초). 음수면 기본값, None 이면 무한 대기(작업 큐용).
+        요청 안이면 요청의 남은 시간(backend.deadline)보다 오래 기다리지 않는다.
+        cancelled: 대기 중 주기적으로 확인해서 참이면 AdmissionCancelled (무한 대기하는 작업의 취소용)
+        """
+        if wait is not None and wait < 0:
+            wait = self.default_wait
+        limit = request_deadline.remaining()
+        if limit is not None and (wait is None or limit < wait):
+            wait = limit
+
+        cond = self._condition()
+        async with cond:
+            if not self._fits(user_id, cost):
+                deadline = None if wait is None else time.monotonic() + wait
+                while not self._fits(user_id, cost):
+                    if cancelled is not None and cancelled():
+                        raise AdmissionCancelled()
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected += 1
+                        raise AdmissionRejected("simulation capacity exhausted", retry_after=max(1.0, wait))
+                    timeout = remaining
+                    if cancelled is not None:
+                        timeout = _CANCEL_POLL_SEC if remaining is None else min(remaining, _CANCEL_POLL_SEC)
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+            self._inflight += 1
+            self._cost += cost
+            self._user_inflight[user_id] = self._user_inflight.get(user_id, 0) + 1
+            self._user_cost[user_id] = self._user_cost.get(user_id, 0) + cost
+            self.admitted += 1
+
+        try:
+            yield
+        finally:
+            async with cond:
+                self._inflight -= 1
+                self._cost -= cost
+                self._user_inflight[user_id] -= 1
+                self._user_cost[user_id] -= cost
+                if self._user_inflight[user_id] <= 0:
+                    self._user_inflight.pop(user_id, None)
+                    self._user_cost.pop(user_id, None)
+                cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "inflight": self._inflight,
+            "cost": self._cost,
+            "users": len(self._user_inflight),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "global_max_concurrency": self.global_max_concurrency,
+            "global_max_cost": self.global_max_cost,
+            "user_max_concurrency": self.user_max_concurrency,
+            "user_max_cost": self.user_max_cost,
+        }
+
+
+# 싱글톤 인스턴스
+admission = AdmissionController()
@@ -1,17 +1,22 @@
 # backend/auth.py
+import hmac
+import os
 from datetime import datetime, timedelta, timezone
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel
-import asyncpg
 
-from backend.db import get_db_connection
+from backend.db import db
+from backend.repository import Repository, PostgresRepository, get_repository
 
 SECRET_KEY = "CHANGE_ME_TO_A_LONG_RANDOM_SECRET"
 ALGORITHM = "HS256"
 EXPIRE_DAYS = 30
 
+# /api/debug/* 운영 통계 접근 토큰 (X-Debug-Token 헤더). 비어 있으면 디버그 엔드포인트는 모두 404
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+
 bearer = HTTPBearer(auto_error=False)
 
 class CurrentUser(BaseModel):
@@ -29,8 +34,9 @@ def decode_token(token: str) -> int:
     return int(sub)
 
 async def get_current_user(
+    request: Request,
     creds: HTTPAuthorizationCredentials | None = Depends(bearer),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ) -> CurrentUser:
     if not creds or creds.scheme.lower() != "bearer":
         raise HTTPException(status_code=401, detail="Missing token")
@@ -41,8 +47,17 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="Invalid token")
 
     # (선택) DB에 실제 유저가 있는지 체크하고 싶으면:
-    row = await conn.fetchrow("SELECT id FROM users WHERE id=$1", user_id)
-    if not row:
+    exists = await repo.user_exists(user_id)
+    if not exists and getattr(request.state, "db_replica", False):
+        # 방금 가입해서 replica 에 아직 복제되지 않았을 수 있다
+        async with db.acquire() as primary:
+            exists = await PostgresRepository(primary).user_exists(user_id)
+    if not exists:
         raise HTTPException(status_code=401, detail="User not found")
 
     return CurrentUser(id=user_id)
+
+async def require_debug_access(x_debug_token: str | None = Header(default=None)) -> None:
+    # 엔드포인트 존재 자체를 숨기려고 401/403 대신 404
+    if not DEBUG_TOKEN or not x_debug_token or not hmac.compare_digest(x_debug_token, DEBUG_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
@@ -0,0 +1,351 @@
+# backend/backtest.py
+"""
+과거 시계열 backtest
+
+고정된 roi / inflation 가정 대신 실제 과거 월별 수익률·인플레이션을 시작 연도를 바꿔가며(rolling)
+플랜 시뮬레이션에 그대로 재생해 본다. 모든 시작 연도(window)를 numpy 배열 한 번에 계산한다.
+
+데이터 파일 (BACKTEST_DATA_PATH, 기본 backend/data/returns.bin)
+- header: little-endian int32 2개 (start_year, start_month)
+- body:   little-endian float64 (n_months, 2) = [월 명목 수익률, 월 인플레이션] (소수, 0.01 = 1%)
+numpy.memmap 으로 읽기 때문에 여러 워커 프로세스가 같은 파일을 OS 페이지 캐시로 공유한다 (복사 없음).
+CSV(year,month,return,inflation) → 바이너리 변환:
+    python -m backend.backtest build returns.csv backend/data/returns.bin
+
+재생 규칙
+- 투자(보유 + 잉여 투자): 해당 월 과거 수익률을 인플레이션으로 나눈 실질 수익률로 성장
+- 부동산 자산: 항목 roi 를 과거 인플레이션으로 나눈 실질 상승률
+- 저축/부채/배당/현금흐름: run_simulation 과 동일
+"""
+import csv
+import os
+import sys
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.schemas.simulation import SimulationRequest
+from backend.simulation import _monthly_rate
+
+BACKTEST_DATA_PATH = os.getenv("BACKTEST_DATA_PATH", "backend/data/returns.bin")
+
+_HEADER_DTYPE = np.dtype("<i4")
+_HEADER_BYTES = 2 * _HEADER_DTYPE.itemsize
+_BODY_DTYPE = np.dtype("<f8")
+
+EMERGENCY_DEBT_INTEREST = 5.0  # run_simulation 과 동일한 비상 대출 연이율
+
+
+class BacktestDataError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ReturnSeries:
+    start_year: int
+    start_month: int
+    data: np.ndarray  # (n_months, 2) memmap
+
+    @property
+    def months(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def returns(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def inflation(self) -> np.ndarray:
+        return self.data[:, 1]
+
+
+# ==========================
+# 데이터 파일 입출력
+# ==========================
+
+def write_series(path: str, start_year: int, start_month: int, returns, inflation) -> None:
+    returns = np.asarray(returns, dtype=_BODY_DTYPE)
+    inflation = np.asarray(inflation, dtype=_BODY_DTYPE)
+    if returns.shape != inflation.shape or returns.ndim != 1:
+        raise BacktestDataError("returns / inflation must be 1-D arrays of the same length")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as fp:
+        fp.write(np.array([start_year, start_month], dtype=_HEADER_DTYPE).tobytes())
+        fp.write(np.column_stack([returns, inflation]).astype(_BODY_DTYPE).tobytes())
+
+
+@lru_cache(maxsize=4)
+def _open_series(path: str, mtime: float) -> ReturnSeries:
+    header = np.fromfile(path, dtype=_HEADER_DTYPE, count=2)
+    if header.size != 2 or not (1 <= header[1] <= 12):
+        raise BacktestDataError(f"invalid backtest header: {path}")
+
+    body = np.memmap(path, dtype=_BODY_DTYPE, mode="r", offset=_HEADER_BYTES)
+    if body.size % 2:
+        raise BacktestDataError(f"truncated backtest body: {path}")
+
+    return ReturnSeries(start_year=int(header[0]), start_month=int(header[1]), data=body.reshape(-1, 2))
+
+
+def load_series(path: str = BACKTEST_DATA_PATH) -> ReturnSeries:
+    """파일이 교체되면(mtime 변경) 새로 매핑한다"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        raise BacktestDataError(f"backtest dataset not found: {path}")
+    return _open_series(path, mtime)
+
+
+def rolling_windows(series: ReturnSeries, months: int) -> tuple[list[int], np.ndarray, np.ndarray]:
+    """
+    매년 1월에 시작하는 길이 months 짜리 구간 전부.
+    반환 배열은 (W, months) 크기의 memmap view 라서 복사가 일어나지 않는다.
+    """
+    first = (13 - series.start_month) % 12  # 첫 1월의 인덱스
+    if months <= 0 or series.months - first < months:
+        return [], np.empty((0, months)), np.empty((0, months))
+
+    returns = sliding_window_view(series.returns, months)[first::12]
+    inflation = sliding_window_view(series.inflation, months)[first::12]
+    first_year = series.start_year + (series.start_month - 1 + first) // 12
+    start_years = [first_year + i for i in range(returns.shape[0])]
+    return start_years, returns, inflation
+
+
+# ==========================
+# 벡터화 시뮬레이션
+# ==========================
+
+def _rate_vector(rows, key: str, fallback: float = 0.0) -> np.ndarray:
+    return np.array([_monthly_rate(float(r.get(key) or fallback)) for r in rows], dtype=float)
+
+
+def run_backtest(
+    snapshot: dict,
+    req: SimulationRequest,
+    start_date: date,
+    returns: np.ndarray,
+    inflation: np.ndarray,
+) -> dict[str, Any]:
+    """
+    run_simulation 의 월 루프를 window 축(W)으로 벡터화한 버전.
+    returns / inflation: (W, T) 월별 소수 수익률. T 는 시뮬레이션 개월 수와 같아야 한다.
+    반환: 연도 라벨과 window 별 연말 순자산 (W, n_years)
+    """
+    W, T = returns.shape
+    default_dividend = float(req.default_value.default_dividend or 0.0)
+    default_interest = float(req.default_value.default_interest or 0.0)
+    end_of_life = date(req.expected_death_year, 12, 31)
+
+    # --- 저축 ---
+    savings = snapshot.get("savings", [])
+    s_principal = np.tile(np.array([float(r["amount"] or 0.0) for r in savings], dtype=float), (W, 1))
+    s_interest = np.zeros_like(s_principal)
+    s_rate = np.array([_monthly_rate(float(r.get("interest_rate") or default_interest)) for r in savings], dtype=float)
+    s_simple = np.array([r.get("compound", "COMPOUND") == "SIMPLE" for r in savings], dtype=bool)
+    s_deposit = np.array([max(0.0, float(r.get("deposit") or 0.0)) for r in savings], dtype=float)
+    s_maturity = [r.get("maturity_date") for r in savings]
+
+    # --- 투자 (성장률은 과거 시계열, 배당률만 항목 값) ---
+    investments = snapshot.get("investments", [])
+    i_principal = np.tile(np.array([float(r["amount"] or 0.0) for r in investments], dtype=float), (W, 1))
+    i_interest = np.zeros_like(i_principal)
+    i_dividend = _rate_vector(investments, "dividend", default_dividend)
+    i_deposit = np.array([max(0.0, float(r.get("deposit") or 0.0)) for r in investments], dtype=float)
+    i_maturity = [r.get("maturity_date") for r in investments]
+
+    # --- 부채: 고정 부채 + 자산 담보 대출 + 비상 부채 (run_simulation 의 all_debt_trackers 순서) ---
+    assets = snapshot.get("assets", [])
+    debt_rows = [(float(r["loan_amount"] or 0.0), float(r.get("interest_rate") or 0.0), float(r.get("repay_amount") or 0.0))
+                 for r in snapshot.get("debts", [])]
+    debt_rows += [(float(r["loan_amount"] or 0.0), float(r.get("interest_rate") or 0.0), float(r.get("repay_amount") or 0.0))
+                  for r in assets if float(r.get("loan_amount") or 0.0) > 0]
+    debt_rows.append((0.0, EMERGENCY_DEBT_INTEREST, 0.0))
+    d_principal = np.tile([d[0] for d in debt_rows], (W, 1))
+    d_rate = np.array([_monthly_rate(d[1]) for d in debt_rows])
+    d_repay = np.array([d[2] for d in debt_rows])
+    emergency = len(debt_rows) - 1
+    # 추가 상환은 금리 높은 순 (정렬 안정성까지 run_simulation 과 동일)
+    paydown_order = sorted(range(len(debt_rows)), key=lambda k: d_rate[k], reverse=True)
+
+    # --- 부동산 자산 ---
+    a_principal = np.tile(np.array([float(r["amount"] or 0.0) for r in assets], dtype=float), (W, 1))
+    a_interest = np.zeros_like(a_principal)
+    a_nominal = _rate_vector(assets, "roi")
+    a_dividend = _rate_vector(assets, "dividend")
+
+    # --- 잉여 저축 / 잉여 투자 ---
+    xs_principal, xs_interest = np.zeros(W), np.zeros(W)
+    xs_rate = _monthly_rate(default_interest)
+    xi_principal, xi_interest = np.zeros(W), np.zeros(W)
+    xi_dividend = _monthly_rate(default_dividend)
+
+    # --- 수입/지출 전처리 (window 와 무관한 스칼라). 세금은 run_simulation 에서도 현금흐름에 반영되지 않음 ---
+    def monthly_amount(r) -> float:
+        amt = float(r.get("amount") or 0.0)
+        freq = r.get("frequency", "MONTHLY")
+        if freq == "YEARLY": return amt / 12.0
+        if freq == "WEEKLY": return amt * (52 / 12)
+        if freq == "DAILY": return amt * 30
+        return amt
+
+    revenues = [(monthly_amount(r), r.get("start_date") or start_date, r.get("end_date") or end_of_life, r.get("category"))
+                for r in snapshot.get("revenues", [])]
+    expenses = [(monthly_amount(e), e.get("start_date") or start_date, e.get("end_date") or end_of_life)
+                for e in snapshot.get("expenses", [])]
+
+    # roi 가정은 과거 시계열이 대체하므로 사용하지 않는다
+    allocations = req.priority.allocations if req.priority else []
+
+    labels: list[str] = []
+    year_end_net_worth: list[np.ndarray] = []
+    current_date = start_date
+
+    for t in range(T):
+        real_invest = (1.0 + returns[:, t]) / (1.0 + inflation[:, t]) - 1.0
+        real_asset = (1.0 + a_nominal)[None, :] / (1.0 + inflation[:, t])[:, None] - 1.0
+
+        # 1. 만기 처리
+        for k, m in enumerate(s_maturity):
+            if m and current_date >= m:
+                xs_principal += s_principal[:, k] + s_interest[:, k]
+                s_principal[:, k] = 0.0
+                s_interest[:, k] = 0.0
+                s_deposit[k] = 0.0
+        for k, m in enumerate(i_maturity):
+            if m and current_date >= m:
+                xs_principal += i_principal[:, k] + i_interest[:, k]
+                i_principal[:, k] = 0.0
+                i_interest[:, k] = 0.0
+                i_deposit[k] = 0.0
+
+        # 2. 수입/지출 (run_simulation 과 동일하게 INCOME 카테고리는 제외)
+        income = sum(amt for amt, s, e, cat in revenues if s <= current_date <= e and cat != "INCOME")
+        spend = float(req.extra_monthly_spend or 0.0) + sum(amt for amt, s, e in expenses if s <= current_date <= e)
+
+        # 3. 배당
+        dividend = ((i_principal + i_interest) @ i_dividend
+                    + (a_principal + a_interest) @ a_dividend
+                    + (xi_principal + xi_interest) * xi_dividend)
+
+        # 4. 현금흐름 & 저축 불입 (음수 불입액은 run_simulation 처럼 무시: 위에서 0으로 클램프)
+        cash = income - spend + dividend
+        s_principal += s_deposit
+        i_principal += i_deposit
+        cash = cash - s_deposit.sum() - i_deposit.sum()
+
+        # 5. 필수 부채 상환
+        repay = np.where(d_principal > 0, np.minimum(d_principal, d_repay), 0.0)
+        d_principal -= repay
+        cash = cash - repay.sum(axis=1)
+
+        # 6. 잉여금 배분 또는 비상 부채
+        surplus = cash > 0
+        payback = np.where(surplus & (d_principal[:, emergency] > 0), np.minimum(d_principal[:, emergency], cash), 0.0)
+        d_principal[:, emergency] -= payback
+        cash = cash - payback
+        push_base = np.where(cash > 0, cash, 0.0)
+
+        for alloc in allocations:
+            amount = push_base * alloc.weight
+            if alloc.type == "SAVINGS":
+                xs_principal += amount
+            elif alloc.type == "INVEST":
+                xi_principal += amount
+            elif alloc.type == "DEBT":
+                budget = amount.copy()
+                for k in paydown_order:
+                    pay = np.where(d_principal[:, k] > 0, np.minimum(d_principal[:, k], budget), 0.0)
+                    d_principal[:, k] -= pay
+                    budget -= pay
+                xs_principal += np.where(budget > 0, budget, 0.0)
+
+        d_principal[:, emergency] += np.where(surplus, 0.0, -cash)
+
+        # 7. 성장
+        s_base = np.where(s_simple, s_principal, s_principal + s_interest)
+        s_interest += s_base * s_rate
+        i_interest += (i_principal + i_interest) * real_invest[:, None]
+        d_principal += d_principal * d_rate
+        a_interest += (a_principal + a_interest) * real_asset
+        xs_interest += (xs_principal + xs_interest) * xs_rate
+        xi_interest += (xi_principal + xi_interest) * real_invest
+
+        # 8. 연말 순자산 기록
+        next_date = current_date + relativedelta(months=1)
+        if next_date.year != current_date.year or t == T - 1:
+            net_worth = ((s_principal + s_interest).sum(axis=1) + xs_principal + xs_interest
+                         + (i_principal + i_interest).sum(axis=1) + xi_principal + xi_interest
+                         + (a_principal + a_interest).sum(axis=1)
+                         - d_principal.sum(axis=1))
+            labels.append(str(current_date.year))
+            year_end_net_worth.append(net_worth)
+        current_date = next_date
+
+    return {
+        "labels": labels,
+        "net_worth": np.stack(year_end_net_worth, axis=1) if year_end_net_worth else np.zeros((W, 0)),
+    }
+
+
+def summarize_backtest(start_years: list[int], result: dict[str, Any]) -> dict[str, Any]:
+    """최종 순자산 기준 최악/중앙/최고 window 요약"""
+    net_worth = result["net_worth"]
+    final = net_worth[:, -1]
+    order = np.argsort(final, kind="stable")
+
+    def window(idx: int) -> dict[str, Any]:
+        return {
+            "start_year": start_years[idx],
+            "final_net_worth": round(float(final[idx]), 2),
+            "net_worth": [round(float(v), 2) for v in net_worth[idx]],
+        }
+
+    return {
+        "windows": len(start_years),
+        "start_years": start_years,
+        "labels": result["labels"],
+        "worst": window(int(order[0])),
+        "median": window(int(order[len(order) // 2])),
+        "best": window(int(order[-1])),
+    }
+
+
+# ==========================
+# CSV → 바이너리 변환 CLI
+# ==========================
+
+def _build_from_csv(csv_path: str, out_path: str) -> None:
+    with open(csv_path, newline="") as fp:
+        rows = [r for r in csv.DictReader(fp)]
+    if not rows:
+        raise BacktestDataError("empty csv")
+
+    rows.sort(key=lambda r: (int(r["year"]), int(r["month"])))
+    start_year, start_month = int(rows[0]["year"]), int(rows[0]["month"])
+    for i, r in enumerate(rows):
+        expected = start_year * 12 + start_month - 1 + i
+        if int(r["year"]) * 12 + int(r["month"]) - 1 != expected:
+            raise BacktestDataError(f"missing month before {r['year']}-{r['month']}")
+
+    write_series(
+        out_path,
+        start_year,
+        start_month,
+        [float(r["return"]) for r in rows],
+        [float(r["inflation"]) for r in rows],
+    )
+    print(f"wrote {len(rows)} months ({start_year}-{start_month:02d}~) to {out_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("usage: python -m backend.backtest build <input.csv> <output.bin>")
+        sys.exit(2)
+    _build_from_csv(sys.argv[2], sys.argv[3])
@@ -0,0 +1,313 @@
+# backend/bench.py
+"""
+API 벤치마크 (DB 없이)
+
+인메모리 Repository (backend.memory_repository) 로 앱 전체를 프로세스 안에서 돌려서
+라우팅 / 인증 / 검증 / 시뮬레이션 / 직렬화에 드는 파이썬 쪽 비용만 잰다. DB 시간은 /api/debug/queries 에서 따로 본다.
+
+    python -m backend.bench
+    python -m backend.bench --users 200 --holdings 30 --requests 5000 --concurrency 8 --json
+
+- 데이터와 요청 순서는 --seed 로 정해진다 (고정 시계, random.Random). 같은 인자면 같은 요청을 같은 순서로 보낸다.
+- 요청은 ASGI 앱을 직접 호출한다 (소켓 / HTTP 클라이언트 비용 없음). lifespan 은 돌리지 않는다.
+- 플랜 상세는 시간을 재기 전에 projection 캐시 상태를 맞춘다: "(cold)" 는 비워서 시뮬레이션까지,
+  "(cached)" 는 (필요하면 재지 않는 요청을 한 번 보내) 채워 두고 캐시 적중 경로만 잰다.
+- 결과: 시나리오별 요청 수, 에러 수, 평균 / p50 / p95 / p99 (ms), 전체 처리량 (req/s).
+  --json 이면 CI 에서 비교하기 쉽게 JSON 한 덩어리로.
+- 저장소는 dependency_overrides 로 끼우는데, 오버라이드가 있으면 FastAPI 가 요청마다 의존성 트리를 다시 분석한다
+  (요청당 ~1ms, 쿼리 파라미터가 많은 목록 라우트일수록 큼). 실제 서버보다 절대값이 크게 나오므로 시나리오끼리 / 실행끼리 차이로 본다.
+- --compare-json: 같은 시드로 두 번 돌린다 — 기본 경로 (FAST_JSON=0: response_model 검증 + jsonable_encoder)
+  와 빠른 경로 (backend.responses). 요청과 데이터가 같으므로 차이가 응답 직렬화 비용이다.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional
+
+from backend import responses
+from backend.auth import create_token
+from backend.cache import projection_cache
+from backend.main import app
+from backend.memory_repository import MemoryStore, MemoryRepository, use_repository
+from backend.projection import month_key
+from backend.routes.plans import LIFESTYLE_RULES, lifestyle_to_priority
+from backend.series_codec import SERIES_MEDIA_TYPE
+
+BENCH_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class Scenario(NamedTuple):
+    name: str
+    weight: int
+    path: Callable[[int, list[int]], str]  # (유저 id, 유저의 플랜 id) → 경로
+    plan: bool = False                     # 플랜 상세: 잴 때 projection 캐시 상태를 맞춘다
+    cold: bool = False                     # True 면 캐시를 비우고 (시뮬레이션 포함), False 면 채워 두고 잰다
+    accept: Optional[str] = None           # Accept 헤더 (없으면 보내지 않음 → JSON)
+
+
+SCENARIOS = (
+    Scenario("savings list", 10, lambda u, p: "/api/savings/"),
+    Scenario("investments list", 10, lambda u, p: "/api/investments/"),
+    Scenario("assets list", 6, lambda u, p: "/api/assets/"),
+    Scenario("debts list", 6, lambda u, p: "/api/debts/"),
+    Scenario("savings page (fields)", 6, lambda u, p: "/api/savings/?limit=20&fields=id,category,amount"),
+    Scenario("financial summary", 10, lambda u, p: "/api/users/me/summary"),
+    Scenario("my snapshot", 6, lambda u, p: "/api/me/snapshot"),
+    Scenario("plan expenses", 4, lambda u, p: f"/api/plans/{p[0]}/expenses"),
+    Scenario("plan titles", 4, lambda u, p: "/api/plans/titles"),
+    Scenario("plan detail (cached)", 10, lambda u, p: f"/api/plans/{p[0]}", plan=True),
+    Scenario("plan detail (binary)", 4, lambda u, p: f"/api/plans/{p[0]}", plan=True, accept=SERIES_MEDIA_TYPE),
+    Scenario("plan detail (cold)", 2, lambda u, p: f"/api/plans/{p[0]}", plan=True, cold=True),
+)
+
+
+def stepping_clock(start: datetime = BENCH_EPOCH, step: timedelta = timedelta(milliseconds=1)) -> Callable[[], datetime]:
+    """부를 때마다 step 씩 가는 시계 (같은 시드면 같은 created_at)"""
+    now = [start]
+
+    def clock() -> datetime:
+        now[0] += step
+        return now[0]
+
+    return clock
+
+
+def seed_store(rng: random.Random, users: int, holdings: int, plans: int) -> tuple[MemoryStore, dict[int, list[int]]]:
+    """유저마다 보유 항목(종류별 holdings 개 안팎)과 플랜(수입/지출/세금 포함)을 만든다. (store, 유저 id → 플랜 id 목록)"""
+    store = MemoryStore(clock=stepping_clock())
+    lifestyles = list(LIFESTYLE_RULES)
+    owned: dict[int, list[int]] = {}
+
+    def count() -> int:
+        return max(1, int(rng.gauss(holdings, holdings / 4)))
+
+    for _ in range(users):
+        user_id = store.add_user()
+        for _ in range(count()):
+            store.insert(
+                "savings", user_id=user_id,
+                category=rng.choice(("DEPOSIT", "INSTALLMENT", "CASH", "SUBSCRIPTION")),
+                amount=rng.randrange(100_000, 50_000_000), interest_rate=round(rng.uniform(1, 5), 2),
+                deposit=rng.choice((0, 100_000, 500_000)), deposit_frequency=rng.choice((None, "MONTHLY")),
+                maturity_date=rng.choice((None, date(2030 + rng.randrange(10), rng.randrange(1, 13), 1))),
+            )
+        for _ in range(count()):
+            store.insert(
+                "investments", user_id=user_id,
+                category=rng.choice(("STOCK", "BOND", "ETF", "FUND", "CRYPTO")),
+                amount=rng.randrange(100_000, 100_000_000), roi=round(rng.uniform(-2, 12), 2),
+                dividend=round(rng.uniform(0, 4), 2), deposit=rng.choice((0, 300_000)), deposit_frequency="MONTHLY",
+            )
+        for _ in range(max(1, count() // 3)):
+            amount = rng.randrange(10_000_000, 1_000_000_000)
+            store.insert(
+                "assets", user_id=user_id, category=rng.choice(("HOUSE", "JEWELRY", "REAL_ESTATE")),
+                amount=amount, loan_amount=amount // 2, interest_rate=4, repay_amount=amount // 200, roi=2,
+            )
+        for _ in range(max(1, count() // 3)):
+            loan = rng.randrange(1_000_000, 100_000_000)
+            store.insert(
+                "debts", user_id=user_id,
+                category=rng.choice(("STUDENT_LOAN", "CREDIT_LOAN", "LIVING_EXPENSE_LOAN", "MORTGAGE")),
+                loan_amount=loan, repay_amount=loan // 60, interest_rate=round(rng.uniform(2, 9), 2),
+            )
+
+        owned[user_id] = []
+        for n in range(plans):
+            plan_id = store.add_plan(
+                user_id, f"Plan {n + 1}",
+                priority=lifestyle_to_priority([rng.choice(lifestyles)]),
+                roi=rng.choice((4, 6, 8)), dividend=1, inflation=2, interest_rate=3,
+                retirement_year=rng.randrange(2045, 2060), expected_death_year=rng.randrange(2065, 2090),
+            )
+            owned[user_id].append(plan_id)
+            store.insert("revenues", plan_id=plan_id, category="INCOME", amount=rng.randrange(2_000_000, 9_000_000), frequency="MONTHLY")
+            for _ in range(rng.randrange(1, 4)):
+                store.insert("expenses", plan_id=plan_id, category="EXPENSE", amount=rng.randrange(300_000, 3_000_000), frequency="MONTHLY")
+            store.insert("taxes", plan_id=plan_id, category="INCOME_TAX", rate=rng.choice((6, 15, 24)))
+    return store, owned
+
+
+async def call(asgi_app, method: str, path: str, headers: list[tuple[bytes, bytes]]) -> tuple[int, bytes]:
+    """ASGI 앱 직접 호출 (요청 본문 없음) → (상태 코드, 응답 본문)"""
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": raw_path, "raw_path": raw_path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status = 0
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    try:
+        await asgi_app(scope, receive, send)
+    except Exception:
+        # 처리 안 된 예외: 500 응답을 보낸 뒤 서버로 다시 올라온다
+        status = 500
+    return status, b"".join(body)
+
+
+def _summary(name: str, times: list[float], errors: int) -> dict[str, Any]:
+    times = sorted(times)
+
+    def pct(p: float) -> float:
+        return round(times[min(len(times) - 1, int(p * len(times)))] * 1000, 3) if times else 0.0
+
+    return {
+        "scenario": name,
+        "requests": len(times),
+        "errors": errors,
+        "mean_ms": round(sum(times) / len(times) * 1000, 3) if times else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def run_bench(
+    users: int = 50,
+    holdings: int = 10,
+    plans: int = 2,
+    requests: int = 2000,
+    concurrency: int = 1,
+    seed: int = 0,
+    warmup: int = 100,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    store, owned = seed_store(rng, users, holdings, plans)
+    use_repository(app, MemoryRepository(store))
+
+    user_ids = sorted(owned)
+    tokens = {u: [(b"authorization", f"Bearer {create_token(u)}".encode())] for u in user_ids}
+    weights = [s.weight for s in SCENARIOS]
+    plan = [(rng.choices(SCENARIOS, weights)[0], rng.choice(user_ids)) for _ in range(warmup + requests)]
+
+    times: dict[str, list[float]] = {s.name: [] for s in SCENARIOS}
+    errors: dict[str, int] = {s.name: 0 for s in SCENARIOS}
+    queue = iter(enumerate(plan))
+
+    async def worker() -> None:
+        for i, (scenario, user_id) in queue:
+            path = scenario.path(user_id, owned[user_id])
+            headers = tokens[user_id]
+            if scenario.accept:
+                headers = [*headers, (b"accept", scenario.accept.encode())]
+            if scenario.plan:
+                plan_id = owned[user_id][0]
+                if scenario.cold:
+                    projection_cache.invalidate_plan(plan_id)
+                elif projection_cache.get(user_id, plan_id, month_key(date.today())) is None:
+                    await call(app, "GET", path, headers)
+            started = time.perf_counter()
+            status, _ = await call(app, "GET", path, headers)
+            elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            times[scenario.name].append(elapsed)
+            if status != 200:
+                errors[scenario.name] += 1
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        wall = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.clear()
+
+    return {
+        "config": {
+            "users": users, "holdings": holdings, "plans": plans, "requests": requests,
+            "concurrency": concurrency, "seed": seed, "warmup": warmup,
+        },
+        # 워밍업 포함 전체 시간 기준
+        "throughput_rps": round((warmup + requests) / wall, 1) if wall else 0.0,
+        "scenarios": [_summary(s.name, times[s.name], errors[s.name]) for s in SCENARIOS],
+    }
+
+
+def _print_table(result: dict[str, Any]) -> None:
+    print(", ".join(f"{k}={v}" for k, v in result["config"].items()))
+    print(f"{'scenario':<24}{'n':>7}{'err':>5}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for s in result["scenarios"]:
+        print(
+            f"{s['scenario']:<24}{s['requests']:>7}{s['errors']:>5}"
+            f"{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}"
+        )
+    print(f"throughput: {result['throughput_rps']} req/s")
+
+
+def _print_comparison(default: dict[str, Any], fast: dict[str, Any]) -> None:
+    print(", ".join(f"{k}={v}" for k, v in default["config"].items()))
+    print(f"{'scenario':<24}{'default':>10}{'fast':>10}{'saved':>10}{'speedup':>9}  (mean ms)")
+    for d, f in zip(default["scenarios"], fast["scenarios"]):
+        speedup = d["mean_ms"] / f["mean_ms"] if f["mean_ms"] else 0.0
+        print(
+            f"{d['scenario']:<24}{d['mean_ms']:>10.3f}{f['mean_ms']:>10.3f}"
+            f"{d['mean_ms'] - f['mean_ms']:>10.3f}{speedup:>8.2f}x"
+        )
+    print(f"throughput: {default['throughput_rps']} → {fast['throughput_rps']} req/s")
+
+
+async def compare_json(**kwargs: Any) -> dict[str, Any]:
+    """같은 인자로 기본 JSON 경로와 빠른 경로를 차례로 잰다"""
+    saved = responses.FAST_JSON
+    try:
+        results = {}
+        for name, enabled in (("default", False), ("fast", True)):
+            responses.FAST_JSON = enabled
+            projection_cache.clear()
+            results[name] = await run_bench(**kwargs)
+        return results
+    finally:
+        responses.FAST_JSON = saved
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.bench", description="인메모리 저장소로 API 를 돌려 파이썬 쪽 비용을 잰다")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--holdings", type=int, default=10, help="유저당 저축/투자 항목 수 (자산/부채는 1/3)")
+    parser.add_argument("--plans", type=int, default=2, help="유저당 플랜 수")
+    parser.add_argument("--requests", type=int, default=2000, help="잴 요청 수 (워밍업 제외)")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 요청을 보내는 태스크 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    parser.add_argument("--compare-json", action="store_true", help="기본 JSON 경로와 빠른 경로 (FAST_JSON) 비교")
+    args = parser.parse_args(argv)
+
+    kwargs = dict(
+        users=max(1, args.users),
+        holdings=max(1, args.holdings),
+        plans=max(1, args.plans),
+        requests=max(1, args.requests),
+        concurrency=args.concurrency,
+        seed=args.seed,
+        warmup=max(0, args.warmup),
+    )
+    result = asyncio.run(compare_json(**kwargs) if args.compare_json else run_bench(**kwargs))
+    if args.json:
+        json.dump(result, sys.stdout, indent=1)
+        print()
+    elif args.compare_json:
+        _print_comparison(result["default"], result["fast"])
+    else:
+        _print_table(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# backend/cache.py
+"""
+프로세스 내 캐시
+
+- ProjectionCache: (user_id, plan_id) 별 플랜 projection. 시뮬레이션 시작 월을 같이 저장해서
+  달이 바뀌면 자동으로 stale 취급한다 (월 전환 시 재계산은 backend.scheduler 담당).
+- SnapshotCache: 유저별 재정 상태 스냅샷 (저축/투자/자산/부채). 유저마다 버전을 두고
+  쓰기가 커밋되면 버전을 올려서 이전 스냅샷을 버린다.
+- 두 캐시 모두 put() 에 tag (어떤 DB 버전으로 만든 값인지) 를 붙일 수 있다. get() 에 tag 를 주면 태그가 같은
+  엔트리만 쓴다 — 다른 워커의 무효화 알림이 도착하기 전이라도 DB 버전이 바뀌었으면 옛 값을 쓰지 않는다 (조건부 GET 의 ETag 가
+  실제 본문과 어긋나지 않게).
+- 쓰기 라우트는 커밋 후 invalidate_user / invalidate_plan 을 호출한다. 이 프로세스의 캐시를 비우고,
+  add_publisher() 로 등록된 훅(backend.invalidation 의 LISTEN/NOTIFY 버스)으로 다른 워커에도 알린다.
+  다른 워커에서 온 알림은 evict_user / evict_plan 으로 이 프로세스 캐시만 비운다.
+- 무효화 횟수 (epoch / version) 는 유저 / 플랜마다 남으므로 CACHE_EPOCH_MAX 개를 넘으면 비운다.
+  이때 generation 을 올려서, 비우기 전에 받아 둔 ticket / version 으로는 put() 이 되지 않게 한다 (0 으로 돌아간 카운터와 우연히 같아지는 것 방지).
+
+환경 변수: PROJECTION_CACHE_MAX, SNAPSHOT_CACHE_MAX (엔트리 수, 기본 10000), CACHE_EPOCH_MAX (기본 100000)
+"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+PROJECTION_CACHE_MAX = int(os.getenv("PROJECTION_CACHE_MAX", "10000"))
+SNAPSHOT_CACHE_MAX = int(os.getenv("SNAPSHOT_CACHE_MAX", "10000"))
+CACHE_EPOCH_MAX = int(os.getenv("CACHE_EPOCH_MAX", "100000"))
+
+
+@dataclass
+class ProjectionEntry:
+    user_id: int
+    plan_id: int
+    month: tuple[int, int]
+    data: dict[str, Any]
+    tag: Any = None
+    computed_at: float = field(default_factory=time.time)
+
+
+class ProjectionCache:
+    """
+    LRU 크기 제한이 있는 projection 캐시.
+
+    계산 도중 쓰기가 끼어들면 오래된 결과가 다시 저장될 수 있으므로
+    계산 시작 전에 ticket() 을 받아두고 put() 에 넘긴다. 그 사이 무효화가 있었으면 저장하지 않는다.
+    """
+
+    def __init__(self, max_entries: int = PROJECTION_CACHE_MAX, max_epochs: int = CACHE_EPOCH_MAX):
+        self.max_entries = max_entries
+        self.max_epochs = max_epochs
+        self._entries: "OrderedDict[tuple[int, int], ProjectionEntry]" = OrderedDict()
+        self._generation = 0
+        self._user_epoch: dict[int, int] = {}
+        self._plan_epoch: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ticket(self, user_id: int, plan_id: int) -> tuple[int, int, int]:
+        return (self._generation, self._user_epoch.get(user_id, 0), self._plan_epoch.get(plan_id, 0))
+
+    def get(self, user_id: int, plan_id: int, month: tuple[int, int], tag: Any = None) -> Optional[dict[str, Any]]:
+        entry = self._entries.get((user_id, plan_id))
+        if entry is None or entry.month != month:
+            return None
+        if tag is not None and entry.tag != tag:
+            return None
+        self._entries.move_to_end((user_id, plan_id))
+        return entry.data
+
+    def get_latest(self, user_id: int, plan_id: int) -> Optional[dict[str, Any]]:
+        """달이 바뀌어 stale 이 된 엔트리라도 반환 (과부하 시 대체 응답용)"""
+        entry = self._entries.get((user_id, plan_id))
+        return entry.data if entry is not None else None
+
+    def get_previous(
+        self, user_id: int, plan_id: int, month: tuple[int, int], tag: Any = None
+    ) -> Optional[ProjectionEntry]:
+        """month 이전 기준으로 계산된 엔트리 (월 전환 갱신 대기 중 대체 응답용). tag 를 주면 같은 입력 버전만"""
+        entry = self._entries.get((user_id, plan_id))
+        if entry is None or entry.month >= month:
+            return None
+        if tag is not None and entry.tag != tag:
+            return None
+        return entry
+
+    def put(
+        self,
+        user_id: int,
+        plan_id: int,
+        month: tuple[int, int],
+        data: dict[str, Any],
+        ticket: Optional[tuple[int, int, int]] = None,
+        tag: Any = None,
+    ) -> bool:
+        if ticket is not None and ticket != self.ticket(user_id, plan_id):
+            return False
+
+        key = (user_id, plan_id)
+        self._entries[key] = ProjectionEntry(user_id=user_id, plan_id=plan_id, month=month, data=data, tag=tag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def stale_keys(self, month: tuple[int, int]) -> list[tuple[int, int]]:
+        """month 이전 기준으로 계산된 엔트리 목록 (월 전환 시 재계산 대상)"""
+        return [k for k, e in self._entries.items() if e.month != month]
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._sweep_epochs()
+        self._user_epoch[user_id] = self._user_epoch.get(user_id, 0) + 1
+        for key in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[key]
+
+    def invalidate_plan(self, plan_id: int) -> None:
+        self._sweep_epochs()
+        self._plan_epoch[plan_id] = self._plan_epoch.get(plan_id, 0) + 1
+        for key in [k for k in self._entries if k[1] == plan_id]:
+            del self._entries[key]
+
+    def _sweep_epochs(self) -> None:
+        """epoch 기록이 max_epochs 를 넘으면 비운다. 엔트리는 그대로, 진행 중인 계산의 ticket 만 무효"""
+        if len(self._user_epoch) + len(self._plan_epoch) < self.max_epochs:
+            return
+        self._generation += 1
+        self._user_epoch.clear()
+        self._plan_epoch.clear()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+class SnapshotCache:
+    """
+    LRU 크기 제한이 있는 유저 스냅샷 캐시.
+
+    DB 에서 읽기 전에 version() 을 받아두고 put() 에 넘긴다. 그 사이 쓰기가 커밋돼 버전이 올라갔으면
+    저장하지 않는다. 반환되는 스냅샷은 여러 요청이 공유하므로 읽기 전용으로 다뤄야 한다.
+    """
+
+    def __init__(self, max_entries: int = SNAPSHOT_CACHE_MAX, max_epochs: int = CACHE_EPOCH_MAX):
+        self.max_entries = max_entries
+        self.max_epochs = max_epochs
+        self._entries: "OrderedDict[int, tuple[tuple[int, int], dict[str, Any], Any]]" = OrderedDict()
+        self._generation = 0
+        self._version: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def version(self, user_id: int) -> tuple[int, int]:
+        return (self._generation, self._version.get(user_id, 0))
+
+    def get(self, user_id: int, tag: Any = None) -> Optional[dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != self.version(user_id) or (tag is not None and entry[2] != tag):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    def put(self, user_id: int, version: tuple[int, int], data: dict[str, Any], tag: Any = None) -> bool:
+        if version != self.version(user_id):
+            return False
+        self._entries[user_id] = (version, data, tag)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+        if len(self._version) >= self.max_epochs:
+            # 남은 엔트리는 최신이므로 새 generation 의 0 버전으로 옮긴다 (진행 중인 put 만 무효)
+            self._generation += 1
+            self._version.clear()
+            for key, (_, data, tag) in self._entries.items():
+                self._entries[key] = (self.version(key), data, tag)
+        self._version[user_id] = self._version.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 싱글톤 인스턴스
+projection_cache = ProjectionCache()
+snapshot_cache = SnapshotCache()
+
+
+# 무효화를 다른 워커로 전파하는 훅 (kind: "user" / "plan", key: id)
+Publisher = Callable[[str, int], None]
+_publishers: list[Publisher] = []
+
+
+def add_publisher(publisher: Publisher) -> None:
+    _publishers.append(publisher)
+
+
+def evict_user(user_id: int) -> None:
+    """이 프로세스에서만: 유저 스냅샷과 해당 유저의 모든 플랜 projection 제거"""
+    snapshot_cache.invalidate_user(user_id)
+    projection_cache.invalidate_user(user_id)
+
+
+def evict_plan(plan_id: int) -> None:
+    """이 프로세스에서만: 플랜 projection 제거"""
+    projection_cache.invalidate_plan(plan_id)
+
+
+def evict_all() -> None:
+    """이 프로세스에서만: 전체 비우기 (놓친 알림이 있을 수 있을 때)"""
+    snapshot_cache.clear()
+    projection_cache.clear()
+
+
+def invalidate_user(user_id: int) -> None:
+    """유저 자산(저축/투자/자산/부채)이 바뀌었을 때: 유저 스냅샷과 해당 유저의 모든 플랜 projection 무효화"""
+    evict_user(user_id)
+    for publish in _publishers:
+        publish("user", user_id)
+
+
+def invalidate_plan(plan_id: int) -> None:
+    """플랜 또는 하위 항목(수입/지출/세금)이 바뀌었을 때"""
+    evict_plan(plan_id)
+    for publish in _publishers:
+        publish("plan", plan_id)
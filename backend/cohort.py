@@ -0,0 +1,319 @@
+# backend/cohort.py
+"""
+전체 유저 코호트 시뮬레이션 (오프라인 배치)
+
+분석/용량 산정용으로 모든 유저의 모든 플랜을 한 번에 시뮬레이션해서 연도별 요약을
+컬럼형 파일(Parquet 또는 Arrow IPC)로 남긴다. 야간 배치 등에서 실행:
+
+    python -m backend.cohort --out cohort.parquet
+    python -m backend.cohort --out cohort.arrow --format arrow --workers 8 --start 2026-01-01
+
+동작
+- 읽기 전용 REPEATABLE READ 트랜잭션 하나 안에서 서버 사이드 커서로 테이블을 (user_id, ...) 순서로 스트리밍하고
+  merge-join 으로 유저 단위로 묶는다. 메모리에는 유저 한 명분 + 처리 중인 청크만 올라간다.
+- 입력 형태는 load_plan_inputs 와 같고 시뮬레이션은 simulate_plan 을 그대로 호출한다 (API 결과와 동일).
+- 시뮬레이션은 프로세스 풀에서 돌리고, 동시에 떠 있는 청크 수를 제한해서 DB 읽기가 앞서 나가지 않게 한다.
+- 결과는 --batch-rows 단위로 record batch 를 잘라 바로 파일에 쓴다.
+- 샤드가 여러 개면 (backend.shards) 샤드마다 차례로 읽는다. 스냅샷은 샤드별로 일관된다.
+- 한 플랜이 실패해도 전체를 멈추지 않고 실패 목록에 남긴다.
+
+출력 스키마 (플랜 × 연도 한 행)
+    user_id int64, plan_id int64, year int32, <SUMMARY_KEYS 중 labels 제외> float64
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from backend.projection import simulate_plan, SUMMARY_KEYS, PLAN_COLUMNS
+from backend.shards import SHARD_TARGETS, connect_shard
+from backend.snapshot import USER_ITEMS, PLAN_ITEMS
+
+METRIC_KEYS = tuple(k for k in SUMMARY_KEYS if k != "labels")
+
+SCHEMA = pa.schema(
+    [("user_id", pa.int64()), ("plan_id", pa.int64()), ("year", pa.int32())]
+    + [(k, pa.float64()) for k in METRIC_KEYS]
+)
+
+# ==========================
+# 스트리밍 쿼리
+# 컬럼은 backend.snapshot 항목 정의를 그대로 쓰고, 정렬 키는 merge-join 용 (user_id, plan_id) 뒤에
+# load_plan_inputs 와 같은 created_at DESC, id DESC
+# ==========================
+
+PLANS_SQL = f"""
+    SELECT {", ".join(PLAN_COLUMNS)}
+    FROM plans
+    ORDER BY user_id, id
+"""
+
+
+def _columns(columns: tuple[str, ...], alias: str) -> str:
+    return ", ".join(f"{alias}.{c}" for c in columns)
+
+
+USER_STREAMS = {
+    key: f"""
+        SELECT c.user_id, {_columns(columns, "c")}
+        FROM {table} c
+        ORDER BY c.user_id, c.created_at DESC, c.id DESC
+    """
+    for key, (table, columns) in USER_ITEMS.items()
+}
+
+PLAN_STREAMS = {
+    key: f"""
+        SELECT p.user_id, c.plan_id, {_columns(columns, "c")}
+        FROM {table} c JOIN plans p ON p.id = c.plan_id
+        ORDER BY p.user_id, c.plan_id, c.created_at DESC, c.id DESC
+    """
+    for key, (table, columns) in PLAN_ITEMS.items()
+}
+
+
+class _GroupedStream:
+    """
+    정렬된 커서를 키 단위로 잘라 읽는다. take() 는 오름차순 키로만 호출해야 하며,
+    요청한 키보다 작은 키의 행(플랜이 없는 유저의 자산 등)은 버린다.
+    """
+
+    def __init__(self, cursor, key_columns: tuple[str, ...]):
+        self._it = cursor.__aiter__()
+        self._key_columns = key_columns
+        self._pending: Optional[dict[str, Any]] = None
+        self._exhausted = False
+
+    def _key(self, row: dict[str, Any]) -> tuple:
+        return tuple(row[c] for c in self._key_columns)
+
+    async def take(self, key: tuple) -> list[dict[str, Any]]:
+        rows = []
+        while not self._exhausted:
+            if self._pending is None:
+                try:
+                    self._pending = dict(await self._it.__anext__())
+                except StopAsyncIteration:
+                    self._exhausted = True
+                    break
+            row_key = self._key(self._pending)
+            if row_key > key:
+                break
+            if row_key == key:
+                for c in self._key_columns:
+                    self._pending.pop(c)
+                rows.append(self._pending)
+            self._pending = None
+        return rows
+
+
+# ==========================
+# 워커 프로세스
+# ==========================
+
+def _simulate_chunk(items: list[dict[str, Any]], start_date: date) -> tuple[dict[str, list], list[tuple[int, int, str]]]:
+    """플랜 입력 묶음 → (컬럼별 리스트, 실패 목록)"""
+    columns: dict[str, list] = {name: [] for name in SCHEMA.names}
+    failures = []
+    for inputs in items:
+        plan = inputs["plan"]
+        try:
+            projection = simulate_plan(inputs, start_date)
+        except Exception as e:
+            failures.append((plan["user_id"], plan["id"], f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"))
+            continue
+
+        n = len(projection["labels"])
+        columns["user_id"].extend([plan["user_id"]] * n)
+        columns["plan_id"].extend([plan["id"]] * n)
+        columns["year"].extend(int(y) for y in projection["labels"])
+        for k in METRIC_KEYS:
+            columns[k].extend(projection[k])
+    return columns, failures
+
+
+# ==========================
+# 출력
+# ==========================
+
+class _BatchWriter:
+    """행을 batch_rows 만큼 모았다가 record batch 로 잘라서 파일에 쓴다"""
+
+    def __init__(self, path: str, fmt: str, batch_rows: int):
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._buffer: dict[str, list] = {name: [] for name in SCHEMA.names}
+        self._buffered = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, SCHEMA)
+        else:
+            self._writer = pa.ipc.new_file(path, SCHEMA)
+
+    def add(self, columns: dict[str, list]) -> None:
+        for name, values in columns.items():
+            self._buffer[name].extend(values)
+        self._buffered += len(columns["user_id"])
+        while self._buffered >= self.batch_rows:
+            self._flush(self.batch_rows)
+
+    def _flush(self, n: int) -> None:
+        if n <= 0:
+            return
+        batch = pa.record_batch([pa.array(self._buffer[name][:n], type=SCHEMA.field(name).type) for name in SCHEMA.names], schema=SCHEMA)
+        self._writer.write_batch(batch)
+        for name in SCHEMA.names:
+            del self._buffer[name][:n]
+        self._buffered -= n
+        self.rows_written += n
+
+    def close(self) -> None:
+        self._flush(self._buffered)
+        self._writer.close()
+
+
+# ==========================
+# 실행
+# ==========================
+
+async def _stream_plan_inputs(conn, prefetch: int):
+    """(user_id, plan_id) 순서로 load_plan_inputs 와 같은 형태의 입력을 하나씩 내보낸다"""
+    plans = conn.cursor(PLANS_SQL, prefetch=prefetch)
+    user_streams = {k: _GroupedStream(conn.cursor(sql, prefetch=prefetch), ("user_id",)) for k, sql in USER_STREAMS.items()}
+    plan_streams = {k: _GroupedStream(conn.cursor(sql, prefetch=prefetch), ("user_id", "plan_id")) for k, sql in PLAN_STREAMS.items()}
+
+    current_user = None
+    user_snapshot: dict[str, list] = {}
+    async for plan in plans:
+        plan = dict(plan)
+        user_id = plan["user_id"]
+        if user_id != current_user:
+            current_user = user_id
+            user_snapshot = {k: await s.take((user_id,)) for k, s in user_streams.items()}
+
+        snapshot = {k: list(v) for k, v in user_snapshot.items()}
+        for k, s in plan_streams.items():
+            snapshot[k] = await s.take((user_id, plan["id"]))
+        yield {"plan": plan, "snapshot": snapshot}
+
+
+async def run_cohort(
+    out_path: str,
+    fmt: str = "parquet",
+    start_date: Optional[date] = None,
+    workers: Optional[int] = None,
+    chunk_plans: int = 64,
+    batch_rows: int = 50_000,
+    prefetch: int = 500,
+    report_every: float = 10.0,
+) -> dict[str, Any]:
+    start_date = start_date or date.today()
+    workers = workers or os.cpu_count() or 1
+    max_inflight = workers * 2
+
+    loop = asyncio.get_running_loop()
+    writer = _BatchWriter(out_path, fmt, batch_rows)
+    stats = {"users": 0, "plans": 0, "failed": 0, "rows": 0}
+    failures: list[tuple[int, int, str]] = []
+    started = time.monotonic()
+    last_report = started
+
+    def report(final: bool = False) -> None:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        print(
+            f"{'done' if final else 'progress'}: users={stats['users']} plans={stats['plans']} "
+            f"failed={stats['failed']} rows={writer.rows_written} "
+            f"elapsed={elapsed:.1f}s plans/s={stats['plans'] / elapsed:.1f}",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def collect(done) -> None:
+        for fut in done:
+            columns, failed = fut.result()
+            writer.add(columns)
+            failures.extend(failed)
+            stats["failed"] += len(failed)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            chunk: list[dict[str, Any]] = []
+            last_user = None
+
+            async def submit(items):
+                nonlocal pending
+                pending.add(loop.run_in_executor(pool, _simulate_chunk, items, start_date))
+                # DB 스트리밍이 시뮬레이션보다 앞서 나가 메모리를 채우지 않도록 대기
+                if len(pending) >= max_inflight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    collect(done)
+
+            # 유저는 한 샤드에만 있으므로 샤드를 차례로 읽어도 유저 단위 묶음이 깨지지 않는다
+            for shard in range(len(SHARD_TARGETS)):
+                conn = await connect_shard(shard)
+                try:
+                    async with conn.transaction(isolation="repeatable_read", readonly=True):
+                        async for inputs in _stream_plan_inputs(conn, prefetch):
+                            if inputs["plan"]["user_id"] != last_user:
+                                last_user = inputs["plan"]["user_id"]
+                                stats["users"] += 1
+                            stats["plans"] += 1
+                            chunk.append(inputs)
+                            if len(chunk) >= chunk_plans:
+                                await submit(chunk)
+                                chunk = []
+                            if time.monotonic() - last_report >= report_every:
+                                last_report = time.monotonic()
+                                report()
+                finally:
+                    await conn.close()
+
+            if chunk:
+                await submit(chunk)
+            if pending:
+                done, _ = await asyncio.wait(pending)
+                collect(done)
+    finally:
+        writer.close()
+
+    stats["rows"] = writer.rows_written
+    stats["elapsed_sec"] = round(time.monotonic() - started, 3)
+    stats["plans_per_sec"] = round(stats["plans"] / max(stats["elapsed_sec"], 1e-9), 2)
+    report(final=True)
+    for user_id, plan_id, error in failures[:20]:
+        print(f"failed: user={user_id} plan={plan_id} {error}", file=sys.stderr)
+    return stats
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.cohort", description="모든 유저의 모든 플랜을 시뮬레이션해서 연도별 요약을 파일로 저장")
+    parser.add_argument("--out", required=True, help="출력 파일 경로")
+    parser.add_argument("--format", choices=("parquet", "arrow"), default="parquet")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="시뮬레이션 시작일 (기본: 오늘)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--chunk-plans", type=int, default=64, help="워커 작업 하나에 묶을 플랜 수")
+    parser.add_argument("--batch-rows", type=int, default=50_000, help="record batch 크기 (행)")
+    parser.add_argument("--prefetch", type=int, default=500, help="커서 fetch 크기")
+    args = parser.parse_args(argv)
+
+    asyncio.run(run_cohort(
+        args.out,
+        fmt=args.format,
+        start_date=args.start,
+        workers=args.workers,
+        chunk_plans=max(1, args.chunk_plans),
+        batch_rows=max(1, args.batch_rows),
+        prefetch=max(1, args.prefetch),
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# backend/conditional.py
+"""
+조건부 GET (ETag / If-None-Match, Last-Modified / If-Modified-Since)
+
+응답 본문을 만들기 전에 싸게 구할 수 있는 버전 값으로 ETag (와 Last-Modified) 를 만들고,
+클라이언트가 같은 ETag 를 If-None-Match 로 보내면 본문 없이 304 로 끝낸다.
+If-None-Match 가 없을 때만 If-Modified-Since 를 본다 (RFC 9110 13.2.2). Last-Modified 는 초 단위.
+
+- ETag 는 strong: 같은 태그면 본문이 바이트 단위로 같다. 버전 값에 응답 형식 이름을 섞어서
+  응답 모양이 바뀌면 (배포) 태그도 바뀌게 한다.
+- 응답은 유저마다 다르므로 Cache-Control: private, no-cache (저장은 하되 매번 재검증) + Vary: Authorization.
+  Accept 로 형식을 고르는 라우트 (backend.series_codec) 는 vary 에 Accept 를 더하고, ETag 에도 형식을 섞는다.
+  브라우저 fetch 는 HTTP 캐시가 If-None-Match 를 알아서 붙이고 304 면 캐시 본문을 돌려준다.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts: Any) -> str:
+    """버전 값들 → strong ETag (따옴표 포함)"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 에 etag 가 있으면 True (GET 은 weak 비교: W/ 접두사 무시, "*" 는 항상 일치)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """If-Modified-Since 이후로 바뀌지 않았으면 True (형식이 잘못된 헤더는 무시)"""
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """클라이언트가 가진 본문이 최신이면 True (→ 304)"""
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+    return last_modified is not None and not_modified_since(request, last_modified)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None, vary: Sequence[str] = ()) -> dict[str, str]:
+    headers = {
+        ETAG_HEADER: etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": ", ".join(("Authorization", *vary)),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None, vary: Sequence[str] = ()) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified, vary))
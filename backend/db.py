@@ -1,29 +1,347 @@
+import asyncio
 import asyncpg
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from fastapi import HTTPException, Request
 import logging
+from typing import Any, Awaitable, Callable, Optional
 
 load_dotenv()
 
+# .env 를 읽은 뒤에 import (REQUEST_DEADLINE_SEC, SLOW_QUERY_MS 등)
+from backend.deadline import exceeded, remaining
+from backend.tracing import query_tracer, status_rows, trace_request
+
 logger = logging.getLogger(__name__)
 
-async def get_db_connection():
-    host = os.getenv("DB_HOST")
-    port = os.getenv("DB_PORT")
-    user = os.getenv("DB_USER")
-    password = os.getenv("DB_PASS")
-    database = os.getenv("DB_NAME")
-    
-    try:
-        conn = await asyncpg.connect(
-            host=host,
-            port=int(port) if port else 5432,
-            user=user,
-            password=password,
-            database=database,
-        )
+# ==========================
+# 연결 풀 설정 (환경 변수)
+# - DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE: 풀 크기 (기본 2 / 10)
+# - DB_POOL_ACQUIRE_TIMEOUT: 연결을 빌릴 때 기다리는 최대 시간 (기본 10초, 넘으면 503)
+# - DB_POOL_MAX_INACTIVE_SEC: 유휴 연결을 닫기까지의 시간 (기본 300초)
+# - DB_STATEMENT_TIMEOUT_SEC: 풀 연결의 서버 쪽 statement_timeout (기본 60초, 0 이면 없음)
+#   요청 안의 쿼리는 그보다 먼저 요청 시한(backend.deadline)에서 취소된다
+# ==========================
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+DB_POOL_MAX_INACTIVE_SEC = float(os.getenv("DB_POOL_MAX_INACTIVE_SEC", "300"))
+DB_STATEMENT_TIMEOUT_SEC = float(os.getenv("DB_STATEMENT_TIMEOUT_SEC", "60"))
+
+InitHook = Callable[[asyncpg.Connection], Awaitable[None]]
+# 요청 → 연결을 빌릴 풀 (None 이면 primary). 샤드 라우터(backend.shards) / read 라우터(backend.replicas)
+RequestRouter = Callable[[Request], Optional["Database"]]
+
+
+def _connect_kwargs(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    database: Optional[str] = None,
+) -> dict[str, Any]:
+    """기본은 primary (DB_HOST/DB_PORT/DB_NAME). replica / 샤드는 이 값만 바꾸고 계정은 같이 쓴다"""
+    env_port = os.getenv("DB_PORT")
+    return {
+        "host": host or os.getenv("DB_HOST"),
+        "port": port or (int(env_port) if env_port else 5432),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASS"),
+        "database": database or os.getenv("DB_NAME"),
+    }
+
+
+class PoolConnection(asyncpg.Connection):
+    """
+    풀 연결 클래스
+    - 요청 시한: timeout 을 안 준 쿼리는 요청의 남은 시간(backend.deadline)을 timeout 으로 쓴다 (요청 밖이면 그대로).
+      시간이 지나면 asyncpg 가 서버에 cancel 을 보내고 DeadlineExceeded 로 바뀐다.
+    - 트레이싱: 쿼리마다 시간 / 행 수 / 에러를 query_tracer 에 남긴다 (backend.tracing).
+    인자 없는 execute (BEGIN/COMMIT/ROLLBACK, 풀 반납 시 reset) 는 시한이 지나도 막지 않고 집계하지도 않는다.
+    """
+
+    async def _run(self, method, query, args, timeout, kwargs, count: Callable[[Any], int]):
+        by_deadline = False
+        if timeout is None:
+            timeout = remaining()
+            by_deadline = timeout is not None
+            if by_deadline and timeout <= 0:
+                raise exceeded("query")
+        started = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = await method(query, *args, timeout=timeout, **kwargs)
+            return result
+        except asyncio.TimeoutError as e:
+            error = e
+            if by_deadline:
+                raise exceeded("query") from None
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            rows = 0 if error is not None else count(result)
+            query_tracer.record(query, args, time.perf_counter() - started, rows, error)
+
+    async def fetch(self, query, *args, timeout=None, **kwargs):
+        return await self._run(super().fetch, query, args, timeout, kwargs, len)
+
+    async def fetchrow(self, query, *args, timeout=None, **kwargs):
+        return await self._run(super().fetchrow, query, args, timeout, kwargs, _one)
+
+    async def fetchval(self, query, *args, timeout=None, **kwargs):
+        return await self._run(super().fetchval, query, args, timeout, kwargs, _one)
+
+    async def execute(self, query, *args, timeout=None):
+        if not args:
+            return await super().execute(query, timeout=timeout)
+        return await self._run(super().execute, query, args, timeout, {}, status_rows)
+
+    async def executemany(self, command, args, *, timeout=None):
+        args = list(args)
+        return await self._run(super().executemany, command, (args,), timeout, {}, lambda _: len(args))
+
+
+def _one(value: Any) -> int:
+    return 0 if value is None else 1
+
+
+def _log_connect_failure(
+    e: Exception,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    database: Optional[str] = None,
+) -> None:
+    kw = _connect_kwargs(host, port, database)
+    logger.error(f"Database connection failed: {e}")
+    logger.error(f"Connection details: host={kw['host']}, port={kw['port']}, user={kw['user']}, database={kw['database']}")
+
+
+class Database:
+    """
+    앱 수명주기 동안 유지되는 asyncpg 연결 풀.
+
+    main.py lifespan 에서 start()/stop() 하고, 라우트는 get_db_connection 의존성으로,
+    백그라운드 작업은 `async with db.acquire() as conn:` 으로 연결을 빌린다.
+    새 연결이 만들어질 때마다 add_init_hook() 으로 등록한 훅이 순서대로 실행된다.
+
+    샤드 / 읽기 전용 replica 풀도 같은 클래스로 만든다 (host/port/database 와 role 지정, init 훅 목록은 primary 것을 공유).
+    요청을 어느 풀로 보낼지는 set_shard_router() / set_read_router() 로 등록한 함수가 정한다
+    (backend.shards, backend.replicas). primary 는 샤드 0 이고 replica 는 샤드 0 의 것만 쓴다.
+    """
+
+    def __init__(
+        self,
+        min_size: int = DB_POOL_MIN_SIZE,
+        max_size: int = DB_POOL_MAX_SIZE,
+        acquire_timeout: float = DB_POOL_ACQUIRE_TIMEOUT,
+        max_inactive_sec: float = DB_POOL_MAX_INACTIVE_SEC,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        database: Optional[str] = None,
+        role: str = "primary",
+        init_hooks: Optional[list[InitHook]] = None,
+    ):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.acquire_timeout = acquire_timeout
+        self.max_inactive_sec = max_inactive_sec
+        self.host = host
+        self.port = port
+        self.database = database
+        self.role = role
+        self._pool: Optional[asyncpg.Pool] = None
+        self._init_hooks: list[InitHook] = [] if init_hooks is None else init_hooks
+        self._shard_router: Optional[RequestRouter] = None
+        self._read_router: Optional[RequestRouter] = None
+
+        self.connections_opened = 0
+        self.acquired = 0
+        self.acquire_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # replica 헬스 체크 결과 (primary 는 항상 True)
+        self.healthy = True
+
+    # ---------- 수명주기 ----------
+    def add_init_hook(self, hook: InitHook) -> None:
+        """새 연결마다 실행할 훅 등록 (코덱/세션 설정/statement 준비 등). start() 전에 등록해야 함"""
+        self._init_hooks.append(hook)
+
+    def set_shard_router(self, router: Optional[RequestRouter]) -> None:
+        self._shard_router = router
+
+    def set_read_router(self, router: Optional[RequestRouter]) -> None:
+        self._read_router = router
+
+    def target_for(self, request: Request) -> "Database":
+        """
+        요청이 연결을 빌릴 풀: 유저가 다른 샤드에 있으면 그 샤드,
+        샤드 0 의 GET/HEAD 는 read 라우터가 고른 replica, 그 외에는 primary(self)
+        """
+        if self._shard_router is not None:
+            shard = self._shard_router(request)
+            if shard is not None and shard is not self:
+                return shard
+        if self._read_router is None or request.method not in ("GET", "HEAD"):
+            return self
+        return self._read_router(request) or self
+
+    async def init_connection(self, conn: asyncpg.Connection) -> None:
+        self.connections_opened += 1
+        for hook in self._init_hooks:
+            await hook(conn)
+
+    async def start(self) -> None:
+        if self._pool is not None:
+            return
+        try:
+            self._pool = await asyncpg.create_pool(
+                **_connect_kwargs(self.host, self.port, self.database),
+                min_size=self.min_size,
+                max_size=self.max_size,
+                max_inactive_connection_lifetime=self.max_inactive_sec,
+                init=self.init_connection,
+                connection_class=PoolConnection,
+                server_settings=(
+                    {"statement_timeout": str(int(DB_STATEMENT_TIMEOUT_SEC * 1000))} if DB_STATEMENT_TIMEOUT_SEC > 0 else None
+                ),
+            )
+        except Exception as e:
+            _log_connect_failure(e, self.host, self.port, self.database)
+            raise
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    async def stop(self) -> None:
+        if self._pool is None:
+            return
+        pool, self._pool = self._pool, None
+        try:
+            await asyncio.wait_for(pool.close(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.warning("database pool did not close in time, terminating")
+            pool.terminate()
+
+    # ---------- 연결 대여 ----------
+    async def _acquire(self, timeout: Optional[float] = None) -> asyncpg.Connection:
+        if self._pool is None:
+            raise RuntimeError("database pool is not started")
+        if timeout is None:
+            timeout = self.acquire_timeout
+        # 요청의 남은 시간이 더 짧으면 그만큼만 기다린다
+        limit = remaining()
+        by_deadline = limit is not None and limit < timeout
+        if by_deadline:
+            timeout = limit
+        started = time.monotonic()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            if by_deadline:
+                raise exceeded("connection acquire") from None
+            raise
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
         return conn
+
+    async def _release(self, conn: asyncpg.Connection) -> None:
+        if self._pool is not None:
+            await self._pool.release(conn)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None):
+        conn = await self._acquire(timeout)
+        try:
+            yield conn
+        finally:
+            await self._release(conn)
+
+    def stats(self) -> dict[str, Any]:
+        pool = self._pool
+        size = pool.get_size() if pool else 0
+        idle = pool.get_idle_size() if pool else 0
+        return {
+            "started": pool is not None,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "connections_opened": self.connections_opened,
+            "acquired": self.acquired,
+            "acquire_timeouts": self.acquire_timeouts,
+            "wait_avg_ms": round(self.wait_total / self.acquired * 1000, 3) if self.acquired else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+async def register_type_codecs(conn: asyncpg.Connection) -> None:
+    """
+    numeric 을 Decimal 대신 float 로 바로 디코딩 (라우트/스냅샷에서 행마다 float() 변환하지 않도록).
+    enum 은 asyncpg 가 기본으로 str 로 디코딩하므로 따로 등록하지 않는다 (::text 캐스트 불필요).
+    """
+    await conn.set_type_codec("numeric", encoder=str, decoder=float, schema="pg_catalog", format="text")
+
+
+# 싱글톤 인스턴스
+db = Database()
+db.add_init_hook(register_type_codecs)
+
+
+async def get_db_connection(request: Request):
+    """
+    FastAPI 의존성: 요청 하나 동안 풀에서 연결을 빌렸다가 끝나면 반납.
+    같은 요청 안의 get_current_user 와 라우트는 같은 연결을 공유한다 (의존성 캐시).
+    연결은 db.target_for() 가 고른 풀에서 빌린다 (요청 유저의 샤드 / replica).
+    replica 에서 못 빌리면 primary 로 넘어간다 (request.state.db_replica 로 어디서 읽었는지 알 수 있다).
+    """
+    trace_request(request)
+    target = db.target_for(request)
+    conn = None
+    if target.role == "replica":
+        try:
+            conn = await target._acquire()
+        except (asyncio.TimeoutError, OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+            logger.warning(f"replica {target.host}:{target.port} unavailable, reading from primary: {e}")
+            target.healthy = False
+            target = db
+    request.state.db_replica = target.role == "replica"
+    if conn is None:
+        try:
+            conn = await target._acquire()
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Database busy", headers={"Retry-After": "1"})
+    try:
+        yield conn
+    finally:
+        await target._release(conn)
+
+
+async def connect(
+    init_hooks: bool = True,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    database: Optional[str] = None,
+) -> asyncpg.Connection:
+    """
+    풀 밖(CLI/배치/LISTEN 전용)에서 쓰는 단독 연결. 호출한 쪽에서 close() 해야 한다.
+    init_hooks=True 면 풀과 같은 init 훅(코덱, statement 준비)을 적용한다.
+    host/port/database 를 주면 그 DB (샤드) 에 붙는다.
+    """
+    try:
+        conn = await asyncpg.connect(**_connect_kwargs(host, port, database))
     except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        logger.error(f"Connection details: host={host}, port={port}, user={user}, database={database}")
+        _log_connect_failure(e, host, port, database)
         raise
+    if init_hooks:
+        for hook in db._init_hooks:
+            await hook(conn)
+    return conn
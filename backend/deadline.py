@@ -0,0 +1,100 @@
+# backend/deadline.py
+"""
+요청별 처리 시한 (deadline)
+
+요청이 시작될 때 시한을 contextvar 에 두고, 요청 안에서 기다리는 일은 전부 남은 시간까지만 기다린다.
+DB 가 잠깐 느려져도 요청이 연결을 붙잡은 채 무한정 기다리지 않으므로 풀 고갈이 다른 요청으로 번지지 않는다.
+
+- 기본 예산은 REQUEST_DEADLINE_SEC (DeadlineMiddleware). 라우트별 예산은
+  `dependencies=[Depends(budget(초))]` 로 준다 (요청 시작 시각 기준. 라우트 의존성은 연결을 빌리기 전에 풀린다).
+- 풀 연결 대기: DB_POOL_ACQUIRE_TIMEOUT 와 남은 시간 중 작은 값 (backend.db).
+- 쿼리: 풀 연결(backend.db.PoolConnection)은 timeout 을 안 준 쿼리에 남은 시간을 timeout 으로 넘긴다.
+  시간이 지나면 asyncpg 가 서버에 cancel 을 보내고 연결은 바로 풀로 돌아간다.
+  클라이언트가 사라져도 서버에서 끝나도록 풀 연결에는 statement_timeout (DB_STATEMENT_TIMEOUT_SEC) 도 건다.
+- 시뮬레이션: admission 대기는 남은 시간까지, 월 루프는 progress 콜백(check_deadline)에서 멈춘다
+  (asyncio.to_thread 는 contextvar 를 복사하므로 스레드 안에서도 같은 시한을 본다).
+- 시한을 넘기면 DeadlineExceeded → 504 (main.py 의 예외 핸들러).
+- 백그라운드 작업(스케줄러 / 잡 / 버스)은 요청 밖에서 시작되므로 시한이 없다.
+
+환경 변수
+- REQUEST_DEADLINE_SEC: 기본 요청 예산 (기본 10초, 0 이면 시한 없음)
+- SIM_REQUEST_DEADLINE_SEC: 시뮬레이션을 돌리는 라우트의 예산 (기본 30초)
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+REQUEST_DEADLINE_SEC = float(os.getenv("REQUEST_DEADLINE_SEC", "10"))
+SIM_REQUEST_DEADLINE_SEC = float(os.getenv("SIM_REQUEST_DEADLINE_SEC", "30"))
+
+# time.monotonic() 기준 시한 / 요청 시작 시각
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+_started: ContextVar[Optional[float]] = ContextVar("request_started", default=None)
+
+exceeded_count = 0
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, where: str = "request"):
+        super().__init__(f"deadline exceeded during {where}")
+        self.where = where
+
+
+def remaining() -> Optional[float]:
+    """남은 시간(초, 0 이상). 시한이 없으면 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def exceeded(where: str = "request") -> DeadlineExceeded:
+    global exceeded_count
+    exceeded_count += 1
+    return DeadlineExceeded(where)
+
+
+def check_deadline(fraction: float = 0.0) -> None:
+    """시한이 지났으면 DeadlineExceeded. simulate_plan 의 progress 콜백으로도 쓴다"""
+    if remaining() == 0.0:
+        raise exceeded("simulation")
+
+
+def budget(seconds: float):
+    """라우트 의존성: 이 라우트의 예산을 요청 시작부터 seconds 초로"""
+
+    async def set_budget() -> None:
+        started = _started.get()
+        _deadline.set((time.monotonic() if started is None else started) + seconds)
+
+    return set_budget
+
+
+class DeadlineMiddleware:
+    """요청마다 기본 시한을 건다 (순수 ASGI 미들웨어: contextvar 가 라우트까지 그대로 이어진다)"""
+
+    def __init__(self, app, seconds: float = REQUEST_DEADLINE_SEC):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        now = time.monotonic()
+        started = _started.set(now)
+        deadline = _deadline.set(now + self.seconds if self.seconds > 0 else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(deadline)
+            _started.reset(started)
+
+
+def stats() -> dict[str, float]:
+    return {
+        "request_deadline_sec": REQUEST_DEADLINE_SEC,
+        "sim_request_deadline_sec": SIM_REQUEST_DEADLINE_SEC,
+        "exceeded": exceeded_count,
+    }
@@ -0,0 +1,190 @@
+# backend/invalidation.py
+"""
+워커 간 캐시 무효화 버스 (Postgres LISTEN/NOTIFY)
+
+uvicorn 워커가 여러 개(여러 호스트)면 한 워커가 처리한 쓰기를 다른 워커의 프로세스 내 캐시
+(snapshot_cache / projection_cache)가 모른다. 워커마다 전용 연결 하나로 LISTEN 하고,
+invalidate_user / invalidate_plan 이 호출되면 같은 연결로 NOTIFY 를 보내서 다른 워커가 해당 키를 비우게 한다.
+
+- payload: "<origin>:<kind>:<id>" (kind = user / plan / all, 그 외는 구독자용). 자기가 보낸 알림은 무시한다.
+- 보낼 알림은 모아서 pg_notify 한 번에 보낸다. 연결이 끊긴 동안은 쌓아 두고 재연결 후 보낸다
+  (너무 많이 쌓이면 "all" 하나로 합친다).
+- 연결이 끊기면 지수 백오프로 재연결하고, 끊긴 동안 놓친 알림이 있을 수 있으므로 재연결 시 로컬 캐시를 전부 비운다.
+- add_subscriber() 로 등록한 훅은 다른 워커에서 온 무효화마다 (kind, id) 로 호출된다 (backend.replicas 의 primary 고정).
+
+환경 변수
+- INVALIDATION_BUS_ENABLED: 0 이면 끔 (단일 워커) (기본 1)
+- INVALIDATION_CHANNEL: NOTIFY 채널 이름 (기본 moneycoach_invalidate)
+- INVALIDATION_PING_SEC: 조용할 때 연결 확인 주기 (기본 30초)
+- INVALIDATION_BACKOFF_MAX_SEC: 재연결 백오프 상한 (기본 30초)
+"""
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Callable, Optional
+
+import asyncpg
+
+from backend.cache import add_publisher, evict_all, evict_plan, evict_user
+from backend.db import connect
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_BUS_ENABLED = os.getenv("INVALIDATION_BUS_ENABLED", "1") != "0"
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "moneycoach_invalidate")
+INVALIDATION_PING_SEC = float(os.getenv("INVALIDATION_PING_SEC", "30"))
+INVALIDATION_BACKOFF_MAX_SEC = float(os.getenv("INVALIDATION_BACKOFF_MAX_SEC", "30"))
+
+# 재연결을 기다리는 동안 쌓아 둘 최대 알림 수 (넘으면 "all" 하나로 합침)
+MAX_PENDING = 10_000
+
+_EVICT = {"user": evict_user, "plan": evict_plan}
+
+Subscriber = Callable[[str, int], None]
+
+
+class InvalidationBus:
+    def __init__(
+        self,
+        channel: str = INVALIDATION_CHANNEL,
+        ping_interval: float = INVALIDATION_PING_SEC,
+        backoff_max: float = INVALIDATION_BACKOFF_MAX_SEC,
+        enabled: bool = INVALIDATION_BUS_ENABLED,
+    ):
+        self.channel = channel
+        self.ping_interval = ping_interval
+        self.backoff_max = max(1.0, backoff_max)
+        self.enabled = enabled
+        self.origin = uuid.uuid4().hex[:12]
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        # dict 를 순서 있는 집합으로 사용 (같은 키 중복 제거)
+        self._pending: dict[str, None] = {}
+        self._subscribers: list[Subscriber] = []
+
+        self.connected = False
+        self.connects = 0
+        self.sent = 0
+        self.received = 0
+        self.last_error: Optional[str] = None
+
+    # ---------- 수명주기 ----------
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ---------- 보내기 ----------
+    def publish(self, kind: str, key: int) -> None:
+        """cache.invalidate_* 훅: 이벤트 루프 안에서 동기로 호출되므로 큐에 넣기만 한다"""
+        if not self.enabled:
+            return
+        if len(self._pending) >= MAX_PENDING:
+            self._pending = {"all:0": None}
+        else:
+            self._pending[f"{kind}:{key}"] = None
+        self._wake.set()
+
+    async def _flush(self, conn: asyncpg.Connection) -> None:
+        if not self._pending:
+            return
+        keys = list(self._pending)
+        payloads = [f"{self.origin}:{k}" for k in keys]
+        await conn.execute("SELECT pg_notify($1, p) FROM unnest($2::text[]) AS p", self.channel, payloads)
+        for k in keys:
+            self._pending.pop(k, None)
+        self.sent += len(payloads)
+
+    # ---------- 받기 ----------
+    def add_subscriber(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    def _notify_subscribers(self, kind: str, key: int) -> None:
+        for subscriber in self._subscribers:
+            subscriber(kind, key)
+
+    def _on_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            origin, kind, raw_key = payload.split(":", 2)
+            key = int(raw_key)
+        except ValueError:
+            logger.warning(f"invalid invalidation payload: {payload!r}")
+            return
+        if origin == self.origin:
+            return
+        self.received += 1
+        if kind == "all":
+            evict_all()
+        elif kind in _EVICT:
+            _EVICT[kind](key)
+        # 캐시와 상관없는 kind (예: backend.shards 의 "shard") 는 구독자만 받는다
+        self._notify_subscribers(kind, key)
+
+    # ---------- 연결 유지 ----------
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await connect(init_hooks=False)
+                await conn.add_listener(self.channel, self._on_notify)
+                conn.add_termination_listener(lambda _: self._wake.set())
+                self.connects += 1
+                self.connected = True
+                if self.connects > 1:
+                    # 끊겨 있던 동안 다른 워커의 알림을 놓쳤을 수 있다
+                    evict_all()
+                    self._notify_subscribers("all", 0)
+                backoff = 1.0
+                await self._serve(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"invalidation bus disconnected: {e}; retrying in {backoff:.0f}s")
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+
+    async def _serve(self, conn: asyncpg.Connection) -> None:
+        while True:
+            await self._flush(conn)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                # 조용한 동안에도 끊긴 연결을 알아차리도록
+                await conn.execute("SELECT 1")
+            self._wake.clear()
+            if conn.is_closed():
+                raise ConnectionError("listen connection closed")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "channel": self.channel,
+            "origin": self.origin,
+            "connected": self.connected,
+            "connects": self.connects,
+            "pending": len(self._pending),
+            "sent": self.sent,
+            "received": self.received,
+            "last_error": self.last_error,
+        }
+
+
+# 싱글톤 인스턴스
+invalidation_bus = InvalidationBus()
+add_publisher(invalidation_bus.publish)
@@ -0,0 +1,309 @@
+# backend/jobs.py
+"""
+비동기 시뮬레이션 작업(job) 관리
+
+긴 시뮬레이션(여러 플랜 비교, 가정값 sweep 등)을 HTTP 요청 안에서 돌리지 않고
+프로세스 내 큐에 넣은 뒤 워커가 실행한다. 클라이언트는 상태/결과 엔드포인트를 폴링하거나 대기한다.
+외부 브로커 없이 한 프로세스 안에서 동작한다. 여러 프로세스 (uvicorn --workers N 등) 로 나눠 받는 배포는 지원하지 않는다:
+작업 id 앞에 만든 프로세스의 id 가 붙어 있어서, 다른 프로세스(또는 재시작 전 프로세스)가 만든 작업을 조회하면
+404 대신 421 로 알려준다. 여러 워커로 띄우려면 /api/jobs 를 sticky 라우팅해야 한다.
+
+환경 변수
+- JOB_WORKERS: 동시에 실행할 작업 수 (기본 2)
+- JOB_MAX_ACTIVE_PER_USER: 유저별 대기+실행 중 작업 상한 (기본 5)
+- JOB_MAX_SIMULATIONS: 작업 하나에 포함될 수 있는 시뮬레이션 수 상한 (기본 200)
+- JOB_MAX_RETAINED: TTL 전이라도 메모리에 남겨 둘 끝난 작업(결과 포함) 수 전체 상한 (기본 500).
+  넘치면 가장 먼저 끝난 작업부터 버린다 (결과 조회는 404)
+- JOB_MAX_RETAINED_PER_USER: 유저별 끝난 작업 보관 상한 (기본 20)
+"""
+import asyncio
+import itertools
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+
+from backend.admission import AdmissionCancelled, admission, estimate_cost, simulation_months
+from backend.shards import shard_router
+from backend.projection import load_plan_inputs, simulate_plan, SUMMARY_KEYS
+from backend.repository import PostgresRepository
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ACTIVE_PER_USER = int(os.getenv("JOB_MAX_ACTIVE_PER_USER", "5"))
+JOB_MAX_SIMULATIONS = int(os.getenv("JOB_MAX_SIMULATIONS", "200"))
+JOB_MAX_RETAINED = int(os.getenv("JOB_MAX_RETAINED", "500"))
+JOB_MAX_RETAINED_PER_USER = int(os.getenv("JOB_MAX_RETAINED_PER_USER", "20"))
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING")
+DONE_STATUSES = ("SUCCEEDED", "FAILED", "CANCELLED")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLimitExceeded(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Job:
+    id: str
+    user_id: int
+    kind: str
+    plan_ids: list[int]
+    variations: list[dict[str, float]]
+    ttl_seconds: int
+    status: str = "QUEUED"
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_requested: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at + timedelta(seconds=self.ttl_seconds)
+
+    @property
+    def total_simulations(self) -> int:
+        return len(self.plan_ids) * max(1, len(self.variations))
+
+    def to_dict(self, include_result: bool = False) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+            "result": self.result if include_result else None,
+        }
+
+
+def sweep_variations(roi: list[float], inflation: list[float]) -> list[dict[str, float]]:
+    """roi × inflation 조합. 한쪽이 비어 있으면 그 값은 플랜 값을 그대로 쓴다"""
+    variations = []
+    for r, i in itertools.product(roi or [None], inflation or [None]):
+        v = {}
+        if r is not None:
+            v["roi"] = r
+        if i is not None:
+            v["inflation"] = i
+        variations.append(v)
+    return variations
+
+
+class JobManager:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_active_per_user: int = JOB_MAX_ACTIVE_PER_USER,
+        max_simulations: int = JOB_MAX_SIMULATIONS,
+        max_retained: int = JOB_MAX_RETAINED,
+        max_retained_per_user: int = JOB_MAX_RETAINED_PER_USER,
+    ):
+        self.workers = max(1, workers)
+        self.max_active_per_user = max_active_per_user
+        self.max_simulations = max_simulations
+        self.max_retained = max(0, max_retained)
+        self.max_retained_per_user = max(0, max_retained_per_user)
+        self._jobs: dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        # 작업 id 접두사: 이 프로세스가 만든 작업인지 구분 (재시작하면 바뀜)
+        self.instance_id = uuid.uuid4().hex[:8]
+
+    # ---------- 수명주기 ----------
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._janitor()))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---------- API ----------
+    def submit(
+        self,
+        user_id: int,
+        kind: str,
+        plan_ids: list[int],
+        variations: Optional[list[dict[str, float]]] = None,
+        ttl_seconds: int = 3600,
+    ) -> Job:
+        self.purge_expired()
+
+        active = sum(1 for j in self._jobs.values() if j.user_id == user_id and j.status in ACTIVE_STATUSES)
+        if active >= self.max_active_per_user:
+            raise JobLimitExceeded(f"active job limit reached ({self.max_active_per_user})")
+
+        job = Job(
+            id=f"{self.instance_id}-{uuid.uuid4().hex}",
+            user_id=user_id,
+            kind=kind,
+            plan_ids=list(plan_ids),
+            variations=variations or [],
+            ttl_seconds=ttl_seconds,
+        )
+        if job.total_simulations > self.max_simulations:
+            raise JobLimitExceeded(f"too many simulations in one job ({job.total_simulations} > {self.max_simulations})")
+
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def owns(self, job_id: str) -> bool:
+        """이 프로세스가 만든 작업 id 인지 (작업이 아직 남아 있는지와는 별개)"""
+        return job_id.startswith(f"{self.instance_id}-")
+
+    def get(self, job_id: str, user_id: int) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        if job.expires_at is not None and job.expires_at <= _now():
+            self._jobs.pop(job_id, None)
+            return None
+        return job
+
+    def cancel(self, job: Job) -> None:
+        if job.status == "QUEUED":
+            self._finish(job, "CANCELLED")
+        elif job.status == "RUNNING":
+            # 실행 중인 작업은 다음 진행률 보고 시점에, admission 대기 중이면 다음 확인 시점에 중단됨
+            job.cancel_requested = True
+
+    async def wait(self, job: Job, timeout: float) -> bool:
+        if job.status in DONE_STATUSES:
+            return True
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def purge_expired(self) -> int:
+        now = _now()
+        expired = [k for k, j in self._jobs.items() if j.expires_at is not None and j.expires_at <= now]
+        for k in expired:
+            del self._jobs[k]
+        return len(expired)
+
+    # ---------- 내부 ----------
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = _now()
+        if status == "SUCCEEDED":
+            job.progress = 1.0
+        job.done.set()
+        self._trim_retained(job.user_id)
+
+    def _trim_retained(self, user_id: int) -> None:
+        """끝난 작업이 보관 상한을 넘으면 먼저 끝난 것부터 버린다 (유저별 → 전체)"""
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in DONE_STATUSES),
+            key=lambda j: j.finished_at,
+        )
+        user_finished = [j for j in finished if j.user_id == user_id]
+        evict = user_finished[: max(0, len(user_finished) - self.max_retained_per_user)]
+        for j in evict:
+            del self._jobs[j.id]
+        if evict:
+            finished = [j for j in finished if j.id in self._jobs]
+        for j in finished[: max(0, len(finished) - self.max_retained)]:
+            del self._jobs[j.id]
+
+    async def _janitor(self) -> None:
+        while True:
+            await asyncio.sleep(60)
+            self.purge_expired()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != "QUEUED":
+                    continue
+                job.status = "RUNNING"
+                job.started_at = _now()
+                result = await self._execute(job)
+                self._finish(job, "SUCCEEDED", result=result)
+            except (JobCancelled, AdmissionCancelled):
+                self._finish(job, "CANCELLED")
+            except asyncio.CancelledError:
+                self._finish(job, "CANCELLED")
+                raise
+            except Exception as e:
+                logger.exception(f"simulation job {job.id} failed")
+                self._finish(job, "FAILED", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Job) -> Any:
+        today = date.today()
+        total = job.total_simulations
+        done_count = 0
+
+        def reporter(fraction: float) -> None:
+            # 워커 스레드에서 호출됨: 취소 확인 겸 진행률 갱신
+            if job.cancel_requested:
+                raise JobCancelled()
+            job.progress = min(1.0, (done_count + fraction) / total)
+
+        outputs = []
+        for plan_id in job.plan_ids:
+            async with shard_router.acquire(job.user_id) as conn:
+                inputs = await load_plan_inputs(PostgresRepository(conn), job.user_id, plan_id)
+            if inputs is None:
+                raise ValueError(f"plan not found: {plan_id}")
+            cost = estimate_cost(inputs["snapshot"], simulation_months(today, inputs["plan"]["expected_death_year"]))
+
+            for variation in (job.variations or [{}]):
+                if job.cancel_requested:
+                    raise JobCancelled()
+                varied = {"plan": {**inputs["plan"], **variation}, "snapshot": inputs["snapshot"]}
+                # 작업은 이미 큐에 들어온 것이므로 거절하지 않고 자리가 날 때까지 기다린다
+                async with admission.admit(job.user_id, cost, wait=None, cancelled=lambda: job.cancel_requested):
+                    projection = await asyncio.to_thread(simulate_plan, varied, today, reporter)
+                done_count += 1
+                outputs.append((plan_id, variation, projection))
+
+        if job.kind == "plan":
+            return outputs[0][2]
+
+        return [
+            {
+                "plan_id": plan_id,
+                "title": projection["plan"]["title"],
+                **variation,
+                **{k: projection[k] for k in SUMMARY_KEYS},
+            }
+            for plan_id, variation, projection in outputs
+        ]
+
+
+# 싱글톤 인스턴스
+job_manager = JobManager()
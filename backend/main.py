@@ -1,24 +1,59 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
-import asyncpg
+from contextlib import asynccontextmanager
 
 # ===== 우리가 만든 backend 모듈들 =====
-from backend.db import get_db_connection
-from backend.auth import get_current_user, CurrentUser
-from backend.snapshot import load_user_snapshot
-from backend.routes import savings, investments, assets, debts, plans, users, auth
+from backend.db import db
+from backend.statements import statements
+from backend.tracing import query_tracer
+from backend.pagination import NEXT_CURSOR_HEADER
+from backend.conditional import ETAG_HEADER
+from backend.auth import get_current_user, require_debug_access, CurrentUser
+from backend.repository import Repository, get_repository
+from backend.snapshot import load_financial_summary, load_user_snapshot
+from backend.routes import savings, investments, assets, debts, plans, users, auth, jobs, me
+from backend.scheduler import projection_scheduler
+from backend.jobs import job_manager
+from backend.admission import admission
+from backend.cache import projection_cache, snapshot_cache
+from backend.invalidation import invalidation_bus
+from backend.replicas import replica_router
+from backend.shards import shard_router
+from backend import deadline
+from backend.deadline import DeadlineExceeded, DeadlineMiddleware
 # from backend.mcp_client import mcp_client  # MCP 구현 시 사용
 
+# ==============================
+# 앱 수명주기 (백그라운드 작업 시작/종료)
+# ==============================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.start()
+    await shard_router.start()
+    await replica_router.start()
+    invalidation_bus.start()
+    projection_scheduler.start()
+    job_manager.start()
+    try:
+        yield
+    finally:
+        await job_manager.stop()
+        await projection_scheduler.stop()
+        await invalidation_bus.stop()
+        await replica_router.stop()
+        await shard_router.stop()
+        await db.stop()
+
 # ==============================
 # FastAPI 앱 (⚠️ 하나만!)
 # ==============================
-app = FastAPI(title="MoneyCoach + Figma MCP API", redirect_slashes=False)
+app = FastAPI(title="MoneyCoach + Figma MCP API", redirect_slashes=False, lifespan=lifespan)
 
 # ==============================
 # CORS
@@ -33,8 +68,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],  # 목록 페이지네이션 커서 / 조건부 GET
 )
 
+# ==============================
+# 요청 처리 시한 (backend.deadline)
+# ==============================
+app.add_middleware(DeadlineMiddleware)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
 # ==============================
 # Static / Templates
 # ==============================
@@ -50,7 +95,9 @@ app.include_router(assets.router, prefix="/api", tags=["assets"])
 app.include_router(debts.router, prefix="/api", tags=["debts"])
 app.include_router(plans.router, prefix="/api", tags=["plans"])
 app.include_router(auth.router, prefix="/api", tags=["auth"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 app.include_router(users.router, prefix="/api")
+app.include_router(me.router, prefix="/api")
 # ==============================
 # Figma MCP 관련 스키마
 # ==============================
@@ -112,6 +159,34 @@ async def get_figma_design_context(nodeId: Optional[str] = None):
 @app.get("/api/debug/whoami")
 async def whoami(current_user: CurrentUser = Depends(get_current_user)):
     return {"user_id": current_user.id}
+@app.get("/api/debug/admission", dependencies=[Depends(require_debug_access)])
+async def admission_stats():
+    return admission.stats()
+@app.get("/api/debug/db", dependencies=[Depends(require_debug_access)])
+async def db_stats():
+    return db.stats()
+@app.get("/api/debug/deadlines", dependencies=[Depends(require_debug_access)])
+async def deadline_stats():
+    return deadline.stats()
+@app.get("/api/debug/replicas", dependencies=[Depends(require_debug_access)])
+async def replica_stats():
+    return replica_router.stats()
+@app.get("/api/debug/shards", dependencies=[Depends(require_debug_access)])
+async def shard_stats():
+    return shard_router.stats()
+@app.get("/api/debug/queries", dependencies=[Depends(require_debug_access)])
+async def query_stats():
+    return query_tracer.stats()
+@app.get("/api/debug/statements", dependencies=[Depends(require_debug_access)])
+async def statement_stats():
+    return statements.stats()
+@app.get("/api/debug/cache", dependencies=[Depends(require_debug_access)])
+async def cache_stats():
+    return {
+        "snapshot": snapshot_cache.stats(),
+        "projection_entries": len(projection_cache),
+        "invalidation_bus": invalidation_bus.stats(),
+    }
 # ==============================
 # 대시보드 (HTML)
 # ==============================
@@ -119,14 +194,14 @@ async def whoami(current_user: CurrentUser = Depends(get_current_user)):
 async def dashboard(
     request: Request,
     current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    snapshot = await load_user_snapshot(conn, current_user.id)
+    # 합계/개수는 트리거가 유지하는 요약 한 행에서 (보유 항목 수와 무관).
+    # 템플릿이 쓰던 항목 목록도 그대로 넘긴다 (snapshot_cache 에 있으면 쿼리 없음)
+    summary = await load_financial_summary(repo, current_user.id)
+    snapshot = await load_user_snapshot(repo, current_user.id)
 
-    plans_data = await conn.fetch(
-        "SELECT id, title, description FROM plans WHERE user_id = $1 ORDER BY created_at DESC",
-        current_user.id
-    )
+    plans_data = await repo.plan_list(current_user.id)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -137,6 +212,7 @@ async def dashboard(
             "investments": snapshot.get("investments", []),
             "assets": snapshot.get("assets", []),
             "debts": snapshot.get("debts", []),
+            "summary": summary,
             "plans": plans_data,
         },
     )
@@ -0,0 +1,401 @@
+# backend/memory_repository.py
+"""
+인메모리 Repository (backend.repository)
+
+DB 없이 API 스택(라우팅, 인증, 검증, 시뮬레이션, 직렬화)을 그대로 돌리기 위한 구현.
+결정적인 부하 테스트와 CI 벤치마크(python -m backend.bench)에서 DB 시간과 따로 파이썬 쪽 비용만 잰다.
+
+PostgresRepository 와 같은 값을 같은 타입으로 돌려주도록 스키마(migrations/0001, 0003)의 의미를 따른다.
+- 컬럼 기본값, NOT NULL, enum 값 검사 (어기면 ValueError), numeric 은 스케일대로 반올림한 float
+- id 는 테이블마다 1 부터. created_at / updated_at 은 clock() (기본 현재 UTC 시각)
+- 목록 정렬은 created_at DESC NULLS LAST, id DESC (plan_titles 만 created_at ASC)
+- jsonb(priority) 는 Postgres 가 돌려주는 정규화된 텍스트 (키는 길이 → 바이트 순, ", " / ": " 구분자)
+- user_financial_summary: 보유 항목 행을 넣을 때마다 트리거처럼 증감분을 더하고 version 을 올린다
+- 플랜 하위 항목(수입/지출/세금)을 넣으면 0005 트리거처럼 플랜의 items_version 을 올린다
+
+사용
+    store = MemoryStore()
+    user_id = store.add_user()
+    store.insert("savings", user_id=user_id, category="DEPOSIT", amount=1000)
+    use_repository(app, MemoryRepository(store))
+
+읽기 경로(Repository)만 구현한다. MemoryStore.insert 는 시드용이고, 항목 / 플랜 생성 / 수정 / 삭제 라우트는
+Repository 를 거치지 않고 DB 연결에 직접 SQL 을 보내므로 이 구현으로는 돌지 않는다.
+
+KeysetList 의 SELECT 식은 컬럼 이름과 COALESCE(numeric 컬럼, 숫자) 만 해석한다. 그 밖의 식이나 없는 컬럼은
+목록을 처음 읽을 때 (fields 와 상관없이 목록 정의 전체를 보고) UnsupportedExpression.
+"""
+import bisect
+import json
+import re
+from datetime import datetime, timezone
+from operator import itemgetter
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from backend.pagination import decode_cursor
+from backend.projection import PLAN_COLUMNS
+from backend.repository import Repository, get_repository
+from backend.shards import get_new_user_repository
+from backend.snapshot import USER_ITEMS, PLAN_ITEMS, SUMMARY_TOTALS, SUMMARY_COUNTS
+
+# ==========================
+# 스키마 (0001_baseline 과 같은 기본값 / 타입)
+# ==========================
+GENDER = ("MALE", "FEMALE", "OTHER")
+COMPOUND = ("COMPOUND", "SIMPLE")
+FREQUENCY = ("YEARLY", "MONTHLY", "WEEKLY", "DAILY")
+
+
+class Column(NamedTuple):
+    default: Any = None
+    kind: Any = None        # numeric 스케일(int) / enum 값 tuple / None
+    required: bool = False  # NOT NULL (기본값 없음)
+
+
+_AMOUNT = Column(0.0, 2)
+_RATE = Column(0.0, 4)
+
+SCHEMA: dict[str, dict[str, Column]] = {
+    "users": {
+        "username": Column(required=True),
+        "birth": Column(),
+        "gender": Column(kind=GENDER),
+        "purpose": Column(),
+    },
+    "savings": {
+        "user_id": Column(required=True),
+        "category": Column(kind=("DEPOSIT", "INSTALLMENT", "CASH", "SUBSCRIPTION"), required=True),
+        "amount": _AMOUNT,
+        "interest_rate": _RATE,
+        "compound": Column("COMPOUND", COMPOUND),
+        "deposit": _AMOUNT,
+        "deposit_frequency": Column(kind=FREQUENCY),
+        "maturity_date": Column(),
+    },
+    "investments": {
+        "user_id": Column(required=True),
+        "category": Column(kind=("STOCK", "BOND", "ETF", "FUND", "CRYPTO"), required=True),
+        "amount": _AMOUNT,
+        "roi": _RATE,
+        "dividend": _RATE,
+        "deposit": _AMOUNT,
+        "deposit_frequency": Column(kind=FREQUENCY),
+        "maturity_date": Column(),
+    },
+    "assets": {
+        "user_id": Column(required=True),
+        "category": Column(kind=("HOUSE", "JEWELRY", "REAL_ESTATE"), required=True),
+        "interest_rate": _RATE,
+        "roi": _RATE,
+        "dividend": _RATE,
+        "amount": _AMOUNT,
+        "loan_amount": _AMOUNT,
+        "repay_amount": _AMOUNT,
+    },
+    "debts": {
+        "user_id": Column(required=True),
+        "category": Column(kind=("STUDENT_LOAN", "CREDIT_LOAN", "LIVING_EXPENSE_LOAN", "MORTGAGE"), required=True),
+        "loan_amount": _AMOUNT,
+        "repay_amount": _AMOUNT,
+        "interest_rate": _RATE,
+        "compound": Column("COMPOUND", COMPOUND),
+    },
+    "plans": {
+        "user_id": Column(required=True),
+        "title": Column(required=True),
+        "description": Column(),
+        "roi": Column(kind=4),
+        "dividend": Column(kind=4),
+        "inflation": Column(kind=4),
+        "interest_rate": Column(kind=4),
+        "priority": Column(),
+        "retirement_year": Column(),
+        "expected_death_year": Column(),
+    },
+    "revenues": {
+        "plan_id": Column(required=True),
+        "category": Column(kind=("INCOME",), required=True),
+        "amount": Column(kind=2, required=True),
+        "frequency": Column(kind=FREQUENCY, required=True),
+        "start_date": Column(),
+        "end_date": Column(),
+    },
+    "expenses": {
+        "plan_id": Column(required=True),
+        "category": Column(kind=("EXPENSE",), required=True),
+        "amount": Column(kind=2, required=True),
+        "frequency": Column(kind=FREQUENCY, required=True),
+        "start_date": Column(),
+        "end_date": Column(),
+    },
+    "taxes": {
+        "plan_id": Column(required=True),
+        "category": Column(kind=("INCOME_TAX",), required=True),
+        "rate": _RATE,
+        "frequency": Column("YEARLY", FREQUENCY),
+    },
+}
+
+# 부모 키 (목록 / 스냅샷 조회 기준)
+PARENT = {
+    "savings": "user_id", "investments": "user_id", "assets": "user_id", "debts": "user_id", "plans": "user_id",
+    "revenues": "plan_id", "expenses": "plan_id", "taxes": "plan_id",
+}
+
+# user_financial_summary 에 반영되는 테이블 → {요약 컬럼: 행 컬럼} (0003 의 user_financial_summary_add)
+SUMMARY_SOURCES = {
+    "savings": {"savings_total": "amount"},
+    "investments": {"investments_total": "amount"},
+    "assets": {"assets_total": "amount", "asset_loans_total": "loan_amount", "monthly_repayment": "repay_amount"},
+    "debts": {"debts_total": "loan_amount", "monthly_repayment": "repay_amount"},
+}
+
+
+def jsonb_text(value: Any) -> str:
+    """json 값 → Postgres 가 jsonb 를 돌려줄 때의 텍스트"""
+
+    def normalize(v):
+        if isinstance(v, dict):
+            return {k: normalize(v[k]) for k in sorted(v, key=lambda k: (len(k.encode()), k.encode()))}
+        if isinstance(v, (list, tuple)):
+            return [normalize(x) for x in v]
+        return v
+
+    return json.dumps(normalize(value), ensure_ascii=False)
+
+
+def _order_key(row: dict[str, Any]) -> tuple:
+    """
+    created_at NULL 인 행이 맨 앞인 (created_at, id) 오름차순. 뒤집으면 목록 순서 (created_at DESC NULLS LAST, id DESC).
+    NULL 행끼리는 id 로만 비교한다 (None 과 datetime 을 비교하지 않게)
+    """
+    created_at = row["created_at"]
+    return (False, 0, row["id"]) if created_at is None else (True, created_at, row["id"])
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryStore:
+    """테이블 이름 → {id: 행}. 행은 asyncpg 가 돌려주는 것과 같은 타입의 dict (넣은 뒤에는 바꾸지 않는다)"""
+
+    def __init__(self, clock: Callable[[], datetime] = _utcnow):
+        self.clock = clock
+        self.tables: dict[str, dict[int, dict[str, Any]]] = {t: {} for t in SCHEMA}
+        self.summaries: dict[int, dict[str, Any]] = {}
+        self._next_id = {t: 1 for t in SCHEMA}
+        # (테이블, 부모 id) → 행 목록 (_order_key 오름차순)
+        self._children: dict[tuple[str, int], list[dict[str, Any]]] = {}
+        self._usernames: set[str] = set()
+        # plan_id → (items_version, items_updated_at)
+        self.plan_items: dict[int, tuple[int, datetime]] = {}
+
+    def _row(self, table: str, values: dict[str, Any]) -> dict[str, Any]:
+        columns = SCHEMA[table]
+        unknown = set(values) - set(columns) - {"id", "created_at", "updated_at"}
+        if unknown:
+            raise ValueError(f"{table}: unknown columns {sorted(unknown)}")
+
+        row: dict[str, Any] = {"id": values.get("id", self._next_id[table])}
+        if row["id"] in self.tables[table]:
+            raise ValueError(f"{table}: duplicate id {row['id']}")
+        for name, col in columns.items():
+            value = values.get(name, col.default)
+            if value is None:
+                if col.required:
+                    raise ValueError(f'{table}: null value in column "{name}"')
+            elif isinstance(col.kind, int):
+                value = round(float(value), col.kind)
+            elif isinstance(col.kind, tuple) and value not in col.kind:
+                raise ValueError(f"{table}: invalid input value for {name}: {value!r}")
+            row[name] = value
+
+        row["created_at"] = values["created_at"] if "created_at" in values else self.clock()
+        row["updated_at"] = values.get("updated_at", row["created_at"])
+        return row
+
+    def insert(self, table: str, **values: Any) -> dict[str, Any]:
+        """
+        행 하나 추가 (INSERT ... RETURNING *). 부모(유저/플랜)가 없으면 ValueError.
+        id / created_at 을 주면 그 값으로 (운영 데이터를 그대로 옮겨 올 때). 이후 id 는 그 뒤로 이어진다
+        """
+        row = self._row(table, values)
+
+        parent = PARENT.get(table)
+        if parent is not None:
+            parent_table = "users" if parent == "user_id" else "plans"
+            if row[parent] not in self.tables[parent_table]:
+                raise ValueError(f"{table}: {parent}={row[parent]} does not exist")
+        if table == "users":
+            if row["username"] in self._usernames:
+                raise ValueError(f"users: duplicate username {row['username']!r}")
+            self._usernames.add(row["username"])
+
+        self._next_id[table] = max(self._next_id[table], row["id"] + 1)
+        self.tables[table][row["id"]] = row
+        if parent is not None:
+            bisect.insort(
+                self._children.setdefault((table, row[parent]), []),
+                row,
+                key=_order_key,
+            )
+        if table in SUMMARY_SOURCES:
+            self._add_to_summary(table, row)
+        elif parent == "plan_id":
+            version, _ = self.plan_items.get(row["plan_id"], (0, None))
+            self.plan_items[row["plan_id"]] = (version + 1, self.clock())
+        return row
+
+    def _add_to_summary(self, table: str, row: dict[str, Any]) -> None:
+        summary = self.summaries.get(row["user_id"])
+        if summary is None:
+            summary = {**{k: 0.0 for k in SUMMARY_TOTALS}, **{k: 0 for k in SUMMARY_COUNTS}, "version": 0}
+            self.summaries[row["user_id"]] = summary
+        for total, column in SUMMARY_SOURCES[table].items():
+            summary[total] = round(summary[total] + (row[column] or 0.0), 2)
+        summary[f"{table}_count"] += 1
+        summary["version"] += 1
+        summary["updated_at"] = self.clock()
+
+    def children(self, table: str, parent_id: int) -> list[dict[str, Any]]:
+        """부모의 행 목록 (_order_key 오름차순 — 공유 리스트, 수정 금지)"""
+        return self._children.get((table, parent_id), [])
+
+    # ===== 시드 =====
+    def add_user(self, username: Optional[str] = None, **values: Any) -> int:
+        if username is None:
+            username = f"user_{self._next_id['users']}"
+        return self.insert("users", username=username, **values)["id"]
+
+    def add_plan(self, user_id: int, title: str, priority: Any = None, **values: Any) -> int:
+        """priority 는 dict (또는 JSON 문자열) — jsonb 로 저장했다 읽은 텍스트로 바꿔 둔다"""
+        if isinstance(priority, str):
+            priority = json.loads(priority)
+        if priority is not None:
+            priority = jsonb_text(priority)
+        return self.insert("plans", user_id=user_id, title=title, priority=priority, **values)["id"]
+
+
+# ==========================
+# KeysetList SELECT 식
+# ==========================
+_COALESCE_NUMBER = re.compile(r"COALESCE\((\w+), (-?\d+(?:\.\d+)?)\)")
+
+
+class UnsupportedExpression(Exception):
+    """KeysetList 의 SELECT 식을 인메모리로 해석할 수 없음"""
+
+
+def _getter(table: str, expr: str) -> Callable[[dict[str, Any]], Any]:
+    columns = SCHEMA[table]
+    if expr.isidentifier():
+        if expr not in columns and expr not in ("id", "created_at", "updated_at"):
+            raise UnsupportedExpression(f'{table}: column "{expr}" does not exist')
+        return itemgetter(expr)
+    m = _COALESCE_NUMBER.fullmatch(expr)
+    if m and m.group(1) in columns and isinstance(columns[m.group(1)].kind, int):
+        column, default = m.group(1), float(m.group(2))
+        # numeric 컬럼의 COALESCE(.., 0) 은 numeric → float
+        return lambda row: default if row[column] is None else row[column]
+    raise UnsupportedExpression(
+        f"{table}: memory repository cannot evaluate {expr!r} (supported: column, COALESCE(numeric column, number))"
+    )
+
+
+class MemoryRepository(Repository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+        # KeysetList → {응답 키: 행에서 값을 읽는 함수}
+        self._getters: dict[Any, dict[str, Callable[[dict[str, Any]], Any]]] = {}
+
+    def _items(self, items: dict[str, tuple[str, tuple[str, ...]]], parent_id: int) -> dict[str, list[dict[str, Any]]]:
+        # 최신순, 새 dict (Postgres 처럼 호출마다 새 객체)
+        return {
+            key: [{c: row[c] for c in columns} for row in reversed(self.store.children(table, parent_id))]
+            for key, (table, columns) in items.items()
+        }
+
+    async def user_exists(self, user_id: int) -> bool:
+        return user_id in self.store.tables["users"]
+
+    async def create_anon_user(self, username: str) -> int:
+        return self.store.add_user(username)
+
+    async def user_snapshot(self, user_id: int) -> dict[str, list[dict[str, Any]]]:
+        return self._items(USER_ITEMS, user_id)
+
+    async def financial_summary(self, user_id: int) -> Optional[dict[str, Any]]:
+        summary = self.store.summaries.get(user_id)
+        return dict(summary) if summary is not None else None
+
+    async def data_version(self, user_id: int):
+        summary = self.store.summaries.get(user_id)
+        plans = self.store.children("plans", user_id)
+        return (
+            summary["version"] if summary is not None else 0,
+            len(plans),
+            max((p["updated_at"] for p in plans), default=None),
+        )
+
+    async def plan_inputs(self, user_id: int, plan_id: int, with_user_items: bool = True):
+        plan = self.store.tables["plans"].get(plan_id)
+        if plan is None or plan["user_id"] != user_id:
+            return None
+        items = self._items(PLAN_ITEMS, plan_id)
+        if with_user_items:
+            items = {**self._items(USER_ITEMS, user_id), **items}
+        return {c: plan[c] for c in PLAN_COLUMNS}, items
+
+    async def plan_version(self, user_id: int, plan_id: int) -> Optional[dict[str, Any]]:
+        plan = self.store.tables["plans"].get(plan_id)
+        if plan is None or plan["user_id"] != user_id:
+            return None
+        items_version, items_updated_at = self.store.plan_items.get(plan_id, (0, None))
+        summary = self.store.summaries.get(user_id)
+        return {
+            "plan_updated_at": plan["updated_at"],
+            "items_version": items_version,
+            "items_updated_at": items_updated_at,
+            "holdings_version": summary["version"] if summary is not None else 0,
+            "holdings_updated_at": summary["updated_at"] if summary is not None else None,
+        }
+
+    async def plan_titles(self, user_id: int) -> list[str]:
+        return [p["title"] for p in self.store.children("plans", user_id)]
+
+    async def plan_list(self, user_id: int) -> list[dict[str, Any]]:
+        return [
+            {"id": p["id"], "title": p["title"], "description": p["description"]}
+            for p in reversed(self.store.children("plans", user_id))
+        ]
+
+    async def owned_plan_ids(self, user_id: int, plan_ids: Sequence[int]) -> set[int]:
+        plans = self.store.tables["plans"]
+        return {i for i in plan_ids if i in plans and plans[i]["user_id"] == user_id}
+
+    async def versioned_lists(self, user_id: int, lists):
+        # 쓰기는 시드(MemoryStore.insert)뿐이라 따로 읽어도 같은 시점
+        version = await self.data_version(user_id)
+        return version, {key: (await self.fetch_page(listing, user_id))[0] for key, listing in lists.lists.items()}
+
+    async def fetch_page(self, listing, key, limit=None, cursor=None, fields=None):
+        getters = self._getters.get(listing)
+        if getters is None:
+            getters = {c: _getter(listing.table, expr) for c, expr in listing.columns.items()}
+            self._getters[listing] = getters
+        getters = [(c, getters[c]) for c in listing.selected(fields)]
+
+        rows = self.store.children(listing.table, key)
+        if cursor is not None:
+            # 오름차순이므로 커서 앞쪽까지만
+            created_at, row_id = decode_cursor(cursor)
+            rows = rows[:bisect.bisect_left(rows, _order_key({"created_at": created_at, "id": row_id}), key=_order_key)]
+        rows = rows[::-1] if limit is None else rows[: -(limit + 2): -1]
+        return listing.finish([{c: get(r) for c, get in getters} for r in rows], limit, fields)
+
+
+def use_repository(app, repo: Repository) -> None:
+    """app 의 라우트가 repo 를 쓰도록 의존성을 바꾼다 (되돌리려면 app.dependency_overrides.clear())"""
+    app.dependency_overrides[get_repository] = lambda: repo
+    app.dependency_overrides[get_new_user_repository] = lambda: repo
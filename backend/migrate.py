@@ -0,0 +1,310 @@
+# backend/migrate.py
+"""
+스키마 마이그레이션
+
+backend/migrations/NNNN_이름.sql 을 번호 순서대로 적용한다. 적용 기록은 schema_migrations 테이블에 남고
+이미 적용된 버전은 건너뛰므로 몇 번을 실행해도 결과가 같다.
+
+- 버전 하나 = 트랜잭션 하나. 실패하면 그 버전은 통째로 롤백되고 이후 버전은 적용하지 않는다.
+- 파일에 `-- migrate:no-transaction` 줄이 있으면 트랜잭션 없이 문장 단위로 실행한다 (CREATE INDEX CONCURRENTLY 용).
+  이런 파일은 문장마다 멱등이어야 하고 (IF NOT EXISTS), 중간에 실패하면 기록이 남지 않으므로 다시 실행하면 처음부터 다시 돈다.
+  실패한 CONCURRENTLY 빌드가 남긴 INVALID 인덱스는 IF NOT EXISTS 에 걸려 그대로 남으므로 실행 전에 지운다.
+- 여러 인스턴스가 동시에 실행해도 advisory lock 으로 한 번에 하나만 적용한다.
+- 이미 적용된 파일 내용이 바뀌면(checksum 불일치) 에러. 나간 마이그레이션은 고치지 말고 새 버전을 추가한다.
+- 0001_baseline 은 운영 DB 덤프가 아니라 도입 당시 코드에서 다시 만든 스키마다. users 테이블이 이미 있으면 아무것도 하지 않는다.
+
+    python -m backend.migrate up [--to N]   # 미적용 버전 적용
+    python -m backend.migrate status        # 적용 / 미적용 목록
+    python -m backend.migrate check         # 핫 쿼리 EXPLAIN 으로 인덱스 사용 확인 (실패 시 exit 1)
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import asyncpg
+
+from backend.db import connect
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+# 마이그레이션 실행을 직렬화하는 advisory lock 키 (임의의 고정 값)
+MIGRATION_LOCK_KEY = 7_305_118_842
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_NO_TRANSACTION_RE = re.compile(r"^--\s*migrate:no-transaction\s*$", re.MULTILINE)
+_CONCURRENT_INDEX_RE = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE
+)
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     INTEGER PRIMARY KEY,
+        name        TEXT NOT NULL,
+        checksum    TEXT NOT NULL,
+        applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+    checksum: str
+    transactional: bool = True
+
+    def statements(self) -> list[str]:
+        """no-transaction 파일을 문장 단위로 나눈다 (주석 제거, 줄 끝의 ; 가 문장 끝)"""
+        statements, current = [], []
+        for line in self.sql.splitlines():
+            line = line.split("--", 1)[0].rstrip()
+            if not line:
+                continue
+            current.append(line)
+            if line.endswith(";"):
+                statements.append("\n".join(current))
+                current = []
+        if current:
+            raise ValueError(f"migration {self.version:04d}_{self.name}: last statement has no terminating ';'")
+        return statements
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations: dict[int, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        m = _FILE_RE.match(path.name)
+        if not m:
+            raise ValueError(f"invalid migration file name: {path.name} (expected NNNN_name.sql)")
+        version = int(m.group(1))
+        if version in migrations:
+            raise ValueError(f"duplicate migration version {version}: {path.name}")
+        sql = path.read_text(encoding="utf-8")
+        transactional = not _NO_TRANSACTION_RE.search(sql)
+        if not transactional and "$$" in sql:
+            # 줄 단위 분리라서 함수 / DO 블록은 나눌 수 없다. 그런 문장은 트랜잭션 마이그레이션으로 따로 뺀다.
+            raise ValueError(f"no-transaction migration {path.name} must not contain $$ blocks")
+        migrations[version] = Migration(
+            version=version,
+            name=m.group(2),
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode()).hexdigest(),
+            transactional=transactional,
+        )
+    return [migrations[v] for v in sorted(migrations)]
+
+
+async def applied_versions(conn: asyncpg.Connection) -> dict[int, str]:
+    """적용된 버전 → checksum"""
+    await conn.execute(SCHEMA_MIGRATIONS_DDL)
+    rows = await conn.fetch("SELECT version, checksum FROM schema_migrations ORDER BY version")
+    return {r["version"]: r["checksum"] for r in rows}
+
+
+def _verify(migrations: list[Migration], applied: dict[int, str]) -> None:
+    known = {m.version: m for m in migrations}
+    for version, checksum in applied.items():
+        m = known.get(version)
+        if m is None:
+            raise RuntimeError(f"migration {version:04d} is applied but its file is missing")
+        if m.checksum != checksum:
+            raise RuntimeError(f"migration {version:04d}_{m.name} was modified after it was applied")
+
+
+async def _record(conn: asyncpg.Connection, m: Migration) -> None:
+    await conn.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+        m.version, m.name, m.checksum,
+    )
+
+
+async def _drop_invalid_indexes(conn: asyncpg.Connection, m: Migration) -> None:
+    """이전 실행에서 CONCURRENTLY 빌드가 실패해 INVALID 로 남은 인덱스를 지운다 (다음 문장에서 다시 만든다)"""
+    for name in _CONCURRENT_INDEX_RE.findall(m.sql):
+        invalid = await conn.fetchval(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name
+        )
+        if invalid:
+            await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+async def migrate(conn: asyncpg.Connection, target: Optional[int] = None) -> list[Migration]:
+    """미적용 마이그레이션을 순서대로 적용하고 적용한 목록을 반환"""
+    migrations = discover()
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+    try:
+        applied = await applied_versions(conn)
+        _verify(migrations, applied)
+
+        done = []
+        for m in migrations:
+            if m.version in applied or (target is not None and m.version > target):
+                continue
+            if m.transactional:
+                async with conn.transaction():
+                    await conn.execute(m.sql)
+                    await _record(conn, m)
+            else:
+                await _drop_invalid_indexes(conn, m)
+                for statement in m.statements():
+                    await conn.execute(statement)
+                await _record(conn, m)
+            done.append(m)
+        return done
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+
+async def status(conn: asyncpg.Connection) -> list[dict[str, Any]]:
+    migrations = discover()
+    applied = await applied_versions(conn)
+    return [
+        {
+            "version": m.version,
+            "name": m.name,
+            "applied": m.version in applied,
+            "modified": m.version in applied and applied[m.version] != m.checksum,
+        }
+        for m in migrations
+    ]
+
+
+# ==========================
+# access path 확인 (EXPLAIN)
+# ==========================
+
+# 인덱스로 읽어야 하는 테이블과, 확인할 statement (backend.statements 에 등록된 이름)
+ACCESS_TABLES = {"savings", "investments", "assets", "debts", "plans", "revenues", "expenses", "taxes"}
+CHECKED_STATEMENTS = (
+    "snapshot.user",
+    "snapshot.plan",
+    "plans.inputs",
+    "plans.inputs_plan_only",
+    "plans.titles",
+    "savings.list",
+    "investments.list",
+    "assets.list",
+    "debts.list",
+    "expenses.list",
+    "taxes.list",
+    "savings.list_after",
+    "investments.list_after",
+    "assets.list_after",
+    "debts.list_after",
+    "expenses.list_after",
+)
+
+
+# EXPLAIN 에 넘길 파라미터 값 (그 외 타입은 0)
+_DUMMY_PARAMS = {
+    "timestamptz": datetime.now(timezone.utc),
+    "timestamp": datetime.now(),
+    "date": date.today(),
+    "text": "",
+    "bool": False,
+}
+
+
+def _walk(node: dict[str, Any]):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+async def explain_statement(conn: asyncpg.Connection, sql: str) -> dict[str, Any]:
+    """
+    파라미터를 타입별 더미 값(숫자 0, 시각 now 등)으로 채워 EXPLAIN. 개발 DB 처럼 테이블이 작으면 플래너가 당연히 seq scan 을 고르므로
+    enable_seqscan 을 끄고 본다 — "이 access path 에 쓸 수 있는 인덱스가 있는가" 를 확인하는 용도.
+    Sort 노드 수는 참고용 (작은 테이블에서는 bitmap scan + sort 가 더 싸다고 볼 수 있어서 실패로 치지 않는다).
+    """
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        stmt = await conn.prepare(f"EXPLAIN (FORMAT JSON) {sql}")
+        raw = await stmt.fetchval(*(_DUMMY_PARAMS.get(t.name, 0) for t in stmt.get_parameters()))
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+    seq_scans, index_scans, sorts = [], [], 0
+    for node in _walk(plan):
+        if node["Node Type"] == "Sort":
+            sorts += 1
+        relation = node.get("Relation Name")
+        if relation not in ACCESS_TABLES:
+            continue
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.append(relation)
+        elif node["Node Type"] == "Bitmap Heap Scan":
+            indexes = [n["Index Name"] for n in _walk(node) if n["Node Type"] == "Bitmap Index Scan"]
+            index_scans.append(f"{relation}:{'+'.join(indexes)} (bitmap)")
+        else:
+            index_scans.append(f"{relation}:{node.get('Index Name', node['Node Type'])}")
+    return {
+        "ok": bool(index_scans) and not seq_scans,
+        "index_scans": index_scans,
+        "seq_scans": seq_scans,
+        "sorts": sorts,
+    }
+
+
+async def check_access_paths(conn: asyncpg.Connection) -> dict[str, dict[str, Any]]:
+    from backend.statements import load_registered
+
+    statements = load_registered()
+    return {name: await explain_statement(conn, statements.get(name).sql) for name in CHECKED_STATEMENTS}
+
+
+# ==========================
+# CLI
+# ==========================
+async def _run(args: argparse.Namespace) -> int:
+    conn = await connect(init_hooks=False)
+    try:
+        if args.command == "up":
+            done = await migrate(conn, target=args.to)
+            for m in done:
+                print(f"applied {m.version:04d}_{m.name}")
+            if not done:
+                print("already up to date")
+            return 0
+
+        if args.command == "status":
+            for s in await status(conn):
+                mark = "applied" if s["applied"] else "pending"
+                if s["modified"]:
+                    mark = "MODIFIED"
+                print(f"{s['version']:04d}_{s['name']:<40} {mark}")
+            return 0
+
+        results = await check_access_paths(conn)
+        for name, r in results.items():
+            detail = ", ".join(r["index_scans"]) or "-"
+            if r["seq_scans"]:
+                detail += f" | seq scan: {', '.join(r['seq_scans'])}"
+            if r["sorts"]:
+                detail += f" | sort nodes: {r['sorts']}"
+            print(f"{'ok  ' if r['ok'] else 'FAIL'} {name:<26} {detail}")
+        return 0 if all(r["ok"] for r in results.values()) else 1
+    finally:
+        await conn.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.migrate", description="스키마 마이그레이션 적용 / 확인")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("up", help="미적용 마이그레이션 적용")
+    up.add_argument("--to", type=int, default=None, help="이 버전까지만 적용")
+    sub.add_parser("status", help="적용 / 미적용 목록")
+    sub.add_parser("check", help="핫 쿼리가 인덱스를 쓰는지 EXPLAIN 으로 확인")
+    args = parser.parse_args(argv)
+
+    sys.exit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
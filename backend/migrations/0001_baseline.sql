@@ -0,0 +1,180 @@
+-- 0001 baseline: 마이그레이션 도입 전 스키마.
+-- 운영 DB 에서 덤프한 것이 아니라, 마이그레이션 도입 시점의 코드 (backend/schemas 의 enum 과 필드, 라우트 SQL 이 읽고 쓰는
+-- 컬럼과 NULL 처리) 에서 다시 만든 정의다. 그래서 기존 DB 와 제약 이름이나 기본값 같은 세부가 다를 수 있다.
+-- 기존 DB 는 건드리지 않도록 users 테이블이 이미 있으면 아무것도 하지 않는다 (적용 기록만 남음). 새 DB 에서만 스키마를 만든다.
+
+DO $$
+BEGIN
+    IF to_regclass('users') IS NOT NULL THEN
+        RAISE NOTICE '0001_baseline: existing schema found, nothing to do';
+        RETURN;
+    END IF;
+
+    -- ===== enum 타입 =====
+    BEGIN
+        CREATE TYPE gender_type AS ENUM ('MALE', 'FEMALE', 'OTHER');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE compound_type AS ENUM ('COMPOUND', 'SIMPLE');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE frequency_type AS ENUM ('YEARLY', 'MONTHLY', 'WEEKLY', 'DAILY');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE saving_type AS ENUM ('DEPOSIT', 'INSTALLMENT', 'CASH', 'SUBSCRIPTION');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE invest_type AS ENUM ('STOCK', 'BOND', 'ETF', 'FUND', 'CRYPTO');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE asset_type AS ENUM ('HOUSE', 'JEWELRY', 'REAL_ESTATE');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE debt_type AS ENUM ('STUDENT_LOAN', 'CREDIT_LOAN', 'LIVING_EXPENSE_LOAN', 'MORTGAGE');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE revenue_type AS ENUM ('INCOME');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE expense_type AS ENUM ('EXPENSE');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    BEGIN
+        CREATE TYPE tax_type AS ENUM ('INCOME_TAX');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END;
+
+    -- ===== 유저 =====
+    CREATE TABLE IF NOT EXISTS users (
+        id          BIGSERIAL PRIMARY KEY,
+        username    TEXT NOT NULL UNIQUE,
+        birth       DATE,
+        gender      gender_type,
+        purpose     TEXT,
+        created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    -- ===== 유저 재정 상태 =====
+    CREATE TABLE IF NOT EXISTS savings (
+        id                 BIGSERIAL PRIMARY KEY,
+        user_id            BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category           saving_type NOT NULL,
+        amount             NUMERIC(18,2) NOT NULL DEFAULT 0,
+        interest_rate      NUMERIC(8,4) DEFAULT 0,
+        compound           compound_type NOT NULL DEFAULT 'COMPOUND',
+        deposit            NUMERIC(18,2) DEFAULT 0,
+        deposit_frequency  frequency_type,
+        maturity_date      DATE,
+        created_at         TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at         TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS investments (
+        id                 BIGSERIAL PRIMARY KEY,
+        user_id            BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category           invest_type NOT NULL,
+        amount             NUMERIC(18,2) NOT NULL DEFAULT 0,
+        roi                NUMERIC(8,4) DEFAULT 0,
+        dividend           NUMERIC(8,4) DEFAULT 0,
+        deposit            NUMERIC(18,2) DEFAULT 0,
+        deposit_frequency  frequency_type,
+        maturity_date      DATE,
+        created_at         TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at         TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS assets (
+        id             BIGSERIAL PRIMARY KEY,
+        user_id        BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category       asset_type NOT NULL,
+        interest_rate  NUMERIC(8,4) DEFAULT 0,
+        roi            NUMERIC(8,4) DEFAULT 0,
+        dividend       NUMERIC(8,4) DEFAULT 0,
+        amount         NUMERIC(18,2) NOT NULL DEFAULT 0,
+        loan_amount    NUMERIC(18,2) DEFAULT 0,
+        repay_amount   NUMERIC(18,2) DEFAULT 0,
+        created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS debts (
+        id             BIGSERIAL PRIMARY KEY,
+        user_id        BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        category       debt_type NOT NULL,
+        loan_amount    NUMERIC(18,2) NOT NULL DEFAULT 0,
+        repay_amount   NUMERIC(18,2) NOT NULL DEFAULT 0,
+        interest_rate  NUMERIC(8,4) NOT NULL DEFAULT 0,
+        compound       compound_type NOT NULL DEFAULT 'COMPOUND',
+        created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    -- ===== 플랜 =====
+    CREATE TABLE IF NOT EXISTS plans (
+        id                   BIGSERIAL PRIMARY KEY,
+        user_id              BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        title                TEXT NOT NULL,
+        description          TEXT,
+        roi                  NUMERIC(8,4),
+        dividend             NUMERIC(8,4),
+        inflation            NUMERIC(8,4),
+        interest_rate        NUMERIC(8,4),
+        priority             JSONB,
+        retirement_year      INTEGER,
+        expected_death_year  INTEGER,
+        created_at           TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at           TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS revenues (
+        id          BIGSERIAL PRIMARY KEY,
+        plan_id     BIGINT NOT NULL REFERENCES plans(id) ON DELETE CASCADE,
+        category    revenue_type NOT NULL,
+        amount      NUMERIC(18,2) NOT NULL,
+        frequency   frequency_type NOT NULL,
+        start_date  DATE,
+        end_date    DATE,
+        created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS expenses (
+        id          BIGSERIAL PRIMARY KEY,
+        plan_id     BIGINT NOT NULL REFERENCES plans(id) ON DELETE CASCADE,
+        category    expense_type NOT NULL,
+        amount      NUMERIC(18,2) NOT NULL,
+        frequency   frequency_type NOT NULL,
+        start_date  DATE,
+        end_date    DATE,
+        created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+
+    CREATE TABLE IF NOT EXISTS taxes (
+        id          BIGSERIAL PRIMARY KEY,
+        plan_id     BIGINT NOT NULL REFERENCES plans(id) ON DELETE CASCADE,
+        category    tax_type NOT NULL,
+        rate        NUMERIC(8,4) NOT NULL DEFAULT 0,
+        frequency   frequency_type NOT NULL DEFAULT 'YEARLY',
+        created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+END $$;
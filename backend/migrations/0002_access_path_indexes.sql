@@ -0,0 +1,17 @@
+-- 0002 access path 인덱스
+-- 핫 쿼리는 전부 user_id / plan_id 로 거르고 created_at DESC (동률은 id DESC) 로 정렬한다
+-- (목록 조회, 스냅샷 json_agg, 대시보드, backend.cohort 의 스트림 커서).
+-- 같은 인덱스를 역방향으로 읽으면 created_at ASC (플랜 제목 목록) 도 처리된다.
+-- FK 컬럼 인덱스를 겸하므로 users/plans 삭제 시 CASCADE 도 테이블 전체를 훑지 않는다.
+-- 운영 중인 테이블의 쓰기를 막지 않도록 CONCURRENTLY 로 만든다 (트랜잭션 밖에서만 가능).
+-- migrate:no-transaction
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS savings_user_created_idx     ON savings     (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS investments_user_created_idx ON investments (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS assets_user_created_idx      ON assets      (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS debts_user_created_idx       ON debts       (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS plans_user_created_idx       ON plans       (user_id, created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS revenues_plan_created_idx    ON revenues    (plan_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS expenses_plan_created_idx    ON expenses    (plan_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS taxes_plan_created_idx       ON taxes       (plan_id, created_at DESC, id DESC);
@@ -0,0 +1,158 @@
+-- 0003 유저별 재정 요약 (대시보드 / 목록 헤더용)
+-- 저축/투자/자산/부채 행이 바뀔 때마다 트리거가 증감분만 반영하므로 보유 항목 수와 상관없이 한 행만 읽으면 된다.
+-- 같은 트랜잭션 안에서 갱신되어 원본 테이블과 어긋나지 않는다. version 은 갱신마다 1 씩 오른다.
+
+CREATE TABLE IF NOT EXISTS user_financial_summary (
+    user_id            BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    savings_total      NUMERIC(18,2) NOT NULL DEFAULT 0,
+    savings_count      INTEGER NOT NULL DEFAULT 0,
+    investments_total  NUMERIC(18,2) NOT NULL DEFAULT 0,
+    investments_count  INTEGER NOT NULL DEFAULT 0,
+    assets_total       NUMERIC(18,2) NOT NULL DEFAULT 0,
+    assets_count       INTEGER NOT NULL DEFAULT 0,
+    asset_loans_total  NUMERIC(18,2) NOT NULL DEFAULT 0,  -- 자산 담보 대출 잔액
+    debts_total        NUMERIC(18,2) NOT NULL DEFAULT 0,
+    debts_count        INTEGER NOT NULL DEFAULT 0,
+    monthly_repayment  NUMERIC(18,2) NOT NULL DEFAULT 0,  -- 부채 + 자산 담보 대출 월 상환액
+    version            BIGINT NOT NULL DEFAULT 1,
+    updated_at         TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 행 하나의 기여분(sign = 1 추가 / -1 제거)을 요약에 반영
+CREATE OR REPLACE FUNCTION user_financial_summary_add(tbl TEXT, r JSONB, sign INTEGER) RETURNS void AS $$
+DECLARE
+    uid     BIGINT  := (r->>'user_id')::BIGINT;
+    amount  NUMERIC := COALESCE((r->>'amount')::NUMERIC, 0) * sign;
+    loan    NUMERIC := COALESCE((r->>'loan_amount')::NUMERIC, 0) * sign;
+    repay   NUMERIC := COALESCE((r->>'repay_amount')::NUMERIC, 0) * sign;
+    d_savings_total      NUMERIC := 0;
+    d_savings_count      INTEGER := 0;
+    d_investments_total  NUMERIC := 0;
+    d_investments_count  INTEGER := 0;
+    d_assets_total       NUMERIC := 0;
+    d_assets_count       INTEGER := 0;
+    d_asset_loans_total  NUMERIC := 0;
+    d_debts_total        NUMERIC := 0;
+    d_debts_count        INTEGER := 0;
+    d_monthly_repayment  NUMERIC := 0;
+BEGIN
+    IF tbl = 'savings' THEN
+        d_savings_total := amount;
+        d_savings_count := sign;
+    ELSIF tbl = 'investments' THEN
+        d_investments_total := amount;
+        d_investments_count := sign;
+    ELSIF tbl = 'assets' THEN
+        d_assets_total := amount;
+        d_assets_count := sign;
+        d_asset_loans_total := loan;
+        d_monthly_repayment := repay;
+    ELSIF tbl = 'debts' THEN
+        d_debts_total := loan;
+        d_debts_count := sign;
+        d_monthly_repayment := repay;
+    END IF;
+
+    IF sign > 0 THEN
+        INSERT INTO user_financial_summary AS s (
+            user_id, savings_total, savings_count, investments_total, investments_count,
+            assets_total, assets_count, asset_loans_total, debts_total, debts_count, monthly_repayment
+        )
+        VALUES (
+            uid, d_savings_total, d_savings_count, d_investments_total, d_investments_count,
+            d_assets_total, d_assets_count, d_asset_loans_total, d_debts_total, d_debts_count, d_monthly_repayment
+        )
+        ON CONFLICT (user_id) DO UPDATE SET
+            savings_total     = s.savings_total + EXCLUDED.savings_total,
+            savings_count     = s.savings_count + EXCLUDED.savings_count,
+            investments_total = s.investments_total + EXCLUDED.investments_total,
+            investments_count = s.investments_count + EXCLUDED.investments_count,
+            assets_total      = s.assets_total + EXCLUDED.assets_total,
+            assets_count      = s.assets_count + EXCLUDED.assets_count,
+            asset_loans_total = s.asset_loans_total + EXCLUDED.asset_loans_total,
+            debts_total       = s.debts_total + EXCLUDED.debts_total,
+            debts_count       = s.debts_count + EXCLUDED.debts_count,
+            monthly_repayment = s.monthly_repayment + EXCLUDED.monthly_repayment,
+            version           = s.version + 1,
+            updated_at        = now();
+    ELSE
+        -- 제거는 행이 있을 때만 (유저 삭제 CASCADE 중이면 요약 행이 이미 없을 수 있다)
+        UPDATE user_financial_summary SET
+            savings_total     = savings_total + d_savings_total,
+            savings_count     = savings_count + d_savings_count,
+            investments_total = investments_total + d_investments_total,
+            investments_count = investments_count + d_investments_count,
+            assets_total      = assets_total + d_assets_total,
+            assets_count      = assets_count + d_assets_count,
+            asset_loans_total = asset_loans_total + d_asset_loans_total,
+            debts_total       = debts_total + d_debts_total,
+            debts_count       = debts_count + d_debts_count,
+            monthly_repayment = monthly_repayment + d_monthly_repayment,
+            version           = version + 1,
+            updated_at        = now()
+        WHERE user_id = uid;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION user_financial_summary_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM user_financial_summary_add(TG_TABLE_NAME, to_jsonb(OLD), -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM user_financial_summary_add(TG_TABLE_NAME, to_jsonb(NEW), 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 트리거 생성과 기존 데이터 집계 사이에 쓰기가 끼어들지 않도록
+LOCK TABLE savings, investments, assets, debts IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS savings_financial_summary ON savings;
+CREATE TRIGGER savings_financial_summary
+    AFTER INSERT OR UPDATE OR DELETE ON savings
+    FOR EACH ROW EXECUTE FUNCTION user_financial_summary_trigger();
+
+DROP TRIGGER IF EXISTS investments_financial_summary ON investments;
+CREATE TRIGGER investments_financial_summary
+    AFTER INSERT OR UPDATE OR DELETE ON investments
+    FOR EACH ROW EXECUTE FUNCTION user_financial_summary_trigger();
+
+DROP TRIGGER IF EXISTS assets_financial_summary ON assets;
+CREATE TRIGGER assets_financial_summary
+    AFTER INSERT OR UPDATE OR DELETE ON assets
+    FOR EACH ROW EXECUTE FUNCTION user_financial_summary_trigger();
+
+DROP TRIGGER IF EXISTS debts_financial_summary ON debts;
+CREATE TRIGGER debts_financial_summary
+    AFTER INSERT OR UPDATE OR DELETE ON debts
+    FOR EACH ROW EXECUTE FUNCTION user_financial_summary_trigger();
+
+-- 기존 데이터로 초기값 채우기
+TRUNCATE user_financial_summary;
+INSERT INTO user_financial_summary (
+    user_id, savings_total, savings_count, investments_total, investments_count,
+    assets_total, assets_count, asset_loans_total, debts_total, debts_count, monthly_repayment
+)
+SELECT
+    u.id,
+    COALESCE(s.total, 0), COALESCE(s.n, 0),
+    COALESCE(i.total, 0), COALESCE(i.n, 0),
+    COALESCE(a.total, 0), COALESCE(a.n, 0), COALESCE(a.loans, 0),
+    COALESCE(d.total, 0), COALESCE(d.n, 0),
+    COALESCE(a.repay, 0) + COALESCE(d.repay, 0)
+FROM users u
+LEFT JOIN (SELECT user_id, sum(amount) AS total, count(*) AS n FROM savings GROUP BY user_id) s ON s.user_id = u.id
+LEFT JOIN (SELECT user_id, sum(amount) AS total, count(*) AS n FROM investments GROUP BY user_id) i ON i.user_id = u.id
+LEFT JOIN (
+    SELECT user_id, sum(amount) AS total, count(*) AS n,
+           sum(COALESCE(loan_amount, 0)) AS loans, sum(COALESCE(repay_amount, 0)) AS repay
+    FROM assets GROUP BY user_id
+) a ON a.user_id = u.id
+LEFT JOIN (
+    SELECT user_id, sum(loan_amount) AS total, count(*) AS n, sum(repay_amount) AS repay
+    FROM debts GROUP BY user_id
+) d ON d.user_id = u.id
+WHERE s.user_id IS NOT NULL OR i.user_id IS NOT NULL OR a.user_id IS NOT NULL OR d.user_id IS NOT NULL;
@@ -0,0 +1,19 @@
+-- 0004 샤드 디렉터리 (backend.shards)
+-- 모든 샤드에 만들어지지만 샤드 0 (DB_HOST) 의 것만 읽는다.
+-- 샤드가 하나뿐이면 비어 있고 아무 영향이 없다.
+
+-- 샤드 배치: 행은 하나뿐 (python -m backend.shards init 이 채운다)
+-- legacy_max_user_id 이하의 유저는 샤딩 전부터 있던 유저라 샤드 0 에 있다. 그보다 큰 id 는 id % shard_count 번 샤드.
+CREATE TABLE IF NOT EXISTS shard_layout (
+    singleton           BOOLEAN PRIMARY KEY DEFAULT true CHECK (singleton),
+    shard_count         INTEGER NOT NULL CHECK (shard_count >= 1),
+    legacy_max_user_id  BIGINT NOT NULL DEFAULT 0,
+    updated_at          TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 규칙과 다른 샤드에 있는 유저 (rebalance 로 옮긴 유저 등)
+CREATE TABLE IF NOT EXISTS user_shard_overrides (
+    user_id   BIGINT PRIMARY KEY,
+    shard     INTEGER NOT NULL CHECK (shard >= 0),
+    moved_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
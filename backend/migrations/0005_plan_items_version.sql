@@ -0,0 +1,37 @@
+-- 0005 플랜 하위 항목 버전 (GET /api/plans/{id} 조건부 응답용)
+-- 수입/지출/세금 행이 추가/수정/삭제될 때마다 트리거가 플랜 행의 items_version 을 올리고 items_updated_at 을 남긴다.
+-- 삭제는 하위 테이블에 흔적이 남지 않으므로 count / max(updated_at) 대신 플랜 행 하나만 읽으면 되게 한다.
+-- plans.updated_at 은 플랜 자체 수정 시각 그대로 둔다.
+
+ALTER TABLE plans ADD COLUMN IF NOT EXISTS items_version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE plans ADD COLUMN IF NOT EXISTS items_updated_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION plan_items_version_trigger() RETURNS trigger AS $$
+BEGIN
+    -- 플랜 삭제 CASCADE 중이면 플랜 행이 이미 없어서 아무 것도 갱신하지 않는다
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE plans SET items_version = items_version + 1, items_updated_at = now()
+        WHERE id = OLD.plan_id;
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.plan_id IS DISTINCT FROM OLD.plan_id) THEN
+        UPDATE plans SET items_version = items_version + 1, items_updated_at = now()
+        WHERE id = NEW.plan_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS revenues_plan_items_version ON revenues;
+CREATE TRIGGER revenues_plan_items_version
+    AFTER INSERT OR UPDATE OR DELETE ON revenues
+    FOR EACH ROW EXECUTE FUNCTION plan_items_version_trigger();
+
+DROP TRIGGER IF EXISTS expenses_plan_items_version ON expenses;
+CREATE TRIGGER expenses_plan_items_version
+    AFTER INSERT OR UPDATE OR DELETE ON expenses
+    FOR EACH ROW EXECUTE FUNCTION plan_items_version_trigger();
+
+DROP TRIGGER IF EXISTS taxes_plan_items_version ON taxes;
+CREATE TRIGGER taxes_plan_items_version
+    AFTER INSERT OR UPDATE OR DELETE ON taxes
+    FOR EACH ROW EXECUTE FUNCTION plan_items_version_trigger();
@@ -0,0 +1,199 @@
+# backend/pagination.py
+"""
+목록 조회 keyset 페이지네이션 + 컬럼 선택 (fields=)
+
+목록은 전부 created_at DESC NULLS LAST, id DESC 순서다. OFFSET 대신 직전 페이지 마지막 행의 (created_at, id) 다음부터
+읽으므로 (user_id|plan_id, created_at DESC, id DESC) 인덱스(0002)를 그대로 타고, 뒤쪽 페이지도 앞쪽만큼 싸다.
+created_at 이 NULL 인 행(마이그레이션 도입 전 운영 데이터)은 인덱스에서 맨 앞이라 NULLS LAST 로 읽으려면 따로 읽어야 한다:
+NULL 이 아닌 행과 NULL 인 행을 각각 인덱스 순서로 LIMIT 만큼 읽고 (UNION ALL) 합친 것을 다시 정렬한다.
+커서의 created_at 도 NULL 일 수 있다 (NULL 구간 안의 커서면 id 만으로 이어 읽는다).
+
+- ?limit=N          : 최대 N 행. 더 있으면 응답 헤더 X-Next-Cursor 에 다음 페이지 커서를 준다.
+                      limit 이 없으면 예전처럼 전부 (응답은 그대로 리스트).
+- ?cursor=...       : X-Next-Cursor 로 받은 값 (불투명 문자열)
+- ?fields=id,amount : 고른 컬럼만 SELECT 하고 응답에도 그 키만 담는다.
+                      컬럼 조합별 SQL 을 만들어 두므로 asyncpg statement 캐시에서 재사용된다.
+
+행은 저장소(backend.repository)의 fetch_page 가 읽는다: Postgres 는 아래 SQL 을, 인메모리 구현은 같은 정의
+(columns / key / 정렬)를 그대로 해석한다.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_jsonable_python
+
+from backend import responses
+from backend.responses import fast_json
+from backend.statements import Statement, statements
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# 커서를 만들려면 항상 읽어야 하는 컬럼
+_KEY_COLUMNS = ("created_at", "id")
+# 목록 순서
+LIST_ORDER = "created_at DESC NULLS LAST, id DESC"
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    # created_at 이 NULL 이면 빈 문자열
+    raw = f"{created_at.isoformat() if created_at is not None else ''}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+
+
+class PageParams:
+    """목록 라우트의 쿼리 파라미터 (Depends() 로 받는다)"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="페이지 크기 (없으면 전부)"),
+        cursor: Optional[str] = Query(None, description=f"이전 응답의 {NEXT_CURSOR_HEADER} 헤더 값"),
+        fields: Optional[str] = Query(None, description="쉼표로 구분한 컬럼 목록 (예: id,amount)"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+
+class KeysetList:
+    """
+    테이블 하나의 목록 조회.
+
+    columns 는 응답 키 → SELECT 식 (예: "amount": "COALESCE(amount, 0)").
+    전체 컬럼 조회는 이름을 붙여 statements 에 등록하고 ({name}, {name}_after),
+    fields 로 고른 조합은 처음 쓸 때 만들어 둔다. LIMIT 에 NULL 을 넘기면 전부 읽는다.
+    """
+
+    def __init__(self, name: str, table: str, key: str, columns: dict[str, str]):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.columns = dict(columns)
+        self.first = statements.register(name, self._sql(tuple(self.columns), after=False))
+        self.after = statements.register(f"{name}_after", self._sql(tuple(self.columns), after=True))
+        self._projections: dict[tuple[str, ...], tuple[Statement, Statement]] = {}
+
+    def _sql(self, selected: tuple[str, ...], after: bool) -> str:
+        cols = ",\n        ".join(
+            c if self.columns[c] == c else f"{self.columns[c]} AS {c}" for c in selected
+        )
+        if after:
+            # 커서가 NULL 구간이면 ($2 IS NULL) 앞쪽은 비고, 뒤쪽은 id 로 이어 읽는다
+            dated = f"{self.key} = $1 AND (created_at, id) < ($2, $3)"
+            undated = f"{self.key} = $1 AND created_at IS NULL AND ($2::timestamptz IS NOT NULL OR id < $3)"
+            limit = "$4"
+        else:
+            dated = f"{self.key} = $1 AND created_at IS NOT NULL"
+            undated = f"{self.key} = $1 AND created_at IS NULL"
+            limit = "$2"
+        return f"""
+    (SELECT
+        {cols}
+    FROM {self.table}
+    WHERE {dated}
+    ORDER BY created_at DESC, id DESC
+    LIMIT {limit})
+    UNION ALL
+    (SELECT
+        {cols}
+    FROM {self.table}
+    WHERE {undated}
+    ORDER BY created_at DESC, id DESC
+    LIMIT {limit})
+    ORDER BY {LIST_ORDER}
+    LIMIT {limit}
+"""
+
+    def array_columns(self, prefix: str, key_expr: str) -> str:
+        """
+        목록 전체를 컬럼별 배열 하나씩으로 읽는 서브쿼리 (행 하나, 컬럼 이름 "{prefix}.{응답 키}", 배열 순서 = 목록 순서).
+        다른 문장의 FROM 에 붙여 여러 목록을 한 문장으로 읽을 때 쓴다 (Repository.versioned_lists).
+        배열 원소는 asyncpg 가 컬럼 타입 그대로 디코딩하므로 fetch_page 의 행과 값 / 타입이 같다.
+        """
+        cols = ",\n            ".join(
+            f'array_agg({expr} ORDER BY {LIST_ORDER}) AS "{prefix}.{c}"' for c, expr in self.columns.items()
+        )
+        return f"""(
+        SELECT
+            {cols}
+        FROM {self.table}
+        WHERE {self.key} = {key_expr}
+    )"""
+
+    def rows_from_arrays(self, row, prefix: str) -> list[dict[str, Any]]:
+        """array_columns 로 읽은 row → 행 목록 (행이 없으면 array_agg 가 NULL)"""
+        arrays = [row[f"{prefix}.{c}"] or () for c in self.columns]
+        return [dict(zip(self.columns, values)) for values in zip(*arrays)]
+
+    def selected(self, fields: Optional[list[str]]) -> tuple[str, ...]:
+        """SELECT 할 응답 키 (fields + 커서용 키, 정의 순서). 모르는 필드는 ValueError"""
+        if not fields:
+            return tuple(self.columns)
+        unknown = [f for f in fields if f not in self.columns]
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(unknown)} (allowed: {', '.join(self.columns)})")
+        # 순서를 정규화해서 같은 조합은 같은 SQL 이 되게
+        wanted = set(fields) | set(_KEY_COLUMNS)
+        return tuple(c for c in self.columns if c in wanted)
+
+    def statements_for(self, fields: Optional[list[str]]) -> tuple[Statement, Statement]:
+        """(첫 페이지, 커서 다음 페이지) SQL. 인자는 ($1 key, $2 limit) / ($1 key, $2 created_at, $3 id, $4 limit)"""
+        if not fields:
+            return self.first, self.after
+        selected = self.selected(fields)
+        pair = self._projections.get(selected)
+        if pair is None:
+            label = f"{self.name}[{','.join(selected)}]"
+            pair = (
+                Statement(label, self._sql(selected, after=False)),
+                Statement(f"{label}_after", self._sql(selected, after=True)),
+            )
+            self._projections[selected] = pair
+        return pair
+
+    def finish(
+        self, rows: list[dict[str, Any]], limit: Optional[int], fields: Optional[list[str]]
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """
+        limit + 1 행까지 읽은 결과 → (페이지, 다음 커서).
+        저장소(backend.repository)가 행을 읽은 뒤 부른다: 커서 계산 후 fields 에 없는 키는 뺀다.
+        """
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        if fields:
+            keep = set(fields)
+            return [{k: v for k, v in r.items() if k in keep} for r in rows], next_cursor
+        return rows, next_cursor
+
+    async def respond(self, repo, key: int, page: PageParams, response: Response):
+        """
+        라우트에서 그대로 반환. 행은 이미 모델 모양이라 검증 없이 fast_json 으로 내보낸다 (backend.responses).
+        FAST_JSON=0 이면 전체 컬럼은 리스트 (response_model 로 검증), fields 를 고르면 모델의 필수 키가 빠지므로
+        JSONResponse 로 바로 내보낸다 (날짜 형식은 모델 직렬화와 같음).
+        """
+        try:
+            rows, next_cursor = await repo.fetch_page(self, key, page.limit, page.cursor, page.fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        if page.fields and not responses.FAST_JSON:
+            return JSONResponse(to_jsonable_python(rows), headers=dict(response.headers))
+        return fast_json(rows, response)
@@ -0,0 +1,120 @@
+# backend/projection.py
+"""
+플랜 projection(연도별 요약) 계산 헬퍼
+
+get_plan_details 와 월 전환 스케줄러가 같은 경로로 시뮬레이션을 돌리도록
+플랜 조회 → 스냅샷 로드 → run_simulation → get_yearly_summary 흐름을 한 곳에 모은다.
+"""
+import json
+from datetime import date
+from typing import Any, Callable, Optional
+
+from backend.schemas.priority import PlanPriority
+from backend.schemas.simulation import SimulationRequest, SimulationDefault
+from backend.simulation import run_simulation, get_yearly_summary
+from backend.cache import snapshot_cache
+from backend.snapshot import USER_ITEMS
+
+# get_yearly_summary 결과 중 응답에 그대로 싣는 시계열 키
+SUMMARY_KEYS = (
+    "labels",
+    "net_worth",
+    "net_cash_flow",
+    "total_repayment",
+    "total_savings",
+    "total_investments",
+    "total_debts",
+    "total_assets",
+    "total_income",
+    "total_spend",
+    "total_dividend",
+    "total_deposit",
+    "total_tax",
+)
+
+
+def month_key(d: date) -> tuple[int, int]:
+    """projection 유효 단위: 시뮬레이션 시작 월 (year, month)"""
+    return (d.year, d.month)
+
+
+PLAN_COLUMNS = (
+    "id", "user_id", "title", "roi", "dividend", "inflation", "interest_rate", "description", "priority",
+    "retirement_year", "expected_death_year", "created_at", "updated_at",
+)
+
+def build_simulation_request(plan) -> SimulationRequest:
+    """plan row → SimulationRequest (plan에 저장된 interest_rate 우선, 없으면 fallback)"""
+    priority = plan["priority"]
+    if isinstance(priority, str):
+        priority = json.loads(priority)
+
+    interest_rate = plan["interest_rate"] if plan["interest_rate"] is not None else 0.02
+
+    return SimulationRequest(
+        plan_id=plan["id"],
+        default_value=SimulationDefault(
+            default_interest=interest_rate,
+            default_roi=plan["roi"],
+            default_dividend=plan["dividend"],
+            inflation=plan["inflation"]
+        ),
+        extra_monthly_spend=0.0,
+        priority=PlanPriority(**priority),
+        expected_death_year=plan["expected_death_year"]
+    )
+
+
+def inputs_tag(version: dict[str, Any]) -> tuple:
+    """Repository.plan_version 값 → 시뮬레이션 입력 버전 (projection 캐시 tag)"""
+    return version["plan_updated_at"], version["items_version"], version["holdings_version"]
+
+
+async def load_plan_inputs(
+    repo, user_id: int, plan_id: int, holdings_version: Optional[int] = None
+) -> Optional[dict[str, Any]]:
+    """
+    시뮬레이션에 필요한 데이터 전부 (plan row + 하위 항목 + 유저 스냅샷). 플랜이 없으면 None.
+    repo 는 backend.repository.Repository. 유저 스냅샷이 캐시에 있으면 플랜 쪽만 읽는다.
+    holdings_version 을 주면 그 버전으로 읽은 캐시 스냅샷만 쓴다 (snapshot_cache tag)
+    """
+    user_snapshot = snapshot_cache.get(user_id, tag=holdings_version)
+    version = None if user_snapshot is not None else snapshot_cache.version(user_id)
+    found = await repo.plan_inputs(user_id, plan_id, with_user_items=user_snapshot is None)
+    if found is None:
+        return None
+
+    plan, items = found
+    if user_snapshot is None:
+        user_snapshot = {k: items.pop(k) for k in USER_ITEMS}
+        snapshot_cache.put(user_id, version, user_snapshot, tag=holdings_version)
+
+    snapshot = {**user_snapshot, **items}
+    return {"plan": plan, "snapshot": snapshot}
+
+
+def simulate_plan(
+    inputs: dict[str, Any],
+    start_date: date,
+    progress: Optional[Callable[[float], None]] = None,
+) -> dict[str, Any]:
+    """load_plan_inputs 결과로 시뮬레이션을 돌려 get_plan_details 응답 본문을 만든다 (request 제외)"""
+    plan = inputs["plan"]
+    snapshot = inputs["snapshot"]
+
+    sim_req = build_simulation_request(plan)
+    sim_result = run_simulation(snapshot, sim_req, start_date=start_date, progress=progress)
+    summary = get_yearly_summary(sim_result)
+
+    return {
+        "plan": plan,
+        "revenues": snapshot["revenues"],
+        "expenses": snapshot["expenses"],
+        "taxes_input": snapshot["taxes"],
+        "interest_rate": sim_req.default_value.default_interest,
+        **{k: summary[k] for k in SUMMARY_KEYS},
+        "priority": sim_req.priority,
+        "retirement_year": plan["retirement_year"],
+        "expected_death_year": plan["expected_death_year"],
+    }
+
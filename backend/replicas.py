@@ -0,0 +1,224 @@
+# backend/replicas.py
+"""
+읽기 전용 replica 라우팅
+
+트래픽 대부분이 읽기(플랜 상세, 목록, 제목, 대시보드)라서 GET 요청은 replica 풀에서 연결을 빌린다.
+쓰기(POST/PATCH/DELETE)와 백그라운드 작업(스케줄러/잡)은 그대로 primary 를 쓴다.
+
+- read-your-writes: invalidate_user / invalidate_plan 이 불리면(= 쓰기 커밋 직후) 그 유저 / 플랜을
+  DB_READ_YOUR_WRITES_SEC 동안 primary 에 고정한다. 다른 워커의 쓰기도 LISTEN/NOTIFY 버스로 받아서 고정한다.
+  유저는 요청의 JWT 에서, 플랜은 경로의 plan_id 에서 알아낸다 (DB 조회 없이).
+- 헬스 체크: DB_REPLICA_CHECK_SEC 마다 replica 의 복제 지연을 재서 DB_REPLICA_MAX_LAG_SEC 를 넘거나
+  연결이 안 되면 빼고, 회복되면 다시 넣는다. 쓸 수 있는 replica 가 없으면 primary 로 읽는다.
+- 고정 시간은 최대 허용 지연보다 짧으면 의미가 없으므로 둘 중 큰 값을 쓴다.
+- get_current_user 는 replica 에 아직 없는 방금 만든 유저를 위해 primary 로 한 번 더 확인한다.
+
+환경 변수 (.env, 계정/DB 이름은 primary 와 같은 DB_USER/DB_PASS/DB_NAME)
+- DB_REPLICA_HOSTS: "host[:port],host[:port]" (비어 있으면 replica 없이 전부 primary)
+- DB_REPLICA_POOL_MAX_SIZE: replica 하나당 풀 크기 (기본 DB_POOL_MAX_SIZE)
+- DB_READ_YOUR_WRITES_SEC: 쓰기 후 primary 고정 시간 (기본 5초)
+- DB_REPLICA_MAX_LAG_SEC: 허용 복제 지연 (기본 5초)
+- DB_REPLICA_CHECK_SEC: 헬스 체크 주기 (기본 5초)
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from fastapi import Request
+from jose import JWTError
+
+from backend.auth import decode_token
+from backend.cache import add_publisher
+from backend.db import DB_POOL_MAX_SIZE, DB_POOL_MIN_SIZE, Database, db
+from backend.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+DB_REPLICA_HOSTS = os.getenv("DB_REPLICA_HOSTS", "")
+DB_REPLICA_POOL_MAX_SIZE = int(os.getenv("DB_REPLICA_POOL_MAX_SIZE", str(DB_POOL_MAX_SIZE)))
+DB_READ_YOUR_WRITES_SEC = float(os.getenv("DB_READ_YOUR_WRITES_SEC", "5"))
+DB_REPLICA_MAX_LAG_SEC = float(os.getenv("DB_REPLICA_MAX_LAG_SEC", "5"))
+DB_REPLICA_CHECK_SEC = float(os.getenv("DB_REPLICA_CHECK_SEC", "5"))
+
+# 고정 목록이 이 크기를 넘으면 만료된 항목을 정리
+PIN_SWEEP_THRESHOLD = 10_000
+
+# 복제 지연(초). WAL 을 다 재생했으면 0 (쓰기가 없어서 마지막 재생 시각이 오래된 경우를 지연으로 보지 않도록).
+# primary 에 잘못 붙었으면 NULL 이 아니라 0 이 나오도록 pg_is_in_recovery() 로 거른다.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::float8
+"""
+
+
+def parse_hosts(value: str) -> list[tuple[str, Optional[int]]]:
+    hosts = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        hosts.append((host, int(port) if port else None))
+    return hosts
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: Database,
+        hosts: list[tuple[str, Optional[int]]],
+        pin_sec: float = DB_READ_YOUR_WRITES_SEC,
+        max_lag_sec: float = DB_REPLICA_MAX_LAG_SEC,
+        check_interval: float = DB_REPLICA_CHECK_SEC,
+        pool_max_size: int = DB_REPLICA_POOL_MAX_SIZE,
+    ):
+        self.primary = primary
+        self.replicas = [
+            Database(
+                min_size=min(DB_POOL_MIN_SIZE, pool_max_size),
+                max_size=pool_max_size,
+                host=host,
+                port=port,
+                role="replica",
+                init_hooks=primary._init_hooks,
+            )
+            for host, port in hosts
+        ]
+        self.pin_sec = max(pin_sec, max_lag_sec)
+        self.max_lag_sec = max_lag_sec
+        self.check_interval = check_interval
+        self._user_pins: dict[int, float] = {}
+        self._plan_pins: dict[int, float] = {}
+        self._all_pinned_until = 0.0
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+        self.lag: dict[int, Optional[float]] = {}
+
+        self.replica_reads = 0
+        self.pinned_reads = 0
+        self.fallback_reads = 0
+
+    # ---------- 수명주기 ----------
+    async def start(self) -> None:
+        if not self.replicas:
+            return
+        await self._check_all()
+        self.primary.set_read_router(self.route)
+        self._task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        self.primary.set_read_router(None)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.stop()
+
+    # ---------- read-your-writes ----------
+    def pin(self, kind: str, key: int) -> None:
+        """cache 퍼블리셔 / 무효화 버스 구독자: 방금 쓰인 유저 / 플랜을 primary 에 고정"""
+        until = time.monotonic() + self.pin_sec
+        if kind == "user":
+            self._user_pins[key] = until
+        elif kind == "plan":
+            self._plan_pins[key] = until
+        elif kind == "all":
+            self._all_pinned_until = until
+        for pins in (self._user_pins, self._plan_pins):
+            if len(pins) > PIN_SWEEP_THRESHOLD:
+                now = time.monotonic()
+                for k in [k for k, t in pins.items() if t <= now]:
+                    del pins[k]
+
+    def _pinned(self, request: Request) -> bool:
+        now = time.monotonic()
+        if self._all_pinned_until > now:
+            return True
+        plan_id = str(request.path_params.get("plan_id", ""))
+        if plan_id.isdigit() and self._plan_pins.get(int(plan_id), 0.0) > now:
+            return True
+        auth = request.headers.get("authorization", "")
+        scheme, _, token = auth.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                user_id = decode_token(token)
+            except (JWTError, ValueError):
+                return False
+            return self._user_pins.get(user_id, 0.0) > now
+        return False
+
+    # ---------- 라우팅 ----------
+    def route(self, request: Request) -> Optional[Database]:
+        """db.set_read_router 에 등록되는 함수. None 이면 primary"""
+        if self._pinned(request):
+            self.pinned_reads += 1
+            return None
+        healthy = [r for r in self.replicas if r.started and r.healthy]
+        if not healthy:
+            self.fallback_reads += 1
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        self.replica_reads += 1
+        return healthy[self._next]
+
+    # ---------- 헬스 체크 ----------
+    async def _check(self, i: int, replica: Database) -> None:
+        try:
+            if not replica.started:
+                await asyncio.wait_for(replica.start(), timeout=self.check_interval)
+            async with replica.acquire(timeout=self.check_interval) as conn:
+                lag = await conn.fetchval(REPLICA_LAG_SQL)
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"replica {replica.host}:{replica.port} unhealthy: {e}")
+            replica.healthy = False
+            self.lag[i] = None
+            return
+        healthy = lag <= self.max_lag_sec
+        if healthy != replica.healthy:
+            logger.warning(f"replica {replica.host}:{replica.port} {'recovered' if healthy else 'lagging'} (lag {lag:.1f}s)")
+        replica.healthy = healthy
+        self.lag[i] = lag
+
+    async def _check_all(self) -> None:
+        await asyncio.gather(*(self._check(i, r) for i, r in enumerate(self.replicas)))
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self._check_all()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "replicas": [
+                {
+                    "host": r.host,
+                    "port": r.port,
+                    "healthy": r.started and r.healthy,
+                    "lag_sec": self.lag.get(i),
+                    "pool": r.stats(),
+                }
+                for i, r in enumerate(self.replicas)
+            ],
+            "pin_sec": self.pin_sec,
+            "pinned_users": len(self._user_pins),
+            "pinned_plans": len(self._plan_pins),
+            "replica_reads": self.replica_reads,
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallback_reads,
+        }
+
+
+# 싱글톤 인스턴스
+replica_router = ReplicaRouter(db, parse_hosts(DB_REPLICA_HOSTS))
+add_publisher(replica_router.pin)
+invalidation_bus.add_subscriber(replica_router.pin)
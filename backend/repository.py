@@ -0,0 +1,257 @@
+# backend/repository.py
+"""
+데이터 접근 계층 (Repository)
+
+라우트와 시뮬레이션 로더(snapshot / projection)가 읽는 데이터는 Repository 를 거친다.
+- PostgresRepository: 요청의 asyncpg 연결 하나를 감싼다. 이 경로의 SQL 은 전부 여기 있다 (statements 레지스트리).
+- MemoryRepository (backend.memory_repository): 같은 값을 같은 파이썬 타입으로 돌려주는 인메모리 구현.
+  DB 없이 라우팅 / 검증 / 시뮬레이션 / 직렬화 비용만 재는 부하 테스트와 벤치마크용 (python -m backend.bench).
+
+범위는 읽기 경로뿐이다: 유저(존재 확인, 익명 유저 생성), 스냅샷(유저 재정 상태, 재정 요약, 데이터 버전),
+플랜(시뮬레이션 입력, 제목, 목록, 소유 확인), 보유 항목 / 지출 목록(KeysetList).
+익명 유저 생성 말고는 쓰기가 없다. 항목 / 플랜 생성 / 수정 / 삭제 라우트는 get_db_connection 의 연결에 직접 SQL 을 보내므로
+인메모리 구현으로는 돌지 않는다 (DB 가 필요).
+
+라우트는 Depends(get_repository) 로 받는다. 기본은 get_db_connection 의 연결을 감싼 PostgresRepository 라서
+같은 요청의 get_current_user / 쓰기 SQL 과 연결을 공유한다. 다른 구현은 app.dependency_overrides 로 끼운다
+(memory_repository.use_repository).
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+import asyncpg
+from fastapi import Depends
+
+from backend.db import get_db_connection
+from backend.pagination import KeysetList, decode_cursor
+from backend.projection import PLAN_COLUMNS
+from backend.snapshot import (
+    snapshot_columns, decode_snapshot, USER_ITEMS, PLAN_ITEMS, SUMMARY_TOTALS, SUMMARY_COUNTS,
+)
+from backend.statements import statements
+
+
+class Repository(ABC):
+    """읽기 경로 인터페이스. 반환값은 asyncpg 가 디코딩한 값과 같은 타입 (numeric 은 float, jsonb 는 str)"""
+
+    # ===== 유저 =====
+    @abstractmethod
+    async def user_exists(self, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def create_anon_user(self, username: str) -> int:
+        """새 유저 id"""
+
+    # ===== 스냅샷 =====
+    @abstractmethod
+    async def user_snapshot(self, user_id: int) -> dict[str, list[dict[str, Any]]]:
+        """유저 재정 상태 {USER_ITEMS 항목: [dict, ...]} (캐시는 snapshot.load_user_snapshot 이 본다)"""
+
+    @abstractmethod
+    async def financial_summary(self, user_id: int) -> Optional[dict[str, Any]]:
+        """user_financial_summary 행. 보유 항목이 한 번도 없었던 유저는 None"""
+
+    @abstractmethod
+    async def data_version(self, user_id: int) -> tuple[int, int, Optional[datetime]]:
+        """
+        (보유 항목 변경 횟수, 플랜 수, 플랜 마지막 수정 시각) — 목록을 읽지 않고 바뀌었는지만 볼 때 (ETag).
+        보유 항목은 요약 트리거의 version (추가/수정/삭제마다 +1), 플랜은 수와 max(updated_at) 로 본다
+        """
+
+    # ===== 플랜 =====
+    @abstractmethod
+    async def plan_inputs(
+        self, user_id: int, plan_id: int, with_user_items: bool = True
+    ) -> Optional[tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]]:
+        """
+        (plan row, 항목) — 항목은 PLAN_ITEMS 와 (with_user_items 면) USER_ITEMS.
+        유저의 플랜이 아니거나 없으면 None
+        """
+
+    @abstractmethod
+    async def plan_version(self, user_id: int, plan_id: int) -> Optional[dict[str, Any]]:
+        """
+        플랜 상세 응답이 바뀌었는지 볼 값들 (시뮬레이션 입력을 읽지 않고). 유저의 플랜이 아니거나 없으면 None.
+        {plan_updated_at, items_version, items_updated_at, holdings_version, holdings_updated_at}
+        — items_* 는 수입/지출/세금 트리거(0005), holdings_* 는 재정 요약 트리거(0003) 가 유지한다
+        """
+
+    @abstractmethod
+    async def plan_titles(self, user_id: int) -> list[str]:
+        """만든 순서대로"""
+
+    @abstractmethod
+    async def plan_list(self, user_id: int) -> list[dict[str, Any]]:
+        """대시보드 목록: {id, title, description}, 최신순"""
+
+    @abstractmethod
+    async def owned_plan_ids(self, user_id: int, plan_ids: Sequence[int]) -> set[int]:
+        ...
+
+    # ===== 목록 =====
+    @abstractmethod
+    async def versioned_lists(
+        self, user_id: int, lists: "VersionedLists"
+    ) -> tuple[tuple[int, int, Optional[datetime]], dict[str, list[dict[str, Any]]]]:
+        """
+        (data_version, {이름: 목록 전체}) — 버전과 목록을 같은 시점의 데이터에서 읽는다 (ETag 가 본문과 맞도록).
+        목록의 행 / 순서는 fetch_page(limit 없이) 와 같다
+        """
+
+    @abstractmethod
+    async def fetch_page(
+        self,
+        listing,
+        key: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """KeysetList 한 페이지: (행 목록, 다음 페이지 커서 또는 None). 잘못된 fields / cursor 는 ValueError"""
+
+
+# ==========================
+# Postgres
+# ==========================
+USER_EXISTS = statements.register("users.exists", "SELECT id FROM users WHERE id=$1")
+INSERT_ANON_USER = statements.register("users.insert_anon", "INSERT INTO users (username) VALUES ($1) RETURNING id")
+
+USER_SNAPSHOT = statements.register("snapshot.user", f"SELECT {snapshot_columns('$1')}")
+
+FINANCIAL_SUMMARY = statements.register("users.financial_summary", f"""
+    SELECT {", ".join((*SUMMARY_TOTALS, *SUMMARY_COUNTS))}, version, updated_at
+    FROM user_financial_summary
+    WHERE user_id = $1
+""")
+
+# plan row + 유저 스냅샷 + 플랜 하위 항목을 왕복 1회로
+PLAN_INPUTS = statements.register("plans.inputs", f"""
+    SELECT {", ".join(f"p.{c}" for c in PLAN_COLUMNS)},
+           {snapshot_columns("p.user_id", "p.id")}
+    FROM plans p
+    WHERE p.user_id = $1 AND p.id = $2
+""")
+
+# 유저 스냅샷이 캐시에 있을 때: plan row + 플랜 하위 항목만
+PLAN_ONLY_INPUTS = statements.register("plans.inputs_plan_only", f"""
+    SELECT {", ".join(f"p.{c}" for c in PLAN_COLUMNS)},
+           {snapshot_columns(None, "p.id")}
+    FROM plans p
+    WHERE p.user_id = $1 AND p.id = $2
+""")
+
+_DATA_VERSION_SQL = """
+    SELECT
+        COALESCE((SELECT version FROM user_financial_summary WHERE user_id = $1), 0) AS holdings_version,
+        count(*) AS plan_count,
+        max(updated_at) AS plans_updated_at
+    FROM plans
+    WHERE user_id = $1
+"""
+USER_DATA_VERSION = statements.register("users.data_version", _DATA_VERSION_SQL)
+
+
+class VersionedLists:
+    """
+    유저의 목록 여러 개 (각 KeysetList 전체) 와 data_version 을 한 문장으로 (/api/me/snapshot).
+    문장 하나는 스냅샷 하나를 보므로 버전과 목록 사이에 쓰기가 끼지 않고, 왕복도 한 번이다.
+    목록은 컬럼별 array_agg 로 받는다 (KeysetList.array_columns): json_agg 와 달리 값 / 타입이 목록 라우트와 같다.
+    """
+
+    def __init__(self, name: str, lists: dict[str, KeysetList]):
+        self.lists = dict(lists)
+        sources = ",\n    ".join(
+            f"{listing.array_columns(key, '$1')} AS {key}_arrays" for key, listing in self.lists.items()
+        )
+        self.statement = statements.register(name, f"""
+    SELECT *
+    FROM ({_DATA_VERSION_SQL}) AS version,
+    {sources}
+""")
+
+PLAN_VERSION = statements.register("plans.version", """
+    SELECT p.updated_at AS plan_updated_at, p.items_version, p.items_updated_at,
+           COALESCE(s.version, 0) AS holdings_version, s.updated_at AS holdings_updated_at
+    FROM plans p
+    LEFT JOIN user_financial_summary s ON s.user_id = p.user_id
+    WHERE p.user_id = $1 AND p.id = $2
+""")
+
+LIST_PLAN_TITLES = statements.register("plans.titles", """
+    SELECT title
+    FROM plans
+    WHERE user_id = $1
+    ORDER BY created_at ASC
+""")
+
+LIST_DASHBOARD_PLANS = statements.register("plans.list_dashboard", "SELECT id, title, description FROM plans WHERE user_id = $1 ORDER BY created_at DESC")
+
+LIST_OWNED_PLAN_IDS = statements.register("plans.owned_ids", "SELECT id FROM plans WHERE user_id = $1 AND id = ANY($2::bigint[])")
+
+
+class PostgresRepository(Repository):
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def user_exists(self, user_id: int) -> bool:
+        return await USER_EXISTS.fetchrow(self.conn, user_id) is not None
+
+    async def create_anon_user(self, username: str) -> int:
+        row = await INSERT_ANON_USER.fetchrow(self.conn, username)
+        return row["id"]
+
+    async def user_snapshot(self, user_id: int) -> dict[str, list[dict[str, Any]]]:
+        row = await USER_SNAPSHOT.fetchrow(self.conn, user_id)
+        return decode_snapshot(row, USER_ITEMS)
+
+    async def financial_summary(self, user_id: int) -> Optional[dict[str, Any]]:
+        row = await FINANCIAL_SUMMARY.fetchrow(self.conn, user_id)
+        return dict(row) if row is not None else None
+
+    async def data_version(self, user_id: int) -> tuple[int, int, Optional[datetime]]:
+        row = await USER_DATA_VERSION.fetchrow(self.conn, user_id)
+        return row["holdings_version"], row["plan_count"], row["plans_updated_at"]
+
+    async def plan_inputs(self, user_id: int, plan_id: int, with_user_items: bool = True):
+        statement = PLAN_INPUTS if with_user_items else PLAN_ONLY_INPUTS
+        row = await statement.fetchrow(self.conn, user_id, plan_id)
+        if not row:
+            return None
+        keys = (*USER_ITEMS, *PLAN_ITEMS) if with_user_items else PLAN_ITEMS
+        return {c: row[c] for c in PLAN_COLUMNS}, decode_snapshot(row, keys)
+
+    async def plan_version(self, user_id: int, plan_id: int) -> Optional[dict[str, Any]]:
+        row = await PLAN_VERSION.fetchrow(self.conn, user_id, plan_id)
+        return dict(row) if row is not None else None
+
+    async def plan_titles(self, user_id: int) -> list[str]:
+        return [r["title"] for r in await LIST_PLAN_TITLES.fetch(self.conn, user_id)]
+
+    async def plan_list(self, user_id: int) -> list[dict[str, Any]]:
+        return [dict(r) for r in await LIST_DASHBOARD_PLANS.fetch(self.conn, user_id)]
+
+    async def owned_plan_ids(self, user_id: int, plan_ids: Sequence[int]) -> set[int]:
+        return {r["id"] for r in await LIST_OWNED_PLAN_IDS.fetch(self.conn, user_id, list(plan_ids))}
+
+    async def versioned_lists(self, user_id: int, lists: VersionedLists):
+        row = await lists.statement.fetchrow(self.conn, user_id)
+        version = (row["holdings_version"], row["plan_count"], row["plans_updated_at"])
+        return version, {key: listing.rows_from_arrays(row, key) for key, listing in lists.lists.items()}
+
+    async def fetch_page(self, listing, key, limit=None, cursor=None, fields=None):
+        first, after = listing.statements_for(fields)
+        # 한 행 더 읽어서 다음 페이지가 있는지 본다
+        n = None if limit is None else limit + 1
+        if cursor is None:
+            rows = await first.fetch(self.conn, key, n)
+        else:
+            created_at, row_id = decode_cursor(cursor)
+            rows = await after.fetch(self.conn, key, created_at, row_id, n)
+        return listing.finish([dict(r) for r in rows], limit, fields)
+
+
+async def get_repository(conn: asyncpg.Connection = Depends(get_db_connection)) -> Repository:
+    """FastAPI 의존성: 요청의 연결을 감싼 PostgresRepository"""
+    return PostgresRepository(conn)
@@ -0,0 +1,66 @@
+# backend/responses.py
+"""
+빠른 JSON 응답 (orjson)
+
+FastAPI 기본 경로는 라우트 반환값을 response_model 로 다시 검증(복사)하고, 모델이 없으면 jsonable_encoder 로
+전체를 한 번 훑은 뒤 json.dumps 한다. 플랜 상세 (연도별 시리즈 십수 개) 는 이 단계만 수 ms 라서
+projection 캐시 적중 시 응답 시간의 대부분이다.
+
+핫 라우트는 fast_json() 으로 Response 를 직접 돌려줘서 이 단계를 건너뛴다 (Response 를 반환하면 FastAPI 는
+response_model 을 적용하지 않는다). response_model 은 OpenAPI 문서용으로 그대로 둔다.
+그래서 반환하는 값은 이미 모델 모양이어야 한다 — 저장소 / 로더가 만든 행 (키와 타입이 모델과 같음).
+
+- 인코딩: date / datetime / UUID 는 orjson 이 바로 (UTC 는 "Z", pydantic 직렬화와 같은 형식), Decimal 은 float
+  (jsonable_encoder 와 같음), pydantic 모델은 model_dump(mode="json"), numpy 배열 / 스칼라도 그대로. NaN / inf 는 null.
+- 라우트는 지금처럼 주입받은 response 에 헤더 / 상태 코드를 붙이고 fast_json(body, response) 를 반환한다.
+
+환경 변수:
+- FAST_JSON: 0 이면 fast_json() 이 내용을 그대로 돌려줘서 기존 경로 (response_model 검증 + 기본 인코딩) 로 돌아간다.
+  기본 1. 응답이 달라 보일 때 비교 / 되돌리기용 (python -m backend.bench --compare-json)
+"""
+import os
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+FAST_JSON = os.getenv("FAST_JSON", "1") == "1"
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """orjson 이 모르는 타입"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """검증 / jsonable_encoder 없이 orjson 으로 바로 인코딩하는 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> Any:
+    """
+    라우트 반환값. response 는 라우트가 주입받은 Response (헤더 / 상태 코드를 옮긴다).
+    FAST_JSON=0 이면 content 를 그대로 반환 (FastAPI 가 response_model 로 검증 / 인코딩)
+    """
+    if not FAST_JSON:
+        return content
+    if response is None:
+        return FastJSONResponse(content)
+    fast = FastJSONResponse(content, status_code=response.status_code or 200)
+    fast.raw_headers.extend(response.raw_headers)
+    return fast
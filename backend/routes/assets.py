@@ -1,28 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 import asyncpg
 from backend.db import get_db_connection
+from backend.pagination import KeysetList, PageParams
+from backend.repository import Repository, get_repository
+from backend.statements import statements
 from backend.schemas.schemas import AssetCreate, AssetUpdate, AssetOut, AssetBulkCreate
 from backend.auth import get_current_user, CurrentUser
+from backend.cache import invalidate_user
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
-# ✅ 조회 함수: 리턴 시 float 변환 직접 수행
-async def get_assets_data(user_id: int, conn: asyncpg.Connection):
-    return await conn.fetch(
-        """
-        SELECT
-            id, user_id,
-            category::text AS category,
-            interest_rate, roi, dividend,
-            amount,
-            loan_amount, repay_amount,
-            created_at, updated_at
-        FROM assets
-        WHERE user_id = $1
-        ORDER BY created_at DESC NULLS LAST, id DESC
-        """,
-        user_id,
+# ✅ 조회 함수: numeric 은 풀 코덱이 float 로 디코딩, NULL 금액은 0 으로
+LIST_ASSETS = KeysetList("assets.list", "assets", "user_id", {
+    "id": "id",
+    "user_id": "user_id",
+    "category": "category",
+    "interest_rate": "interest_rate",
+    "roi": "roi",
+    "dividend": "dividend",
+    "amount": "COALESCE(amount, 0)",
+    "loan_amount": "COALESCE(loan_amount, 0)",
+    "repay_amount": "COALESCE(repay_amount, 0)",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
+
+# 항목 배열을 unnest 해서 한 문장(왕복 1회)으로 삽입. WITH ORDINALITY 로 요청 순서대로 id 가 매겨진다
+INSERT_ASSETS_BULK = statements.register("assets.insert_bulk", """
+    INSERT INTO assets (
+        user_id, category, amount,
+        loan_amount, interest_rate, repay_amount,
+        roi, dividend
     )
+    SELECT
+        $1, t.category::asset_type, t.amount,
+        COALESCE(t.loan_amount, 0), COALESCE(t.interest_rate, 0), COALESCE(t.repay_amount, 0),
+        0, 0
+    FROM unnest($2::text[], $3::numeric[], $4::numeric[], $5::numeric[], $6::numeric[])
+         WITH ORDINALITY AS t(category, amount, loan_amount, interest_rate, repay_amount, ord)
+    ORDER BY t.ord
+    RETURNING
+        id,
+        user_id,
+        category,
+        COALESCE(interest_rate, 0) AS interest_rate,
+        COALESCE(roi, 0) AS roi,
+        COALESCE(dividend, 0) AS dividend,
+        amount,
+        COALESCE(loan_amount, 0) AS loan_amount,
+        COALESCE(repay_amount, 0) AS repay_amount,
+        created_at,
+        updated_at
+""")
+
 @router.post("/bulk")
 async def insert_assets_bulk(
     payload: AssetBulkCreate,
@@ -32,83 +62,52 @@ async def insert_assets_bulk(
     if not payload.items:
         raise HTTPException(status_code=400, detail="items is required")
 
-    async with conn.transaction():
-        rows = []
-        for item in payload.items:
-            if not item.category:
-                raise HTTPException(status_code=400, detail="category is required")
+    # 검증은 DB 에 가기 전에 한 번에
+    if any(not item.category for item in payload.items):
+        raise HTTPException(status_code=400, detail="category is required")
 
-            row = await conn.fetchrow(
-                """
-                INSERT INTO assets (
-                    user_id, category, amount,
-                    loan_amount, interest_rate, repay_amount,
-                    roi, dividend
-                )
-                VALUES (
-                    $1, $2, $3,
-                    COALESCE($4, 0), COALESCE($5, 0), COALESCE($6, 0),
-                    0, 0
-                )
-                RETURNING
-                    id,
-                    user_id,
-                    category::text AS category,
-                    interest_rate,
-                    roi,
-                    dividend,
-                    amount,
-                    loan_amount,
-                    repay_amount,
-                    created_at,
-                    updated_at
-                """,
-                current_user.id,
-                item.category,          # enum이면 .value 필요할 수도 있음(아래 참고)
-                item.amount,
-                item.loan_amount,
-                item.interest_rate,
-                item.repay_amount,
-            )
-            rows.append(row)
+    items = payload.items
+    rows = await INSERT_ASSETS_BULK.fetch(
+        conn,
+        current_user.id,
+        [item.category for item in items],
+        [item.amount for item in items],
+        [item.loan_amount for item in items],
+        [item.interest_rate for item in items],
+        [item.repay_amount for item in items],
+    )
 
+    invalidate_user(current_user.id)
     return {
         "ok": True,
-        "created": [
-            {
-                **dict(r),
-                "amount": float(r["amount"]),
-                "loan_amount": float(r["loan_amount"]) if r["loan_amount"] is not None else 0.0,
-                "repay_amount": float(r["repay_amount"]) if r["repay_amount"] is not None else 0.0,
-                "interest_rate": float(r["interest_rate"]) if r["interest_rate"] is not None else 0.0,
-                "roi": float(r["roi"]) if r["roi"] is not None else 0.0,
-                "dividend": float(r["dividend"]) if r["dividend"] is not None else 0.0,
-            }
-            for r in rows
-        ],
+        "created": [dict(r) for r in rows],
     }
 # ========= 목록 조회 =========
 @router.get("/", response_model=list[AssetOut])
 async def list_assets(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    rows = await get_assets_data(current_user.id, conn)
-
-    return [
-        {
-            **dict(r),
-            "interest_rate": float(r["interest_rate"]) if r["interest_rate"] is not None else None,
-            "roi": float(r["roi"]) if r["roi"] is not None else None,
-            "dividend": float(r["dividend"]) if r["dividend"] is not None else None,
-            "amount": float(r["amount"]) if r["amount"] is not None else 0.0,
-            "loan_amount": float(r["loan_amount"]) if r["loan_amount"] is not None else 0.0,
-            "repay_amount": float(r["repay_amount"]) if r["repay_amount"] is not None else 0.0,
-        }
-        for r in rows
-    ]
+    return await LIST_ASSETS.respond(repo, current_user.id, page, response)
 
 # ========= 생성 =========
+INSERT_ASSET = statements.register("assets.insert", """
+    INSERT INTO assets
+        (user_id, category, interest_rate, roi, dividend,
+         amount, loan_amount, repay_amount)
+    VALUES
+        ($1, $2, $3, $4, $5,
+         $6, $7, $8)
+    RETURNING
+        id, user_id, category,
+        interest_rate, roi, dividend,
+        amount,
+        loan_amount, repay_amount,
+        created_at, updated_at
+""")
+
 @router.post("/", response_model=AssetOut)
 async def insert_asset(
     payload: AssetCreate,
@@ -131,21 +130,8 @@ async def insert_asset(
             )
     
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO assets
-                (user_id, category, interest_rate, roi, dividend,
-                 amount, loan_amount, repay_amount)
-            VALUES
-                ($1, $2, $3, $4, $5,
-                 $6, $7, $8)
-            RETURNING
-                id, user_id, category::text AS category,
-                interest_rate, roi, dividend,
-                amount,
-                loan_amount, repay_amount,
-                created_at, updated_at
-            """,
+        row = await INSERT_ASSET.fetchrow(
+            conn,
             current_user.id,
             payload.category.upper(),
             payload.interest_rate,
@@ -156,17 +142,30 @@ async def insert_asset(
             payload.repay_amount,
         )
 
-    return {
-        **dict(row),
-        "interest_rate": float(row["interest_rate"]) if row["interest_rate"] is not None else None,
-        "roi": float(row["roi"]) if row["roi"] is not None else None,
-        "dividend": float(row["dividend"]) if row["dividend"] is not None else None,
-        "amount": float(row["amount"]),
-        "loan_amount": float(row["loan_amount"]),
-        "repay_amount": float(row["repay_amount"]),
-    }
+    invalidate_user(current_user.id)
+    return dict(row)
 
 # ========= 부분 수정 =========
+# 상환액 검증도 UPDATE 의 WHERE 에서 수정 후 값으로 한다 (조회 → 검증 → 수정 사이에 끼어드는 쓰기가 없도록)
+UPDATE_ASSET = statements.partial_update(
+    "assets.update",
+    "assets",
+    ("category", "interest_rate", "roi", "dividend", "amount", "loan_amount", "repay_amount"),
+    where=("user_id", "id"),
+    returning="""
+        id, user_id, category,
+        interest_rate, roi, dividend,
+        amount,
+        loan_amount, repay_amount,
+        created_at, updated_at
+    """,
+    check="""
+        COALESCE({loan_amount}, 0) <= 0
+        OR COALESCE({repay_amount}, 0) >= COALESCE({loan_amount}, 0) * COALESCE({interest_rate}, 0) / 100 / 12
+    """,
+)
+GET_ASSET_LOAN = statements.register("assets.get_loan", "SELECT loan_amount, interest_rate, repay_amount FROM assets WHERE id = $1 AND user_id = $2")
+
 @router.patch("/{asset_id}", response_model=AssetOut)
 async def update_asset(
     asset_id: int,
@@ -174,16 +173,26 @@ async def update_asset(
     current_user: CurrentUser = Depends(get_current_user),
     conn: asyncpg.Connection = Depends(get_db_connection),
 ):
-    existing = await conn.fetchrow(
-        "SELECT loan_amount, interest_rate, repay_amount FROM assets WHERE id = $1 AND user_id = $2",
+    data = payload.model_dump(exclude_unset=True)
+    if data.get("category") is not None:
+        data["category"] = str(data["category"]).upper()
+
+    if not UPDATE_ASSET.changes(data):
+        raise HTTPException(400, "no updatable fields")
+
+    row = await UPDATE_ASSET.fetchrow(conn, data, current_user.id, asset_id)
+    if row:
+        invalidate_user(current_user.id)
+        return dict(row)
+
+    # 갱신된 행이 없음: 없는 자산인지 상환액 검증 실패인지 가린다
+    existing = await GET_ASSET_LOAN.fetchrow(
+        conn,
         asset_id, current_user.id
     )
     if not existing:
         raise HTTPException(404, "asset not found")
 
-    data = payload.model_dump(exclude_unset=True)
-    
-    # 검증용 값 계산 (f 함수 없이 직접 처리)
     new_loan = data.get("loan_amount", existing["loan_amount"]) or 0
     new_rate = data.get("interest_rate", existing["interest_rate"]) or 0
     new_repay = data.get("repay_amount", existing["repay_amount"]) or 0
@@ -192,72 +201,29 @@ async def update_asset(
         monthly_interest = (float(new_loan) * (float(new_rate) / 100)) / 12
         if float(new_repay) < monthly_interest:
             raise HTTPException(
-                status_code=400, 
+                status_code=400,
                 detail=f"수정 후 상환액(₩{float(new_repay):,.0f})이 월 이자(₩{monthly_interest:,.0f})보다 적습니다."
             )
 
-    mapping = {
-        "category": "category",
-        "interest_rate": "interest_rate",
-        "roi": "roi",
-        "dividend": "dividend",
-        "amount": "amount",
-        "loan_amount": "loan_amount",
-        "repay_amount": "repay_amount",
-    }
-
-    fields, vals = [], []
-    for k, v in data.items():
-        if k in mapping:
-            if k == "category" and v is not None:
-                v = str(v).upper()
-            fields.append(f'{mapping[k]} = ${len(vals)+1}')
-            vals.append(v)
-
-    if not fields:
-        raise HTTPException(400, "no updatable fields")
-
-    vals.extend([current_user.id, asset_id])
-
-    q = f"""
-        UPDATE assets
-           SET {', '.join(fields)}, updated_at = now()
-         WHERE user_id = ${len(vals)-1} AND id = ${len(vals)}
-        RETURNING
-            id, user_id, category::text AS category,
-            interest_rate, roi, dividend,
-            amount,
-            loan_amount, repay_amount,
-            created_at, updated_at
-    """
-
-    row = await conn.fetchrow(q, *vals)
-    if not row:
-        raise HTTPException(404, "asset not found")
-
-    return {
-        **dict(row),
-        "interest_rate": float(row["interest_rate"]) if row["interest_rate"] is not None else None,
-        "roi": float(row["roi"]) if row["roi"] is not None else None,
-        "dividend": float(row["dividend"]) if row["dividend"] is not None else None,
-        "amount": float(row["amount"]),
-        "loan_amount": float(row["loan_amount"]),
-        "repay_amount": float(row["repay_amount"]),
-    }
+    # 그 사이 다른 요청이 값을 바꾼 경우
+    raise HTTPException(409, "asset was modified concurrently, please retry")
 
 
 # ========= 삭제 (기존 동일) =========
+DELETE_ASSET = statements.register("assets.delete", "DELETE FROM assets WHERE user_id=$1 AND id=$2")
+
 @router.delete("/{asset_id}")
 async def delete_asset(
     asset_id: int,
     current_user: CurrentUser = Depends(get_current_user),
     conn: asyncpg.Connection = Depends(get_db_connection),
 ):
-    res = await conn.execute(
-        "DELETE FROM assets WHERE user_id=$1 AND id=$2",
+    res = await DELETE_ASSET.execute(
+        conn,
         current_user.id,
         asset_id,
     )
     if not res.endswith(" 1"):
         raise HTTPException(404, "asset not found")
+    invalidate_user(current_user.id)
     return {"status": "ok", "deleted_id": asset_id}
\ No newline at end of file
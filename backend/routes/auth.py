@@ -1,17 +1,19 @@
 # backend/routes/auth.py
-from fastapi import APIRouter, Depends
-from backend.db import get_db_connection
+from fastapi import APIRouter, Depends, Request
 from backend.auth import create_token
+from backend.repository import Repository
+from backend.shards import get_new_user_repository, shard_router
 import uuid
 
 router = APIRouter()
 
 @router.post("/auth/anon")
-async def anon(conn=Depends(get_db_connection)):
+async def anon(request: Request, repo: Repository = Depends(get_new_user_repository)):
     username = f"anon_{uuid.uuid4().hex[:10]}"
-    row = await conn.fetchrow(
-        "INSERT INTO users (username) VALUES ($1) RETURNING id",
-        username
-    )
-    token = create_token(row["id"])
-    return {"access_token": token, "token_type": "bearer", "user_id": row["id"]}
+    user_id = await repo.create_anon_user(username)
+    # 샤드를 골라 만들었으면 (Postgres) 디렉터리에 남긴다
+    shard = getattr(request.state, "shard", None)
+    if shard is not None:
+        await shard_router.ensure_routed(user_id, shard)
+    token = create_token(user_id)
+    return {"access_token": token, "token_type": "bearer", "user_id": user_id}
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 import asyncpg
 from typing import Optional
 
 from backend.db import get_db_connection
+from backend.pagination import KeysetList, PageParams
+from backend.repository import Repository, get_repository
+from backend.statements import statements
 from backend.schemas.schemas import DebtCreate, DebtUpdate, DebtOut, DebtBulkCreate  
 from backend.auth import get_current_user, CurrentUser
+from backend.cache import invalidate_user
 
 router = APIRouter(prefix="/debts", tags=["debts"])
 
@@ -23,39 +27,37 @@ def validate_debt_repayment(loan_amount, interest_rate, repay_amount):
                 detail=f"월 상환액(₩{repay_val:,.0f})이 월 이자(₩{monthly_interest:,.0f})보다 크지 않으면 빚이 줄어들지 않습니다."
             )
 
-async def get_debts_data(user_id: int, conn: asyncpg.Connection):
-    """사용자의 부채 목록 조회 (currency 제외)"""
-    rows = await conn.fetch(
-        """
-        SELECT id, user_id, category::text AS category,
-               loan_amount, repay_amount, interest_rate, 
-               compound::text AS compound, created_at, updated_at
-        FROM debts 
-        WHERE user_id = $1
-        ORDER BY created_at DESC NULLS LAST, id DESC
-        """, user_id
-    )
-    
-    # asyncpg Record를 float이 포함된 dict로 변환
-    return [
-        {
-            **dict(r),
-            "loan_amount": float(r["loan_amount"]) if r["loan_amount"] is not None else 0.0,
-            "repay_amount": float(r["repay_amount"]) if r["repay_amount"] is not None else 0.0,
-            "interest_rate": float(r["interest_rate"]) if r["interest_rate"] is not None else 0.0,
-        }
-        for r in rows
-    ]
+LIST_DEBTS = KeysetList("debts.list", "debts", "user_id", {
+    "id": "id",
+    "user_id": "user_id",
+    "category": "category",
+    "loan_amount": "COALESCE(loan_amount, 0)",
+    "repay_amount": "COALESCE(repay_amount, 0)",
+    "interest_rate": "COALESCE(interest_rate, 0)",
+    "compound": "compound",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
 
 # ========= 목록 조회 =========
 @router.get("/", response_model=list[DebtOut])
 async def list_debts(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: CurrentUser = Depends(get_current_user), 
-    conn: asyncpg.Connection = Depends(get_db_connection)
+    repo: Repository = Depends(get_repository)
 ):
-    return await get_debts_data(current_user.id, conn)
+    return await LIST_DEBTS.respond(repo, current_user.id, page, response)
 
 # ========= 생성 =========
+INSERT_DEBT = statements.register("debts.insert", """
+    INSERT INTO debts (user_id, category, loan_amount, repay_amount, interest_rate, compound)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id, user_id, category,
+              loan_amount, repay_amount, interest_rate,
+              compound, created_at, updated_at
+""")
+
 @router.post("/", response_model=DebtOut)
 async def insert_debt(
     payload: DebtCreate, 
@@ -66,14 +68,8 @@ async def insert_debt(
     validate_debt_repayment(payload.loan_amount, payload.interest_rate, payload.repay_amount)
 
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO debts (user_id, category, loan_amount, repay_amount, interest_rate, compound)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            RETURNING id, user_id, category::text AS category, 
-                      loan_amount, repay_amount, interest_rate, 
-                      compound::text AS compound, created_at, updated_at
-            """,
+        row = await INSERT_DEBT.fetchrow(
+            conn,
             current_user.id, 
             payload.category.upper() if payload.category else None, 
             payload.loan_amount, 
@@ -82,12 +78,31 @@ async def insert_debt(
             payload.compound.upper() if payload.compound else 'COMPOUND'
         )
     
-    res = dict(row)
-    res["loan_amount"] = float(res["loan_amount"])
-    res["repay_amount"] = float(res["repay_amount"])
-    res["interest_rate"] = float(res["interest_rate"])
-    return res
+    invalidate_user(current_user.id)
+    return dict(row)
+
 
+# 항목 배열을 unnest 해서 한 문장(왕복 1회)으로 삽입. WITH ORDINALITY 로 요청 순서대로 id 가 매겨진다
+INSERT_DEBTS_BULK = statements.register("debts.insert_bulk", """
+    INSERT INTO debts (
+        user_id, category, loan_amount, repay_amount, interest_rate, compound
+    )
+    SELECT
+        $1, t.category::debt_type, t.loan_amount, t.repay_amount, t.interest_rate, t.compound::compound_type
+    FROM unnest($2::text[], $3::numeric[], $4::numeric[], $5::numeric[], $6::text[])
+         WITH ORDINALITY AS t(category, loan_amount, repay_amount, interest_rate, compound, ord)
+    ORDER BY t.ord
+    RETURNING
+        id,
+        user_id,
+        category,
+        loan_amount,
+        repay_amount,
+        interest_rate,
+        compound,
+        created_at,
+        updated_at
+""")
 
 @router.post("/bulk")
 async def insert_debts_bulk(
@@ -98,53 +113,45 @@ async def insert_debts_bulk(
     if not payload.items:
         raise HTTPException(status_code=400, detail="items is required")
 
-    async with conn.transaction():
-        rows = []
-        for item in payload.items:
-            if not item.category:
-                raise HTTPException(status_code=400, detail="category is required")
-
-            row = await conn.fetchrow(
-                """
-                INSERT INTO debts (
-                    user_id, category, loan_amount, repay_amount, interest_rate, compound
-                )
-                VALUES (
-                    $1, $2, $3, $4, $5, $6
-                )
-                RETURNING
-                    id,
-                    user_id,
-                    category::text AS category,
-                    loan_amount,
-                    repay_amount,
-                    interest_rate,
-                    compound::text AS compound,
-                    created_at,
-                    updated_at
-                """,
-                current_user.id,
-                item.category,       # enum이면 .value 필요할 수 있음(아래 참고)
-                item.loan_amount,
-                item.repay_amount,
-                item.interest_rate,
-                (item.compound.value if hasattr(item.compound, "value") else item.compound) or "COMPOUND",
-            )
-            rows.append(row)
+    # 검증은 DB 에 가기 전에 한 번에
+    if any(not item.category for item in payload.items):
+        raise HTTPException(status_code=400, detail="category is required")
+
+    items = payload.items
+    rows = await INSERT_DEBTS_BULK.fetch(
+        conn,
+        current_user.id,
+        [item.category for item in items],
+        [item.loan_amount for item in items],
+        [item.repay_amount for item in items],
+        [item.interest_rate for item in items],
+        [item.compound or "COMPOUND" for item in items],
+    )
 
+    invalidate_user(current_user.id)
     return {
         "ok": True,
-        "created": [
-            {
-                **dict(r),
-                "loan_amount": float(r["loan_amount"]),
-                "repay_amount": float(r["repay_amount"]),
-                "interest_rate": float(r["interest_rate"]),
-            }
-            for r in rows
-        ],
+        "created": [dict(r) for r in rows],
     }
 # ========= 부분 수정 =========
+# validate_debt_repayment 와 같은 조건을 UPDATE 의 WHERE 에서 수정 후 값으로 검사한다
+UPDATE_DEBT = statements.partial_update(
+    "debts.update",
+    "debts",
+    ("category", "loan_amount", "repay_amount", "interest_rate", "compound"),
+    where=("user_id", "id"),
+    returning="""
+        id, user_id, category,
+        loan_amount, repay_amount, interest_rate,
+        compound, created_at, updated_at
+    """,
+    check="""
+        COALESCE({loan_amount}, 0) <= 0
+        OR COALESCE({repay_amount}, 0) > COALESCE({loan_amount}, 0) * COALESCE({interest_rate}, 0) / 100 / 12
+    """,
+)
+GET_DEBT_LOAN = statements.register("debts.get_loan", "SELECT loan_amount, interest_rate, repay_amount FROM debts WHERE id = $1 AND user_id = $2")
+
 @router.patch("/{debt_id}", response_model=DebtOut)
 async def update_debt(
     debt_id: int, 
@@ -152,68 +159,45 @@ async def update_debt(
     current_user: CurrentUser = Depends(get_current_user), 
     conn: asyncpg.Connection = Depends(get_db_connection)
 ):
-    existing = await conn.fetchrow(
-        "SELECT loan_amount, interest_rate, repay_amount FROM debts WHERE id = $1 AND user_id = $2", 
+    data = payload.model_dump(exclude_unset=True)
+    for k in ("category", "compound"):
+        if data.get(k) is not None:
+            data[k] = str(data[k]).upper()
+
+    if not UPDATE_DEBT.changes(data):
+        raise HTTPException(400, "no updatable fields")
+
+    row = await UPDATE_DEBT.fetchrow(conn, data, current_user.id, debt_id)
+    if row:
+        invalidate_user(current_user.id)
+        return dict(row)
+
+    # 갱신된 행이 없음: 없는 부채인지 상환액 검증 실패인지 가린다
+    existing = await GET_DEBT_LOAN.fetchrow(
+        conn, 
         debt_id, current_user.id
     )
     if not existing:
         raise HTTPException(404, "debt not found")
 
-    data = payload.model_dump(exclude_unset=True)
-    
-    # 기존 값과 새 값 병합 후 재검증
-    new_loan = data.get("loan_amount", existing["loan_amount"])
-    new_rate = data.get("interest_rate", existing["interest_rate"])
-    new_repay = data.get("repay_amount", existing["repay_amount"])
-    validate_debt_repayment(new_loan, new_rate, new_repay)
-
-    mapping = {
-        "category": "category", 
-        "loan_amount": "loan_amount", 
-        "repay_amount": "repay_amount", 
-        "interest_rate": "interest_rate", 
-        "compound": "compound"
-    }
-    
-    fields, vals = [], []
-    for k, v in data.items():
-        if k in mapping:
-            if k in {"category", "compound"} and v is not None: 
-                v = str(v).upper()
-            fields.append(f'{mapping[k]} = ${len(vals)+1}')
-            vals.append(v)
-
-    if not fields: 
-        raise HTTPException(400, "no updatable fields")
-        
-    vals.extend([current_user.id, debt_id])
-
-    row = await conn.fetchrow(
-        f"""
-        UPDATE debts 
-        SET {', '.join(fields)}, updated_at = now() 
-        WHERE user_id = ${len(vals)-1} AND id = ${len(vals)} 
-        RETURNING id, user_id, category::text AS category, 
-                  loan_amount, repay_amount, interest_rate, 
-                  compound::text AS compound, created_at, updated_at
-        """, 
-        *vals
+    validate_debt_repayment(
+        data.get("loan_amount", existing["loan_amount"]),
+        data.get("interest_rate", existing["interest_rate"]),
+        data.get("repay_amount", existing["repay_amount"]),
     )
-    
-    res = dict(row)
-    res["loan_amount"] = float(res["loan_amount"])
-    res["repay_amount"] = float(res["repay_amount"])
-    res["interest_rate"] = float(res["interest_rate"])
-    return res
+    raise HTTPException(409, "debt was modified concurrently, please retry")
 
 # ========= 삭제 =========
+DELETE_DEBT = statements.register("debts.delete", "DELETE FROM debts WHERE user_id=$1 AND id=$2")
+
 @router.delete("/{debt_id}")
 async def delete_debt(
     debt_id: int, 
     current_user: CurrentUser = Depends(get_current_user), 
     conn: asyncpg.Connection = Depends(get_db_connection)
 ):
-    res = await conn.execute("DELETE FROM debts WHERE user_id=$1 AND id=$2", current_user.id, debt_id)
+    res = await DELETE_DEBT.execute(conn, current_user.id, debt_id)
     if not res.endswith(" 1"): 
         raise HTTPException(404, "debt not found")
+    invalidate_user(current_user.id)
     return {"status": "ok", "deleted_id": debt_id}
\ No newline at end of file
@@ -1,54 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 import asyncpg
 from datetime import date
 from backend.db import get_db_connection
+from backend.pagination import KeysetList, PageParams
+from backend.repository import Repository, get_repository
+from backend.statements import statements
 from backend.schemas.schemas import InvestmentCreate, InvestmentUpdate, InvestmentOut, InvestmentBulkCreate
 from backend.auth import get_current_user, CurrentUser
+from backend.cache import invalidate_user
 from typing import List
 router = APIRouter(prefix="/investments", tags=["investments"])
 
 # ===== 목록 조회 =====
+LIST_INVESTMENTS = KeysetList("investments.list", "investments", "user_id", {
+    "id": "id",
+    "user_id": "user_id",
+    "category": "category",
+    "amount": "COALESCE(amount, 0)",
+    "roi": "roi",
+    "dividend": "dividend",
+    "deposit": "COALESCE(deposit, 0)",
+    "deposit_frequency": "deposit_frequency",
+    "maturity_date": "maturity_date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
+
 @router.get("/", response_model=list[InvestmentOut])
 async def list_investments(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    rows = await conn.fetch(
-        """
-        SELECT
-            id,
-            user_id,
-            category::text AS category,
-            amount,
-            roi,
-            dividend,
-            deposit,                         -- ✅ 추가
-            deposit_frequency::text AS deposit_frequency, -- ✅ 추가
-            maturity_date,                   -- ✅ 추가
-            created_at,
-            updated_at
-        FROM investments
-        WHERE user_id = $1
-        ORDER BY created_at DESC NULLS LAST, id DESC
-        """,
-        current_user.id,
-    )
-
-    return [
-        {
-            **dict(r),
-            "amount": float(r["amount"]) if r["amount"] is not None else 0.0,
-            "roi": float(r["roi"]) if r["roi"] is not None else None,
-            "dividend": float(r["dividend"]) if r["dividend"] is not None else None,
-            "deposit": float(r["deposit"]) if r["deposit"] is not None else 0.0,
-            "deposit_frequency": r["deposit_frequency"],
-            "maturity_date": r["maturity_date"],
-        }
-        for r in rows
-    ]
+    return await LIST_INVESTMENTS.respond(repo, current_user.id, page, response)
 
 
 # ===== 생성 =====
+INSERT_INVESTMENT = statements.register("investments.insert", """
+    INSERT INTO investments
+        (user_id, category, amount, roi, dividend, 
+         deposit, deposit_frequency, maturity_date) -- ✅ currency 제외, 필드 추가
+    VALUES
+        ($1, $2, $3, COALESCE($4, 0), COALESCE($5, 0), $6, $7, $8)
+    RETURNING
+        id,
+        user_id,
+        category,
+        amount,
+        roi,
+        dividend,
+        deposit,
+        deposit_frequency,
+        maturity_date,
+        created_at,
+        updated_at
+""")
+
 @router.post("/", response_model=InvestmentOut)
 async def insert_investment(
     payload: InvestmentCreate,
@@ -59,26 +67,8 @@ async def insert_investment(
         raise HTTPException(400, "category is required")
 
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO investments
-                (user_id, category, amount, roi, dividend, 
-                 deposit, deposit_frequency, maturity_date) -- ✅ currency 제외, 필드 추가
-            VALUES
-                ($1, $2, $3, COALESCE($4, 0), COALESCE($5, 0), $6, $7, $8)
-            RETURNING
-                id,
-                user_id,
-                category::text AS category,
-                amount,
-                roi,
-                dividend,
-                deposit,
-                deposit_frequency::text AS deposit_frequency,
-                maturity_date,
-                created_at,
-                updated_at
-            """,
+        row = await INSERT_INVESTMENT.fetchrow(
+            conn,
             current_user.id,
             payload.category.upper(),
             payload.amount,
@@ -89,13 +79,17 @@ async def insert_investment(
             payload.maturity_date,
         )
 
-    return {
-        **dict(row),
-        "amount": float(row["amount"]),
-        "roi": float(row["roi"]),
-        "dividend": float(row["dividend"]),
-        "deposit": float(row["deposit"]),
-    }
+    invalidate_user(current_user.id)
+    return dict(row)
+
+# 항목 배열을 unnest 해서 한 문장(왕복 1회)으로 삽입. WITH ORDINALITY 로 요청 순서대로 id 가 매겨진다
+INSERT_INVESTMENTS_BULK = statements.register("investments.insert_bulk", """
+    INSERT INTO investments (user_id, category, amount)
+    SELECT $1, t.category::invest_type, t.amount
+    FROM unnest($2::text[], $3::numeric[]) WITH ORDINALITY AS t(category, amount, ord)
+    ORDER BY t.ord
+    RETURNING id, user_id, category, amount, created_at, updated_at
+""")
 
 @router.post("/bulk")
 async def insert_investmentss_bulk(
@@ -106,33 +100,45 @@ async def insert_investmentss_bulk(
     if not payload.items:
         raise HTTPException(status_code=400, detail="items is required")
 
-    async with conn.transaction():
-        rows = []
-        for item in payload.items:
-            if not item.category:
-                raise HTTPException(status_code=400, detail="category is required")
-
-            row = await conn.fetchrow(
-                """
-                INSERT INTO investments (user_id, category, amount)
-                VALUES ($1, $2, $3)
-                RETURNING id, user_id, category::text AS category, amount, created_at, updated_at
-                """,
-                current_user.id,
-                item.category.upper(),
-                item.amount,
-            )
-            rows.append(row)
+    # 검증은 DB 에 가기 전에 한 번에
+    if any(not item.category for item in payload.items):
+        raise HTTPException(status_code=400, detail="category is required")
 
+    rows = await INSERT_INVESTMENTS_BULK.fetch(
+        conn,
+        current_user.id,
+        [item.category.upper() for item in payload.items],
+        [item.amount for item in payload.items],
+    )
+
+    invalidate_user(current_user.id)
     return {
         "ok": True,
-        "created": [
-            {**dict(r), "amount": float(r["amount"])} for r in rows
-        ],
+        "created": [dict(r) for r in rows],
     }
 
 
 # ===== 부분 수정 (PATCH) =====
+UPDATE_INVESTMENT = statements.partial_update(
+    "investments.update",
+    "investments",
+    ("category", "amount", "roi", "dividend", "deposit", "deposit_frequency", "maturity_date"),
+    where=("user_id", "id"),
+    returning="""
+        id,
+        user_id,
+        category,
+        amount,
+        roi,
+        dividend,
+        deposit,
+        deposit_frequency,
+        maturity_date,
+        created_at,
+        updated_at
+    """,
+)
+
 @router.patch("/{investment_id}", response_model=InvestmentOut)
 async def update_investment(
     investment_id: int,
@@ -142,71 +148,31 @@ async def update_investment(
 ):
     data = payload.model_dump(exclude_unset=True)
 
-    fields = []
-    vals = []
-
-    # mapping에서 currency 제거, 새 필드 추가
-    mapping = {
-        "category": "category",
-        "amount": "amount",
-        "roi": "roi",
-        "dividend": "dividend",
-        "deposit": "deposit",
-        "deposit_frequency": "deposit_frequency",
-        "maturity_date": "maturity_date",
-    }
+    for k in ("category", "deposit_frequency"):
+        if data.get(k) is not None:
+            data[k] = str(data[k]).upper()
 
-    for k, v in data.items():
-        if k in mapping:
-            if k in {"category", "deposit_frequency"} and v is not None:
-                v = str(v).upper()
-            fields.append(f'{mapping[k]} = ${len(vals) + 1}')
-            vals.append(v)
-
-    if not fields:
+    if not UPDATE_INVESTMENT.changes(data):
         raise HTTPException(400, "no updatable fields")
 
-    vals.extend([current_user.id, investment_id])
-
-    q = f"""
-        UPDATE investments
-           SET {', '.join(fields)}, updated_at = now()
-         WHERE user_id = ${len(vals)-1} AND id = ${len(vals)}
-        RETURNING
-            id,
-            user_id,
-            category::text AS category,
-            amount,
-            roi,
-            dividend,
-            deposit,
-            deposit_frequency::text AS deposit_frequency,
-            maturity_date,
-            created_at,
-            updated_at
-    """
-
-    row = await conn.fetchrow(q, *vals)
+    row = await UPDATE_INVESTMENT.fetchrow(conn, data, current_user.id, investment_id)
     if not row:
         raise HTTPException(404, "investment not found")
 
-    return {
-        **dict(row),
-        "amount": float(row["amount"]),
-        "roi": float(row["roi"]),
-        "dividend": float(row["dividend"]),
-        "deposit": float(row["deposit"]),
-    }
+    invalidate_user(current_user.id)
+    return dict(row)
 
 # ===== 삭제 =====
+DELETE_INVESTMENT = statements.register("investments.delete", "DELETE FROM investments WHERE user_id=$1 AND id=$2")
+
 @router.delete("/{investment_id}")
 async def delete_investment(
     investment_id: int,
     current_user: CurrentUser = Depends(get_current_user),
     conn: asyncpg.Connection = Depends(get_db_connection),
 ):
-    res = await conn.execute(
-        "DELETE FROM investments WHERE user_id=$1 AND id=$2",
+    res = await DELETE_INVESTMENT.execute(
+        conn,
         current_user.id,
         investment_id,
     )  # 예: "DELETE 1"
@@ -214,4 +180,5 @@ async def delete_investment(
     if not res.endswith(" 1"):
         raise HTTPException(404, "investment not found")
 
+    invalidate_user(current_user.id)
     return {"status": "ok", "deleted_id": investment_id}
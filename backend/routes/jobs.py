@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from backend.repository import Repository, get_repository
+from backend.auth import get_current_user, CurrentUser
+from backend.responses import fast_json
+from backend.schemas.job import JobCreate, JobOut
+from backend.jobs import job_manager, sweep_variations, JobLimitExceeded
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+MAX_WAIT_SECONDS = 30.0
+
+
+def _get_job_or_404(job_id: str, user_id: int):
+    job = job_manager.get(job_id, user_id)
+    if job is None:
+        if not job_manager.owns(job_id):
+            # 작업은 만든 프로세스 메모리에만 있다 (backend.jobs): 다른 워커로 온 요청은 찾을 수 없다
+            raise HTTPException(
+                status_code=421,
+                detail="job was created by another worker process (jobs are in-process; multi-worker deployments are not supported)",
+            )
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+# ===== 작업 생성 =====
+@router.post("/", response_model=JobOut, status_code=202)
+async def create_job(
+    payload: JobCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+):
+    plan_ids = list(dict.fromkeys(payload.plan_ids))  # 순서 유지 중복 제거
+
+    if payload.kind == "plan" and len(plan_ids) != 1:
+        raise HTTPException(status_code=400, detail="plan job takes exactly one plan_id")
+    if payload.kind == "sweep" and (payload.sweep is None or not (payload.sweep.roi or payload.sweep.inflation)):
+        raise HTTPException(status_code=400, detail="sweep job requires sweep.roi or sweep.inflation")
+
+    # 소유권 확인은 제출 시점에 한 번만
+    owned = await repo.owned_plan_ids(current_user.id, plan_ids)
+    missing = set(plan_ids) - owned
+    if missing:
+        raise HTTPException(status_code=404, detail=f"plan not found: {sorted(missing)}")
+
+    variations = []
+    if payload.kind == "sweep":
+        variations = sweep_variations(payload.sweep.roi, payload.sweep.inflation)
+
+    try:
+        job = job_manager.submit(
+            current_user.id,
+            payload.kind,
+            plan_ids,
+            variations=variations,
+            ttl_seconds=payload.ttl_seconds,
+        )
+    except JobLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return job.to_dict()
+
+
+# ===== 상태 조회 (폴링) =====
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    return _get_job_or_404(job_id, current_user.id).to_dict()
+
+
+# ===== 결과 조회 (wait 초까지 대기) =====
+@router.get("/{job_id}/result", response_model=JobOut)
+async def get_job_result(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0.0, ge=0.0, le=MAX_WAIT_SECONDS),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    job = _get_job_or_404(job_id, current_user.id)
+
+    finished = await job_manager.wait(job, wait) if wait > 0 else job.status not in ("QUEUED", "RUNNING")
+    if not finished:
+        # 아직 실행 중: 상태만 돌려주고 다시 폴링하도록
+        response.status_code = 202
+        return job.to_dict()
+
+    if job.status == "FAILED":
+        raise HTTPException(status_code=500, detail=job.error or "job failed")
+    if job.status == "CANCELLED":
+        raise HTTPException(status_code=409, detail="job cancelled")
+
+    # 결과(시뮬레이션 시리즈)가 커서 검증 없이 바로 인코딩
+    return fast_json(job.to_dict(include_result=True), response)
+
+
+# ===== 취소 =====
+@router.delete("/{job_id}", response_model=JobOut)
+async def cancel_job(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    job = _get_job_or_404(job_id, current_user.id)
+    job_manager.cancel(job)
+    return job.to_dict()
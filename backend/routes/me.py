@@ -0,0 +1,62 @@
+# backend/routes/me.py
+"""
+내 데이터 한 번에 (/api/me/snapshot)
+
+설정 / 자산 화면이 저축·투자·자산·부채 목록과 플랜 목록을 요청 하나로 받는다 (각 목록 라우트와 같은 행, 같은 순서).
+ETag 는 유저 데이터 버전(Repository.data_version)에서 만든다. If-None-Match 가 맞으면
+목록을 읽거나 직렬화하지 않고 304 로 끝낸다 (버전 조회 한 번).
+아니면 버전과 목록 다섯 개를 문장 하나로 다시 읽고 (Repository.versioned_lists) 그 버전으로 ETag 를 만든다.
+태그와 본문이 같은 시점의 데이터라서, 사이에 쓰기가 끼어도 옛 본문에 새 태그가 붙지 않는다.
+"""
+from fastapi import APIRouter, Depends, Request, Response
+
+from backend.auth import get_current_user, CurrentUser
+from backend.conditional import make_etag, is_fresh, not_modified, validator_headers
+from backend.pagination import KeysetList
+from backend.repository import Repository, VersionedLists, get_repository
+from backend.responses import fast_json
+from backend.routes.assets import LIST_ASSETS
+from backend.routes.debts import LIST_DEBTS
+from backend.routes.investments import LIST_INVESTMENTS
+from backend.routes.savings import LIST_SAVINGS
+from backend.schemas.schemas import MySnapshotOut
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+LIST_PLANS = KeysetList("plans.list", "plans", "user_id", {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "retirement_year": "retirement_year",
+    "expected_death_year": "expected_death_year",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
+
+SNAPSHOT_LISTS = VersionedLists("me.snapshot", {
+    "savings": LIST_SAVINGS,
+    "investments": LIST_INVESTMENTS,
+    "assets": LIST_ASSETS,
+    "debts": LIST_DEBTS,
+    "plans": LIST_PLANS,
+})
+
+# 응답 모양이 바뀌면 올린다 (ETag 에 섞인다)
+SNAPSHOT_FORMAT = "me.snapshot/1"
+
+
+@router.get("/snapshot", response_model=MySnapshotOut)
+async def get_my_snapshot(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+):
+    version = await repo.data_version(current_user.id)
+    etag = make_etag(SNAPSHOT_FORMAT, current_user.id, *version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+
+    version, body = await repo.versioned_lists(current_user.id, SNAPSHOT_LISTS)
+    response.headers.update(validator_headers(make_etag(SNAPSHOT_FORMAT, current_user.id, *version)))
+    return fast_json(body, response)
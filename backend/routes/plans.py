@@ -2,27 +2,35 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-import asyncpg
 from fastapi import Request
 from typing import Optional
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 import json
+import asyncio
 from collections import defaultdict
-from datetime import date
+from datetime import date, datetime
 
 from backend.db import get_db_connection
+from backend.pagination import KeysetList, PageParams
+from backend.repository import Repository, get_repository
+from backend.statements import statements
 from backend.schemas.schemas import (
     PlanCreate, PlanOut, PlanUpdate,
     RevenueCreate, RevenueOut, RevenueUpdate,
     ExpenseCreate, ExpenseOut, ExpenseUpdate,
     TaxCreate, TaxOut, TaxUpdate,
 )
-from backend.schemas.schemas import PlanPriority
-from backend.schemas.simulation import SimulationRequest, SimulationDefault
 
-from backend.simulation import run_simulation, get_yearly_summary
-from backend.snapshot import load_user_snapshot
+from backend.projection import SUMMARY_KEYS, load_plan_inputs, inputs_tag, simulate_plan, month_key, build_simulation_request
+from backend.cache import projection_cache, invalidate_plan
+from backend.scheduler import projection_scheduler
+from backend.conditional import make_etag, is_fresh, not_modified, validator_headers
+from backend.responses import fast_json
+from backend import series_codec
+from backend.admission import admission, estimate_cost, simulation_months, AdmissionRejected
+from backend.deadline import SIM_REQUEST_DEADLINE_SEC, budget, check_deadline
+from backend.backtest import load_series, rolling_windows, run_backtest, summarize_backtest, BacktestDataError
 from backend.auth import get_current_user, CurrentUser  # 가정
 import logging
 logger = logging.getLogger("uvicorn.error")
@@ -124,6 +132,15 @@ def lifestyle_to_priority(lifestyles: list[str]) -> dict:
         allocations = [DEFAULT_ALLOCATION]
 
     return {"allocations": allocations}
+INSERT_PLAN = statements.register("plans.insert", """
+    INSERT INTO plans
+        (user_id, title, roi, dividend, inflation, interest_rate, description, priority, expected_death_year)
+    VALUES
+        ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+    RETURNING id, user_id, title, roi, dividend, inflation, interest_rate,
+            description, priority, expected_death_year, created_at, updated_at
+""")
+
 @router.post("/", response_model=PlanOut)
 async def create_plan(
     payload: PlanCreate,
@@ -144,15 +161,8 @@ async def create_plan(
     priority_obj = lifestyle_to_priority(payload.lifestyle)
 
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO plans
-                (user_id, title, roi, dividend, inflation, interest_rate, description, priority, expected_death_year)
-            VALUES
-                ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-            RETURNING id, user_id, title, roi, dividend, inflation, interest_rate,
-                    description, priority, expected_death_year, created_at, updated_at
-            """,
+        row = await INSERT_PLAN.fetchrow(
+            conn,
             current_user.id,
             title,
             roi,
@@ -184,122 +194,186 @@ async def create_plan(
 
 
 
-@router.get("/{plan_id}")
-async def get_plan_details(
-    plan_id: int,
-    request: Request,
-    view: Optional[str] = Query(None),
-    current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
-):
-    plan = await conn.fetchrow(
-        """
-        SELECT id, user_id, title, roi, dividend, inflation, interest_rate, description, priority,
-               retirement_year, expected_death_year, created_at, updated_at
-        FROM plans
-        WHERE user_id = $1 AND id = $2
-        """,
-        current_user.id,
-        plan_id,
-    )
-    if not plan:
-        raise HTTPException(status_code=404, detail="Plan not found")
+# 응답 모양 / 시뮬레이션 로직이 바뀌면 올린다 (ETag 에 섞인다)
+PLAN_DETAIL_FORMAT = "plans.detail/1"
 
-    # Priority 처리
-    priority = plan["priority"]
-    if isinstance(priority, str):
-        priority = json.loads(priority)
-    plan_priority = PlanPriority(**priority)
+# Accept: application/vnd.moneycoach.series 일 때 float 배열로 보내는 키 (backend.series_codec)
+PLAN_SERIES = tuple(k for k in SUMMARY_KEYS if k != "labels")
+BACKTEST_SERIES = ("worst.net_worth", "median.net_worth", "best.net_worth")
 
-    # 데이터 조회
-    revenues = await conn.fetch(
-        "SELECT category, amount, frequency, start_date, end_date FROM revenues WHERE plan_id = $1 ORDER BY created_at DESC",
-        plan_id,
-    )
-    expenses = await conn.fetch(
-        "SELECT category, amount, frequency, start_date, end_date FROM expenses WHERE plan_id = $1 ORDER BY created_at DESC",
-        plan_id,
-    )
-    taxes = await conn.fetch(
-        "SELECT category, rate, frequency FROM taxes WHERE plan_id = $1 ORDER BY created_at DESC",
-        plan_id,
-    )
 
-    snapshot = await load_user_snapshot(conn, current_user.id)
-    snapshot["revenues"] = [dict(r) for r in revenues]
-    snapshot["expenses"] = [dict(r) for r in expenses]
-    snapshot["taxes"] = [dict(r) for r in taxes]
-
-    # ✅ 핵심: plan에 저장된 interest_rate 우선, 없으면 fallback
-    interest_rate = plan["interest_rate"] if plan["interest_rate"] is not None else 0.02
-
-    sim_req = SimulationRequest(
-        plan_id=plan["id"],
-        default_value=SimulationDefault(
-            default_interest=interest_rate,      # ✅ 여기 반영
-            default_roi=plan["roi"],
-            default_dividend=plan["dividend"],
-            inflation=plan["inflation"]
-        ),
-        extra_monthly_spend=0.0,
-        priority=plan_priority,
-        expected_death_year=plan["expected_death_year"]
+def plan_validators(
+    version: dict, user_id: int, plan_id: int, today: date, view: Optional[str], encoding: Optional[str] = None,
+) -> tuple[str, datetime]:
+    """
+    plan_version 값 → (ETag, Last-Modified). 응답은 플랜 행, 하위 항목, 유저 보유 항목, 시작 월로 정해진다.
+    월이 바뀌면 시뮬레이션 시작점이 달라지므로 Last-Modified 는 적어도 이번 달 1일 (서버 시간대).
+    """
+    etag = make_etag(
+        PLAN_DETAIL_FORMAT, user_id, plan_id, month_key(today), view, encoding,
+        version["plan_updated_at"], version["items_version"], version["holdings_version"],
     )
-    sim_result = run_simulation(snapshot, sim_req, start_date=date.today())
-    summary = get_yearly_summary(sim_result)
-    
-    response_data = {
-        "request": request,
-        "plan": plan,
-        "revenues": [dict(r) for r in revenues],
-        "expenses": [dict(r) for r in expenses],
-        "taxes_input": [dict(r) for r in taxes],
-        "interest_rate": interest_rate,  # ✅ 응답도 plan 기반으로
-        "labels": summary["labels"],
-        "net_worth": summary["net_worth"],
-        "net_cash_flow": summary["net_cash_flow"],
-        "total_repayment": summary["total_repayment"],
-        "total_savings": summary["total_savings"],
-        "total_investments": summary["total_investments"],
-        "total_debts": summary["total_debts"],
-        "total_assets": summary["total_assets"],
-        "total_income": summary["total_income"],
-        "total_spend": summary["total_spend"],
-        "total_dividend": summary["total_dividend"],
-        "total_deposit": summary["total_deposit"],
-        "total_tax": summary["total_tax"],
-        "priority": plan_priority,
-        "retirement_year": plan["retirement_year"],
-        "expected_death_year": plan["expected_death_year"],
-    }
-    logger.info(response_data)
-    if view == "html":
-        return templates.TemplateResponse("plan_detail.html", response_data)
+    month_start = datetime(today.year, today.month, 1).astimezone()
+    last_modified = max(
+        t for t in (
+            month_start, version["plan_updated_at"], version["items_updated_at"], version["holdings_updated_at"],
+        ) if t is not None
+    )
+    return etag, last_modified
 
-    response_data.pop("request")
-    return response_data
 
+# /{plan_id} 보다 먼저 등록해야 한다 (아니면 "titles" 가 plan_id 로 잡혀서 422)
 @router.get("/titles")
 async def get_plan_titles(
     current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    rows = await conn.fetch(
-        """
-        SELECT title
-        FROM plans
-        WHERE user_id = $1
-        ORDER BY created_at ASC
-        """,
-        current_user.id,
-    )
-
     # ["My Plan", "My Plan 1", ...] 형태
-    titles = [r["title"] for r in rows]
+    titles = await repo.plan_titles(current_user.id)
 
     return {
         "titles": titles
     }
+
+
+@router.get("/{plan_id}", dependencies=[Depends(budget(SIM_REQUEST_DEADLINE_SEC))])
+async def get_plan_details(
+    plan_id: int,
+    request: Request,
+    response: Response,
+    view: Optional[str] = Query(None),
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+):
+    today = date.today()
+    month = month_key(today)
+    # JSON 대신 float 배열 프레임을 받을지 (HTML 은 해당 없음)
+    encoding = series_codec.negotiate(request) if view != "html" else None
+
+    # 버전 값만 읽어서 클라이언트가 가진 결과가 최신이면 스냅샷 / 시뮬레이션 없이 304
+    validators = tag = holdings_version = None
+    version = await repo.plan_version(current_user.id, plan_id)
+    if version is not None:
+        tag, holdings_version = inputs_tag(version), version["holdings_version"]
+        etag, last_modified = plan_validators(version, current_user.id, plan_id, today, view, encoding)
+        if is_fresh(request, etag, last_modified):
+            return not_modified(etag, last_modified, vary=("Accept",))
+        validators = validator_headers(etag, last_modified, vary=("Accept",))
+
+    stale = False
+
+    # 이번 달 기준으로 같은 입력 버전에서 계산된 projection 이 있으면 재사용
+    projection = projection_cache.get(current_user.id, plan_id, month, tag=tag)
+    if projection is None and version is not None and projection_scheduler.serving_previous(current_user.id, plan_id):
+        # 월 전환 갱신 대기 중: 1일에 인라인 시뮬레이션이 몰리지 않도록 지난 달 기준 결과를 그 달의 검증자로.
+        # 스케줄러가 채우면 이번 달 ETag 로 바뀌어 클라이언트가 새로 받는다
+        previous = projection_cache.get_previous(current_user.id, plan_id, month, tag=tag)
+        if previous is not None:
+            projection = previous.data
+            etag, last_modified = plan_validators(
+                version, current_user.id, plan_id, date(*previous.month, 1), view, encoding,
+            )
+            if is_fresh(request, etag, last_modified):
+                return not_modified(etag, last_modified, vary=("Accept",))
+            validators = {**validator_headers(etag, last_modified, vary=("Accept",)), "X-Projection-Stale": "1"}
+    if projection is None:
+        ticket = projection_cache.ticket(current_user.id, plan_id)
+        inputs = await load_plan_inputs(repo, current_user.id, plan_id, holdings_version)
+        if inputs is None:
+            raise HTTPException(status_code=404, detail="Plan not found")
+
+        cost = estimate_cost(inputs["snapshot"], simulation_months(today, inputs["plan"]["expected_death_year"]))
+        try:
+            async with admission.admit(current_user.id, cost):
+                # 시뮬레이션은 CPU 작업이라 이벤트 루프를 막지 않도록 스레드에서 실행 (요청 시한이 지나면 월 루프에서 멈춤)
+                projection = await asyncio.to_thread(simulate_plan, inputs, today, check_deadline)
+        except AdmissionRejected as e:
+            # 과부하: 지난 달 기준으로라도 계산해 둔 결과가 있으면 그것으로 대체, 없으면 429
+            projection = projection_cache.get_latest(current_user.id, plan_id)
+            if projection is None:
+                raise HTTPException(
+                    status_code=429,
+                    detail=e.reason,
+                    headers={"Retry-After": str(int(e.retry_after))},
+                )
+            stale = True
+        else:
+            projection_cache.put(current_user.id, plan_id, month, projection, ticket, tag=tag)
+
+    # 지난 달 결과로 대신한 응답에는 검증자를 붙이지 않는다 (이번 달 태그로 캐시되면 안 됨)
+    headers = {"X-Projection-Stale": "1"} if stale else validators
+
+    response_data = {"request": request, **projection}
+    # 본문 전체를 문자열로 만드는 데만 요청당 ~0.5ms 라서 debug 에서만 (INFO 면 포맷하지 않음)
+    logger.debug("plan detail: %s", response_data)
+    if view == "html":
+        return templates.TemplateResponse("plan_detail.html", response_data, headers=headers)
+
+    if headers:
+        response.headers.update(headers)
+
+    response_data.pop("request")
+    if encoding:
+        return series_codec.series_response(response_data, PLAN_SERIES, encoding, response)
+    return fast_json(response_data, response)
+
+
+@router.get("/{plan_id}/backtest", dependencies=[Depends(budget(SIM_REQUEST_DEADLINE_SEC))])
+async def get_plan_backtest(
+    plan_id: int,
+    request: Request,
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+):
+    """과거 수익률/물가 구간마다 플랜을 재생해서 최악/중앙/최선 결과를 반환"""
+    today = date.today()
+    inputs = await load_plan_inputs(repo, current_user.id, plan_id)
+    if inputs is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+
+    try:
+        series = load_series()
+    except BacktestDataError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    months = simulation_months(today, inputs["plan"]["expected_death_year"])
+    start_years, returns, inflation = rolling_windows(series, months)
+    if not start_years:
+        raise HTTPException(status_code=400, detail="Historical data is shorter than the plan horizon")
+
+    req = build_simulation_request(inputs["plan"])
+    cost = estimate_cost(inputs["snapshot"], months, paths=len(start_years))
+    try:
+        async with admission.admit(current_user.id, cost):
+            # 벡터화된 한 번의 계산이라 중간에 멈출 곳이 없다: 시작 전에만 확인
+            check_deadline()
+            result = await asyncio.to_thread(run_backtest, inputs["snapshot"], req, today, returns, inflation)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.reason,
+            headers={"Retry-After": str(int(e.retry_after))},
+        )
+
+    body = {"plan_id": plan_id, **summarize_backtest(start_years, result)}
+    response.headers["Vary"] = "Accept"
+    encoding = series_codec.negotiate(request)
+    if encoding:
+        return series_codec.series_response(body, BACKTEST_SERIES, encoding, response)
+    return fast_json(body, response)
+
+UPDATE_PLAN = statements.partial_update(
+    "plans.update",
+    "plans",
+    (
+        "title", "description", "roi", "dividend", "inflation", "interest_rate",
+        "retirement_year", "expected_death_year", "priority",
+    ),
+    where=("id", "user_id"),
+    returning="*",
+)
+
 @router.patch("/{plan_id}", response_model=PlanOut)
 async def update_plan(
     plan_id: int,
@@ -307,49 +381,15 @@ async def update_plan(
     current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
 ):
-    current = await conn.fetchrow(
-        "SELECT * FROM plans WHERE id = $1 AND user_id = $2",
-        plan_id, current_user.id
-    )
-    if not current:
-        raise HTTPException(status_code=404, detail="Plan not found")
-
     update_data = payload.model_dump(exclude_unset=True)
+    if update_data.get("priority") is not None:
+        update_data["priority"] = json.dumps(update_data["priority"])
 
-    final_data = dict(current)
-    final_data.update(update_data)
-
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            UPDATE plans
-            SET
-                title = $1,
-                description = $2,
-                roi = $3,
-                dividend = $4,
-                inflation = $5,
-                interest_rate = $6,   -- ✅ 추가
-                retirement_year = $7,
-                expected_death_year = $8,
-                priority = $9,
-                updated_at = now()
-            WHERE id = $10 AND user_id = $11
-            RETURNING *
-            """,
-            final_data["title"],
-            final_data["description"],
-            final_data["roi"],
-            final_data["dividend"],
-            final_data["inflation"],
-            final_data.get("interest_rate"),  # ✅ 추가 (없으면 None)
-            final_data["retirement_year"],
-            final_data["expected_death_year"],
-            final_data["priority"],
-            plan_id,
-            current_user.id
-        )
+    row = await UPDATE_PLAN.fetchrow(conn, update_data, plan_id, current_user.id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Plan not found")
 
+    invalidate_plan(plan_id)
     res_dict = dict(row)
 
     if isinstance(res_dict.get("priority"), str):
@@ -361,6 +401,11 @@ async def update_plan(
     return res_dict
 
 # ----- Plan 삭제 -----
+DELETE_PLAN = statements.register("plans.delete", """
+    DELETE FROM plans
+    WHERE id = $1 AND user_id = $2
+""")
+
 @router.delete("/{plan_id}", status_code=204)
 async def delete_plan(
     plan_id: int,
@@ -368,11 +413,8 @@ async def delete_plan(
     conn=Depends(get_db_connection),
 ):
     async with conn.transaction():
-        result = await conn.execute(
-            """
-            DELETE FROM plans
-            WHERE id = $1 AND user_id = $2
-            """,
+        result = await DELETE_PLAN.execute(
+            conn,
             plan_id,
             current_user.id,
         )
@@ -380,6 +422,7 @@ async def delete_plan(
     if result == "DELETE 0":
         raise HTTPException(status_code=404, detail="plan not found")
 
+    invalidate_plan(plan_id)
     return Response(status_code=204)
 
 
@@ -388,22 +431,37 @@ async def delete_plan(
 # Plan 하위: Revenues (CRUD에서 time_range 제거)
 # ==========================
 
+# 하위 항목 수정/삭제: plan_id 를 모르므로 같은 문장 안에서 플랜 소유자를 확인한다
+OWNED_PLAN = "plan_id IN (SELECT id FROM plans WHERE user_id = {})"
+
+
+async def ensure_plan_owner(repo: Repository, user_id: int, plan_id: int) -> None:
+    """plan_id 가 유저의 플랜이 아니면 404 (남의 플랜인지 없는 플랜인지 구분하지 않는다)"""
+    if not await repo.owned_plan_ids(user_id, [plan_id]):
+        raise HTTPException(status_code=404, detail="Plan not found")
+
+
+INSERT_REVENUE = statements.register("revenues.insert", """
+    INSERT INTO revenues
+        (plan_id, category, amount, frequency, start_date, end_date)
+    VALUES
+        ($1, $2, $3, $4, $5, $6)
+    RETURNING
+        id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
+""")
+
 @router.post("/{plan_id}/revenues", response_model=RevenueOut)
 async def create_revenue(
     plan_id: int,
     payload: RevenueCreate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
+    await ensure_plan_owner(repo, current_user.id, plan_id)
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO revenues
-                (plan_id, category, amount, frequency, start_date, end_date)
-            VALUES
-                ($1, $2, $3, $4, $5, $6)
-            RETURNING
-                id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-            """,
+        row = await INSERT_REVENUE.fetchrow(
+            conn,
             plan_id,
             payload.category,
             payload.amount,
@@ -411,57 +469,34 @@ async def create_revenue(
             payload.start_date,
             payload.end_date,
         )
+    invalidate_plan(plan_id)
     return dict(row)
 
 # ... list_revenues 에서도 SELECT 절에 start_date, end_date만 남기고 time_range 제거 ...
 
+UPDATE_REVENUE = statements.partial_update(
+    "revenues.update",
+    "revenues",
+    ("category", "amount", "frequency", "start_date", "end_date"),
+    where=("id", OWNED_PLAN),
+    returning="id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at",
+)
+
 @router.patch("/revenues/{revenue_id}", response_model=RevenueOut)
 async def update_revenue(
     revenue_id: int,
     payload: RevenueUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
 ):
-    
-    # 1. 기존 데이터 조회
-    current = await conn.fetchrow("SELECT * FROM revenues WHERE id = $1", revenue_id)
-    if not current:
-        raise HTTPException(status_code=404, detail="revenue not found")
-
-    # 2. Pydantic v2 model_dump 사용 (유저가 입력한 값만 추출)
+    # 유저가 보낸 값만 갱신 (null 을 보내면 NULL 로)
     update_dict = payload.model_dump(exclude_unset=True)
-    
-    # 🔍 디버깅용 로그 (서버 터미널에서 확인용)
-    # print(f"DEBUG: 유저 요청 데이터 -> {update_dict}")
-
-    # 3. 데이터 병합
-    final_data = dict(current)
-    final_data.update(update_dict)
-    # 4. DB 업데이트 실행 (NULL 업데이트 강제 수행)
-    async with conn.transaction():
-        # SQL 문에서 특정 값이 None(null)인 경우도 포함하여 업데이트
-        row = await conn.fetchrow(
-            """
-            UPDATE revenues
-            SET
-                category   = $1,
-                amount     = $2,
-                frequency  = $3,
-                start_date = $4,
-                end_date   = $5,  -- 이 값이 None이면 DB에는 NULL이 들어갑니다.
-                updated_at = now()
-            WHERE id = $6
-            RETURNING id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-            """,
-            final_data["category"],
-            final_data["amount"],
-            final_data["frequency"],
-            final_data["start_date"],
-            final_data["end_date"], # 여기서 None이 제대로 전달되는지가 핵심
-            revenue_id,
-        )
 
-    # 5. 반환하기 전 데이터 확인
-    # print(f"DEBUG: 업데이트 후 결과 -> {dict(row)}")
+    row = await UPDATE_REVENUE.fetchrow(conn, update_dict, revenue_id, current_user.id)
+    if not row:
+        raise HTTPException(status_code=404, detail="revenue not found")
+
+    invalidate_plan(row["plan_id"])
     return dict(row)
 # Expense 관련 함수들도 위와 동일한 방식으로 (time_range 제거, 날짜 추가) 수정하시면 됩니다.
 
@@ -469,22 +504,27 @@ async def update_revenue(
 # Plan 하위: Expenses
 # ==========================
 
+INSERT_EXPENSE = statements.register("expenses.insert", """
+    INSERT INTO expenses
+        (plan_id, category, amount, frequency, start_date, end_date)
+    VALUES
+        ($1, $2, $3, $4, $5, $6)
+    RETURNING
+        id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
+""")
+
 @router.post("/{plan_id}/expenses", response_model=ExpenseOut)
 async def create_expense(
     plan_id: int,
     payload: ExpenseCreate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
+    await ensure_plan_owner(repo, current_user.id, plan_id)
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO expenses
-                (plan_id, category, amount, frequency, start_date, end_date)
-            VALUES
-                ($1, $2, $3, $4, $5, $6)
-            RETURNING
-                id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-            """,
+        row = await INSERT_EXPENSE.fetchrow(
+            conn,
             plan_id,
             payload.category,
             payload.amount,
@@ -493,145 +533,93 @@ async def create_expense(
             payload.end_date,
         )
 
+    invalidate_plan(plan_id)
     return dict(row)
 
 
+LIST_EXPENSES = KeysetList("expenses.list", "expenses", "plan_id", {
+    "id": "id",
+    "plan_id": "plan_id",
+    "category": "category",
+    "amount": "amount",
+    "frequency": "frequency",
+    "start_date": "start_date",
+    "end_date": "end_date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
+
 @router.get("/{plan_id}/expenses", response_model=list[ExpenseOut])
 async def list_expenses(
     plan_id: int,
-    conn=Depends(get_db_connection),
-):
-    rows = await conn.fetch(
-        """
-        SELECT
-            id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-        FROM expenses
-        WHERE plan_id = $1
-        ORDER BY created_at DESC
-        """,
-        plan_id,
-    )
-    return [dict(row) for row in rows]
-
-
-# ==========================
-# Plan 하위: Revenues (수정됨)
-# ==========================
-
-@router.patch("/revenues/{revenue_id}", response_model=RevenueOut)
-async def update_revenue(
-    revenue_id: int,
-    payload: RevenueUpdate,
-    conn=Depends(get_db_connection),
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
 ):
-    print(f"--- update_revenue 호출됨 (ID: {revenue_id}) ---") # 함수 진입 확인용
-    
-    current = await conn.fetchrow("SELECT * FROM revenues WHERE id = $1", revenue_id)
-    if not current:
-        raise HTTPException(status_code=404, detail="revenue not found")
-
-    # model_dump를 사용하여 유저가 명시적으로 보낸 값만 추출
-    update_dict = payload.model_dump(exclude_unset=True)
-    print(f"DEBUG update_dict: {update_dict}") # null(None)이 포함되어 있는지 확인
-
-    final_data = dict(current)
-    final_data.update(update_dict)
-
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            UPDATE revenues
-            SET
-                category   = $1,
-                amount     = $2,
-                frequency  = $3,
-                start_date = $4,
-                end_date   = $5,
-                updated_at = now()
-            WHERE id = $6
-            RETURNING id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-            """,
-            final_data["category"],
-            final_data["amount"],
-            final_data["frequency"],
-            final_data["start_date"],
-            final_data["end_date"], # 유저가 null을 보냈다면 여기서 None이 전달됨
-            revenue_id,
-        )
-
-    return dict(row)
+    await ensure_plan_owner(repo, current_user.id, plan_id)
+    return await LIST_EXPENSES.respond(repo, plan_id, page, response)
 
 
 # ==========================
 # Plan 하위: Expenses (수정됨)
 # ==========================
 
+UPDATE_EXPENSE = statements.partial_update(
+    "expenses.update",
+    "expenses",
+    ("category", "amount", "frequency", "start_date", "end_date"),
+    where=("id", OWNED_PLAN),
+    returning="id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at",
+)
+
 @router.patch("/expenses/{expense_id}", response_model=ExpenseOut)
 async def update_expense(
     expense_id: int,
     payload: ExpenseUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
 ):
-    print(f"--- update_expense 호출됨 (ID: {expense_id}) ---")
-    
-    current = await conn.fetchrow("SELECT * FROM expenses WHERE id = $1", expense_id)
-    if not current:
-        raise HTTPException(status_code=404, detail="expense not found")
-
-    # ✅ Expense도 동일하게 model_dump 로직 적용 (null 업데이트 가능하게)
+    # ✅ Revenue 와 동일하게 보낸 값만 갱신 (null 업데이트 가능하게)
     update_dict = payload.model_dump(exclude_unset=True)
-    
-    final_data = dict(current)
-    final_data.update(update_dict)
 
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            UPDATE expenses
-            SET
-                category   = $1,
-                amount     = $2,
-                frequency  = $3,
-                start_date = $4,
-                end_date   = $5,
-                updated_at = now()
-            WHERE id = $6
-            RETURNING id, plan_id, category, amount, frequency, start_date, end_date, created_at, updated_at
-            """,
-            final_data["category"],
-            final_data["amount"],
-            final_data["frequency"],
-            final_data["start_date"],
-            final_data["end_date"],
-            expense_id,
-        )
+    row = await UPDATE_EXPENSE.fetchrow(conn, update_dict, expense_id, current_user.id)
+    if not row:
+        raise HTTPException(status_code=404, detail="expense not found")
 
+    invalidate_plan(row["plan_id"])
     return dict(row)
 # ==========================
 # Plan 하위: Taxes
 # ==========================
 
+INSERT_TAX = statements.register("taxes.insert", """
+    INSERT INTO taxes (plan_id, category, rate, frequency)
+    VALUES ($1, $2, $3, $4)
+    RETURNING id, plan_id, category, rate, frequency, created_at, updated_at
+""")
+
 @router.post("/{plan_id}/taxes", response_model=TaxOut)
 async def create_tax(
     plan_id: int,
     payload: TaxCreate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
+    await ensure_plan_owner(repo, current_user.id, plan_id)
     category = payload.category
 
     async with conn.transaction():
-        row = await conn.fetchrow(
-        """
-        INSERT INTO taxes (plan_id, category, rate, frequency)
-        VALUES ($1, $2, $3, $4)
-        RETURNING id, plan_id, category, rate, frequency, created_at, updated_at
-        """,
+        row = await INSERT_TAX.fetchrow(
+        conn,
         plan_id,
         payload.category,
         payload.rate,
         payload.frequency,
     )
 
+    invalidate_plan(plan_id)
     return {
         "id": row["id"],
         "plan_id": row["plan_id"],
@@ -643,23 +631,28 @@ async def create_tax(
     }
 
 
+LIST_TAXES = statements.register("taxes.list", """
+    SELECT
+        id,
+        plan_id,
+        category,
+        created_at,
+        updated_at
+    FROM taxes
+    WHERE plan_id = $1
+    ORDER BY created_at DESC
+""")
+
 @router.get("/{plan_id}/taxes", response_model=list[TaxOut])
 async def list_taxes(
     plan_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    rows = await conn.fetch(
-        """
-        SELECT
-            id,
-            plan_id,
-            category,
-            created_at,
-            updated_at
-        FROM taxes
-        WHERE plan_id = $1
-        ORDER BY created_at DESC
-        """,
+    await ensure_plan_owner(repo, current_user.id, plan_id)
+    rows = await LIST_TAXES.fetch(
+        conn,
         plan_id,
     )
 
@@ -675,74 +668,65 @@ async def list_taxes(
     ]
 
 
+UPDATE_TAX = statements.partial_update(
+    "taxes.update",
+    "taxes",
+    ("category", "rate", "frequency"),
+    where=("id", OWNED_PLAN),
+    returning="""
+        id,
+        plan_id,
+        category,
+        rate,
+        frequency,
+        created_at,
+        updated_at
+    """,
+)
+
 @router.patch("/taxes/{tax_id}", response_model=TaxOut)
 async def update_tax(
     tax_id: int,
     payload: TaxUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
 ):
-    current = await conn.fetchrow(
-        """
-        SELECT
-            id,
-            plan_id,
-            category,
-            created_at,
-            updated_at
-        FROM taxes
-        WHERE id = $1
-        """,
-        tax_id,
-    )
+    # 세 컬럼 모두 NULL 불가: None 이면 기존 값 유지
+    update_dict = {
+        k: v
+        for k, v in payload.model_dump(include={"category", "rate", "frequency"}).items()
+        if v is not None
+    }
 
-    if not current:
+    row = await UPDATE_TAX.fetchrow(conn, update_dict, tax_id, current_user.id)
+    if not row:
         raise HTTPException(status_code=404, detail="tax not found")
 
-    new_category = payload.category if payload.category is not None else current["category"]
+    invalidate_plan(row["plan_id"])
+    return dict(row)
 
-    async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            UPDATE taxes
-            SET
-                category   = $1,
-                updated_at = now()
-            WHERE id = $2
-            RETURNING
-                id,
-                plan_id,
-                category,
-                created_at,
-                updated_at
-            """,
-            new_category,
-            tax_id,
-        )
-
-    return {
-        "id": row["id"],
-        "plan_id": row["plan_id"],
-        "category": row["category"],
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
-    }
 
+DELETE_TAX = statements.register("taxes.delete", """
+    DELETE FROM taxes
+    WHERE id = $1 AND plan_id IN (SELECT id FROM plans WHERE user_id = $2)
+    RETURNING plan_id
+""")
 
 @router.delete("/taxes/{tax_id}", status_code=204)
 async def delete_tax(
     tax_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
     conn=Depends(get_db_connection),
 ):
     async with conn.transaction():
-        result = await conn.execute(
-            """
-            DELETE FROM taxes
-            WHERE id = $1
-            """,
+        deleted_plan_id = await DELETE_TAX.fetchval(
+            conn,
             tax_id,
+            current_user.id,
         )
 
-    if result == "DELETE 0":
+    if deleted_plan_id is None:
         raise HTTPException(status_code=404, detail="tax not found")
 
+    invalidate_plan(deleted_plan_id)
     return Response(status_code=204)
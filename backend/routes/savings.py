@@ -1,56 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 import asyncpg
 from datetime import date
 from typing import Optional
 
 from backend.db import get_db_connection
+from backend.pagination import KeysetList, PageParams
+from backend.repository import Repository, get_repository
+from backend.statements import statements
 from backend.schemas.schemas import SavingCreate, SavingUpdate, SavingOut, SavingBulkCreate
 from backend.auth import get_current_user, CurrentUser
+from backend.cache import invalidate_user
 
 router = APIRouter(prefix="/savings", tags=["savings"])
 
 # ===== 목록 조회 =====
+LIST_SAVINGS = KeysetList("savings.list", "savings", "user_id", {
+    "id": "id",
+    "user_id": "user_id",
+    "category": "category",
+    "amount": "COALESCE(amount, 0)",
+    "interest_rate": "interest_rate",
+    "compound": "compound",
+    "deposit": "COALESCE(deposit, 0)",
+    "deposit_frequency": "deposit_frequency",
+    "maturity_date": "maturity_date",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+})
+
 @router.get("/", response_model=list[SavingOut])
 async def list_savings(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: CurrentUser = Depends(get_current_user),
-    conn: asyncpg.Connection = Depends(get_db_connection),
+    repo: Repository = Depends(get_repository),
 ):
-    rows = await conn.fetch(
-        """
-        SELECT
-            id,
-            user_id,
-            category::text AS category,
-            amount,
-            interest_rate,
-            compound::text AS compound,
-            deposit,
-            deposit_frequency::text AS deposit_frequency,
-            maturity_date,
-            created_at,
-            updated_at
-        FROM savings
-        WHERE user_id = $1
-        ORDER BY created_at DESC NULLS LAST, id DESC
-        """,
-        current_user.id,
-    )
-
-    return [
-        {
-            **dict(r),
-            "category": r["category"],
-            "amount": float(r["amount"]) if r["amount"] is not None else 0.0,
-            "interest_rate": float(r["interest_rate"]) if r["interest_rate"] is not None else None,
-            "deposit": float(r["deposit"]) if r["deposit"] is not None else 0.0,
-            "deposit_frequency": r["deposit_frequency"],
-            "maturity_date": r["maturity_date"],
-        }
-        for r in rows
-    ]
+    return await LIST_SAVINGS.respond(repo, current_user.id, page, response)
 
 
 # ===== 생성 =====
+INSERT_SAVING = statements.register("savings.insert", """
+    INSERT INTO savings
+        (user_id, category, amount, interest_rate, compound, 
+         deposit, deposit_frequency, maturity_date)
+    VALUES
+        ($1, $2, $3, COALESCE($4, 0), $5, $6, $7, $8)
+    RETURNING
+        id,
+        user_id,
+        category,
+        amount,
+        interest_rate,
+        compound,
+        COALESCE(deposit, 0) AS deposit,
+        deposit_frequency,
+        maturity_date,
+        created_at,
+        updated_at
+""")
+
 @router.post("/", response_model=SavingOut)
 async def insert_saving(
     payload: SavingCreate,
@@ -61,26 +69,8 @@ async def insert_saving(
         raise HTTPException(status_code=400, detail="category is required")
 
     async with conn.transaction():
-        row = await conn.fetchrow(
-            """
-            INSERT INTO savings
-                (user_id, category, amount, interest_rate, compound, 
-                 deposit, deposit_frequency, maturity_date)
-            VALUES
-                ($1, $2, $3, COALESCE($4, 0), $5, $6, $7, $8)
-            RETURNING
-                id,
-                user_id,
-                category::text AS category,
-                amount,
-                interest_rate,
-                compound::text AS compound,
-                deposit,
-                deposit_frequency::text AS deposit_frequency,
-                maturity_date,
-                created_at,
-                updated_at
-            """,
+        row = await INSERT_SAVING.fetchrow(
+            conn,
             current_user.id,
             payload.category.upper(),
             payload.amount,
@@ -91,12 +81,17 @@ async def insert_saving(
             payload.maturity_date
         )
 
-    return {
-        **dict(row),
-        "amount": float(row["amount"]),
-        "interest_rate": float(row["interest_rate"]) if row["interest_rate"] is not None else None,
-        "deposit": float(row["deposit"]) if row["deposit"] is not None else 0.0,
-    }
+    invalidate_user(current_user.id)
+    return dict(row)
+
+# 항목 배열을 unnest 해서 한 문장(왕복 1회)으로 삽입. WITH ORDINALITY 로 요청 순서대로 id 가 매겨진다
+INSERT_SAVINGS_BULK = statements.register("savings.insert_bulk", """
+    INSERT INTO savings (user_id, category, amount)
+    SELECT $1, t.category::saving_type, t.amount
+    FROM unnest($2::text[], $3::numeric[]) WITH ORDINALITY AS t(category, amount, ord)
+    ORDER BY t.ord
+    RETURNING id, user_id, category, amount, created_at, updated_at
+""")
 
 @router.post("/bulk")
 async def insert_savings_bulk(
@@ -107,31 +102,43 @@ async def insert_savings_bulk(
     if not payload.items:
         raise HTTPException(status_code=400, detail="items is required")
 
-    async with conn.transaction():
-        rows = []
-        for item in payload.items:
-            if not item.category:
-                raise HTTPException(status_code=400, detail="category is required")
-
-            row = await conn.fetchrow(
-                """
-                INSERT INTO savings (user_id, category, amount)
-                VALUES ($1, $2, $3)
-                RETURNING id, user_id, category::text AS category, amount, created_at, updated_at
-                """,
-                current_user.id,
-                item.category.upper(),
-                item.amount,
-            )
-            rows.append(row)
+    # 검증은 DB 에 가기 전에 한 번에
+    if any(not item.category for item in payload.items):
+        raise HTTPException(status_code=400, detail="category is required")
 
+    rows = await INSERT_SAVINGS_BULK.fetch(
+        conn,
+        current_user.id,
+        [item.category.upper() for item in payload.items],
+        [item.amount for item in payload.items],
+    )
+
+    invalidate_user(current_user.id)
     return {
         "ok": True,
-        "created": [
-            {**dict(r), "amount": float(r["amount"])} for r in rows
-        ],
+        "created": [dict(r) for r in rows],
     }
 # ===== 부분 수정 (PATCH) =====
+UPDATE_SAVING = statements.partial_update(
+    "savings.update",
+    "savings",
+    ("category", "amount", "interest_rate", "compound", "deposit", "deposit_frequency", "maturity_date"),
+    where=("user_id", "id"),
+    returning="""
+        id,
+        user_id,
+        category,
+        amount,
+        interest_rate,
+        compound,
+        COALESCE(deposit, 0) AS deposit,
+        deposit_frequency,
+        maturity_date,
+        created_at,
+        updated_at
+    """,
+)
+
 @router.patch("/{saving_id}", response_model=SavingOut)
 async def update_saving(
     saving_id: int,
@@ -141,71 +148,33 @@ async def update_saving(
 ):
     data = payload.model_dump(exclude_unset=True)
 
-    fields = []
-    vals = []
-
-    # mapping에서 currency 제거
-    mapping = {
-        "category": "category",
-        "amount": "amount",
-        "interest_rate": "interest_rate",
-        "compound": "compound", 
-        "deposit": "deposit",
-        "deposit_frequency": "deposit_frequency",
-        "maturity_date": "maturity_date",
-    }
-
-    for k, v in data.items():
-        if k in mapping:
-            # ENUM 값들은 대문자로 통일
-            if k in {"category", "compound", "deposit_frequency"} and v is not None:
-                v = str(v).upper()
-            fields.append(f'{mapping[k]} = ${len(vals) + 1}')
-            vals.append(v)
+    # ENUM 값들은 대문자로 통일
+    for k in ("category", "compound", "deposit_frequency"):
+        if data.get(k) is not None:
+            data[k] = str(data[k]).upper()
 
-    if not fields:
+    if not UPDATE_SAVING.changes(data):
         raise HTTPException(status_code=400, detail="no updatable fields")
 
-    vals.extend([current_user.id, saving_id])
-
-    q = f"""
-        UPDATE savings
-           SET {', '.join(fields)}, updated_at = now()
-         WHERE user_id = ${len(vals)-1} AND id = ${len(vals)}
-        RETURNING
-            id,
-            user_id,
-            category::text AS category,
-            amount,
-            interest_rate,
-            compound::text AS compound,
-            deposit,
-            deposit_frequency::text AS deposit_frequency,
-            maturity_date,
-            created_at,
-            updated_at
-    """
-    row = await conn.fetchrow(q, *vals)
+    row = await UPDATE_SAVING.fetchrow(conn, data, current_user.id, saving_id)
     if not row:
         raise HTTPException(status_code=404, detail="saving not found")
 
-    return {
-        **dict(row),
-        "amount": float(row["amount"]),
-        "interest_rate": float(row["interest_rate"]) if row["interest_rate"] is not None else None,
-        "deposit": float(row["deposit"]) if row["deposit"] is not None else 0.0,
-    }
+    invalidate_user(current_user.id)
+    return dict(row)
 
 # (삭제 로직은 기존과 동일하므로 유지)
 # ===== 삭제 =====
+DELETE_SAVING = statements.register("savings.delete", "DELETE FROM savings WHERE user_id=$1 AND id=$2")
+
 @router.delete("/{saving_id}")
 async def delete_saving(
     saving_id: int,
     current_user: CurrentUser = Depends(get_current_user),
     conn: asyncpg.Connection = Depends(get_db_connection),
 ):
-    res = await conn.execute(
-        "DELETE FROM savings WHERE user_id=$1 AND id=$2",
+    res = await DELETE_SAVING.execute(
+        conn,
         current_user.id,
         saving_id,
     )  # 예: "DELETE 1"
@@ -213,4 +182,5 @@ async def delete_saving(
     if not res.endswith(" 1"):
         raise HTTPException(status_code=404, detail="saving not found")
 
+    invalidate_user(current_user.id)
     return {"status": "ok", "deleted_id": saving_id}
@@ -1,12 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 import asyncpg
 
 from backend.db import get_db_connection
+from backend.repository import Repository, get_repository
+from backend.responses import fast_json
+from backend.statements import statements
 from backend.auth import get_current_user, CurrentUser
-from backend.schemas.schemas import UserCreate, UserOut
+from backend.schemas.schemas import UserCreate, UserOut, FinancialSummaryOut
+from backend.snapshot import load_financial_summary
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+UPDATE_USER_PROFILE = statements.register("users.update_profile", """
+    UPDATE users
+    SET
+        birth = $1,
+        gender = $2,
+        purpose = $3,
+        updated_at = NOW()
+    WHERE id = $4
+    RETURNING
+        id,
+        username,
+        birth,
+        gender,
+        purpose,
+        created_at,
+        updated_at
+""")
+
 @router.post("/me", response_model=UserOut)
 async def upsert_user_profile(
     payload: UserCreate,
@@ -18,24 +40,8 @@ async def upsert_user_profile(
     저장 컬럼: birth, gender, purpose
     """
 
-    row = await conn.fetchrow(
-        """
-        UPDATE users
-        SET
-            birth = $1,
-            gender = $2,
-            purpose = $3,
-            updated_at = NOW()
-        WHERE id = $4
-        RETURNING
-            id,
-            username,
-            birth,
-            gender,
-            purpose,
-            created_at,
-            updated_at
-        """,
+    row = await UPDATE_USER_PROFILE.fetchrow(
+        conn,
         payload.birth,
         payload.gender,
         payload.purpose,
@@ -46,3 +52,13 @@ async def upsert_user_profile(
         raise HTTPException(status_code=404, detail="User not found")
 
     return dict(row)
+
+
+@router.get("/me/summary", response_model=FinancialSummaryOut)
+async def get_financial_summary(
+    response: Response,
+    current_user: CurrentUser = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+):
+    """보유 항목 합계/개수 (목록 헤더용). 항목 수와 상관없이 한 행만 읽는다"""
+    return fast_json(await load_financial_summary(repo, current_user.id), response)
@@ -0,0 +1,154 @@
+# backend/scheduler.py
+"""
+월 전환 projection 갱신 스케줄러
+
+get_plan_details 는 date.today() 부터 시뮬레이션하므로 달이 바뀌면 캐시된 projection 이 전부 stale 이 된다.
+달이 바뀐 것을 감지하면 stale 엔트리들을 새 달 기준으로 다시 계산해서 캐시에 채워 넣는다.
+1일 아침에 한꺼번에 몰리지 않도록 엔트리마다 PROJECTION_REFRESH_WINDOW_SEC 안의 고정 오프셋을 배정한다.
+자기 슬롯 전에 요청이 오면 기본은 인라인으로 시뮬레이션한다. PROJECTION_SERVE_PREVIOUS_SEC 를 켜면 월 전환 후 그 시간 동안만
+갱신을 기다리는 엔트리의 serving_previous() 가 True 이고, get_plan_details 가 지난 달 기준 결과를 그 달의 검증자로
+돌려준다 (갱신 후 새 달 ETag 로 바뀜). 지난 달 결과를 보여주는 시간과 1일 부하를 맞바꾸는 설정이라 짧게 둔다.
+
+환경 변수
+- PROJECTION_REFRESH_WINDOW_SEC: 재계산을 분산할 구간 (기본 7200초)
+- PROJECTION_SERVE_PREVIOUS_SEC: 월 전환 후 지난 달 결과로 응답할 최대 시간 (기본 0 = 끔)
+- PROJECTION_REFRESH_CONCURRENCY: 동시에 돌릴 재계산 수 (기본 2)
+- PROJECTION_REFRESH_CHECK_SEC: 월 전환 감지 주기 (기본 60초)
+"""
+import asyncio
+import logging
+import os
+import time
+import zlib
+from datetime import date
+from typing import Optional
+
+from backend.admission import admission, estimate_cost, simulation_months
+from backend.cache import projection_cache
+from backend.shards import shard_router
+from backend.projection import load_plan_inputs, inputs_tag, simulate_plan, month_key
+from backend.repository import PostgresRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectionRefreshScheduler:
+    def __init__(
+        self,
+        window_seconds: float = float(os.getenv("PROJECTION_REFRESH_WINDOW_SEC", "7200")),
+        concurrency: int = int(os.getenv("PROJECTION_REFRESH_CONCURRENCY", "2")),
+        check_interval: float = float(os.getenv("PROJECTION_REFRESH_CHECK_SEC", "60")),
+        serve_previous_seconds: float = float(os.getenv("PROJECTION_SERVE_PREVIOUS_SEC", "0")),
+    ):
+        self.window_seconds = max(0.0, window_seconds)
+        self.concurrency = max(1, concurrency)
+        self.check_interval = check_interval
+        self.serve_previous_seconds = max(0.0, serve_previous_seconds)
+        self._task: Optional[asyncio.Task] = None
+        self._month = month_key(date.today())
+        # 이번 월 전환에서 아직 재계산하지 않은 (user_id, plan_id) 와 갱신 시작 시각 (monotonic)
+        self._pending: set[tuple[int, int]] = set()
+        self._refresh_started = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def serving_previous(self, user_id: int, plan_id: int) -> bool:
+        """
+        이 엔트리를 스케줄러가 곧 새 달 기준으로 채울 예정이고 갱신 시작 후 serve_previous_seconds 가 안 지났으면 True
+        (요청 경로는 지난 달 결과로 응답). 달이 바뀐 것을 아직 감지하기 전 (최대 check_interval) 도 포함.
+        serve_previous_seconds 가 0 이거나 스케줄러가 안 돌고 있으면 False
+        """
+        if self._task is None or self.serve_previous_seconds <= 0:
+            return False
+        if month_key(date.today()) != self._month:
+            return True
+        return (
+            (user_id, plan_id) in self._pending
+            and time.monotonic() - self._refresh_started < self.serve_previous_seconds
+        )
+
+    def offset_for(self, user_id: int, plan_id: int) -> float:
+        """엔트리별 고정 오프셋 (매달 같은 슬롯에 배정되도록 해시 기반)"""
+        h = zlib.crc32(f"{user_id}:{plan_id}".encode()) % 10_000
+        return self.window_seconds * h / 10_000
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            current = month_key(date.today())
+            if current == self._month:
+                continue
+            self._month = current
+            try:
+                await self.refresh_all(current)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("projection refresh failed")
+
+    async def refresh_all(self, month: tuple[int, int]) -> int:
+        """stale 엔트리를 window 에 걸쳐 재계산. 처리한 엔트리 수 반환"""
+        keys = sorted(projection_cache.stale_keys(month), key=lambda k: self.offset_for(*k))
+        started = self._refresh_started = time.monotonic()
+        self._pending = set(keys)
+        if not keys:
+            return 0
+
+        logger.info(f"projection refresh: {len(keys)} entries over {self.window_seconds:.0f}s")
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(user_id: int, plan_id: int):
+            delay = self.offset_for(user_id, plan_id) - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                async with sem:
+                    # 대기 중에 달이 또 바뀌었거나 요청 경로에서 이미 채워졌으면 건너뜀
+                    if month_key(date.today()) != month or projection_cache.get(user_id, plan_id, month) is not None:
+                        return
+                    await self.refresh_one(user_id, plan_id)
+            except Exception:
+                logger.exception(f"projection refresh failed: user={user_id} plan={plan_id}")
+            finally:
+                # 실패했으면 이후 요청은 인라인으로 계산한다
+                self._pending.discard((user_id, plan_id))
+
+        await asyncio.gather(*(refresh(u, p) for u, p in keys))
+        return len(keys)
+
+    async def refresh_one(self, user_id: int, plan_id: int) -> None:
+        today = date.today()
+        ticket = projection_cache.ticket(user_id, plan_id)
+
+        async with shard_router.acquire(user_id) as conn:
+            repo = PostgresRepository(conn)
+            version = await repo.plan_version(user_id, plan_id)
+            inputs = None if version is None else await load_plan_inputs(repo, user_id, plan_id, version["holdings_version"])
+
+        if inputs is None:
+            # 그 사이 플랜이 삭제됨
+            projection_cache.invalidate_plan(plan_id)
+            return
+
+        # 시뮬레이션은 CPU 작업이라 이벤트 루프를 막지 않도록 스레드에서 실행.
+        # 백그라운드 갱신이므로 admission 에서 거절하지 않고 자리가 날 때까지 기다린다
+        cost = estimate_cost(inputs["snapshot"], simulation_months(today, inputs["plan"]["expected_death_year"]))
+        async with admission.admit(user_id, cost, wait=None):
+            data = await asyncio.to_thread(simulate_plan, inputs, today)
+        projection_cache.put(user_id, plan_id, month_key(today), data, ticket, tag=inputs_tag(version))
+
+
+# 싱글톤 인스턴스
+projection_scheduler = ProjectionRefreshScheduler()
@@ -0,0 +1,34 @@
+# app/schemas/job.py
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal, Any
+from datetime import datetime
+
+# plan: 단일 플랜 projection / compare: 여러 플랜 비교 / sweep: roi·inflation 가정값 조합별 projection
+JobKind = Literal["plan", "compare", "sweep"]
+JobStatus = Literal["QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "CANCELLED"]
+
+
+class SweepParams(BaseModel):
+    """비어 있는 목록은 플랜에 저장된 값 하나로 취급"""
+    roi: List[float] = Field(default_factory=list, description="연 수익률(%) 후보")
+    inflation: List[float] = Field(default_factory=list, description="인플레이션(%) 후보")
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    plan_ids: List[int] = Field(..., min_length=1)
+    sweep: Optional[SweepParams] = None
+    ttl_seconds: int = Field(3600, ge=60, le=86400, description="완료 후 결과 보관 시간")
+
+
+class JobOut(BaseModel):
+    id: str
+    kind: JobKind
+    status: JobStatus
+    progress: float = 0.0
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    result: Optional[Any] = None
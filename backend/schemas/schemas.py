@@ -32,6 +32,20 @@ class UserOut(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+class FinancialSummaryOut(BaseModel):
+    savings_total: float
+    savings_count: int
+    investments_total: float
+    investments_count: int
+    assets_total: float
+    assets_count: int
+    asset_loans_total: float
+    debts_total: float
+    debts_count: int
+    monthly_repayment: float
+    version: int
+    updated_at: Optional[datetime] = None
+
 
 # ===== Savings =====
 class SavingCreate(BaseModel):
@@ -296,4 +310,22 @@ class PlanOut(BaseModel):
     inflation: Optional[float] = None
     priority: Optional[PlanPriority] = None
     created_at: Optional[datetime]
-    updated_at: Optional[datetime]
\ No newline at end of file
+    updated_at: Optional[datetime]
+
+class PlanListItemOut(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    retirement_year: int | None = None
+    expected_death_year: int | None = None
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+# ===== 내 데이터 한 번에 (/api/me/snapshot) =====
+class MySnapshotOut(BaseModel):
+    savings: List[SavingOut]
+    investments: List[InvestmentOut]
+    assets: List[AssetOut]
+    debts: List[DebtOut]
+    plans: List[PlanListItemOut]
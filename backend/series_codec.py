@@ -0,0 +1,124 @@
+# backend/series_codec.py
+"""
+시뮬레이션 시리즈 바이너리 인코딩 (콘텐츠 협상)
+
+연도별 시리즈 (net_worth, total_savings ...) 는 JSON 이면 숫자마다 십진 텍스트 (~18 바이트) 로 나가고
+브라우저가 다시 float 으로 파싱한다. Accept 에 SERIES_MEDIA_TYPE 이 있으면 시리즈는 리틀 엔디안 float 배열로,
+나머지 응답은 작은 JSON 헤더로 보낸다. 프런트엔드는 복사 없이 Float64Array / Float32Array 로 읽는다
+(frontend/src/utils/seriesCodec.ts).
+
+    Accept: application/vnd.moneycoach.series              → float64 (JSON 과 같은 값)
+    Accept: application/vnd.moneycoach.series; dtype=f32   → float32 (차트용, 유효숫자 7자리)
+
+Accept 에 없거나 (q=0 포함) 모르는 dtype 이면 기존 JSON 응답.
+
+프레임 (리틀 엔디안):
+     0  4B  매직 b"MCSF"
+     4  1B  포맷 버전 (1)
+     5  1B  원소 크기 (8 = float64, 4 = float32)
+     6  2B  예약 (0)
+     8  4B  헤더 길이 N (uint32)
+    12  NB  헤더 JSON (UTF-8): {"body": 시리즈를 뺀 나머지 응답, "series": [[경로, 바이트 오프셋, 원소 수], ...]}
+        ..  0 패딩, 이후 시리즈 데이터. 배열마다 8 바이트 정렬 (오프셋은 프레임 처음부터)
+
+경로는 "net_worth", "worst.net_worth" 처럼 dict 키를 점으로 이은 것. 응답에 없는 경로는 건너뛰고, None 은 NaN.
+"""
+import struct
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from fastapi import Request, Response
+
+from backend.responses import dumps
+
+SERIES_MEDIA_TYPE = "application/vnd.moneycoach.series"
+SERIES_MAGIC = b"MCSF"
+SERIES_VERSION = 1
+
+# Accept 의 dtype 파라미터 → numpy dtype
+DTYPES = {"f64": "<f8", "f32": "<f4"}
+
+_PREAMBLE = struct.Struct("<4sBBHI")
+_ALIGN = 8
+
+
+def negotiate(request: Request) -> Optional[str]:
+    """Accept 에 시리즈 형식이 있으면 dtype ("f64" / "f32"), 없으면 None (JSON)"""
+    accept = request.headers.get("accept")
+    if not accept or SERIES_MEDIA_TYPE not in accept:
+        return None
+    for item in accept.split(","):
+        media_type, *params = (p.strip() for p in item.split(";"))
+        if media_type.lower() != SERIES_MEDIA_TYPE:
+            continue
+        options = dict(p.partition("=")[::2] for p in params)
+        try:
+            if float(options.get("q", "1")) <= 0:
+                return None
+        except ValueError:
+            return None
+        dtype = options.get("dtype", "f64").lower()
+        return dtype if dtype in DTYPES else None
+    return None
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+def encode(content: dict[str, Any], paths: Iterable[str], dtype: str = "f64") -> bytes:
+    """응답 dict → 프레임 바이트. content 는 바꾸지 않는다 (경로를 따라 dict 만 얕게 복사)"""
+    np_dtype = np.dtype(DTYPES[dtype])
+    body = dict(content)
+    arrays: list[tuple[str, bytes, int]] = []
+    for path in paths:
+        *parents, leaf = path.split(".")
+        node = body
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                break
+            node[key] = node = dict(child)
+        else:
+            if leaf in node:
+                values = np.asarray(node.pop(leaf), dtype=np.float64).astype(np_dtype)
+                arrays.append((path, values.tobytes(), len(values)))
+
+    # 헤더 길이에 따라 데이터 오프셋이 정해지므로 오프셋은 데이터 시작 기준으로 먼저 매기고 헤더 뒤에 옮긴다
+    relative = []
+    position = 0
+    for path, data, length in arrays:
+        relative.append((path, position, length))
+        position += len(data) + _pad(len(data))
+
+    def header_for(start: int) -> bytes:
+        return dumps({"body": body, "series": [[p, start + o, n] for p, o, n in relative]})
+
+    # 오프셋 자릿수가 바뀌면 헤더 길이도 바뀐다: 데이터 시작이 더 이상 안 움직일 때까지
+    start = 0
+    while True:
+        header = header_for(start)
+        end = _PREAMBLE.size + len(header)
+        if end + _pad(end) == start:
+            break
+        start = end + _pad(end)
+
+    parts = [_PREAMBLE.pack(SERIES_MAGIC, SERIES_VERSION, np_dtype.itemsize, 0, len(header)), header, bytes(_pad(end))]
+    for _, data, _ in arrays:
+        parts.append(data)
+        parts.append(bytes(_pad(len(data))))
+    return b"".join(parts)
+
+
+def series_response(
+    content: dict[str, Any], paths: Iterable[str], dtype: str, response: Optional[Response] = None
+) -> Response:
+    """바이너리 응답. response 는 라우트가 주입받은 Response (헤더 / 상태 코드를 옮긴다, fast_json 과 같음)"""
+    binary = Response(
+        encode(content, paths, dtype),
+        status_code=(response.status_code if response is not None else None) or 200,
+        media_type=SERIES_MEDIA_TYPE,
+    )
+    if response is not None:
+        binary.raw_headers.extend(response.raw_headers)
+    return binary
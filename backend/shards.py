@@ -0,0 +1,475 @@
+# backend/shards.py
+"""
+user_id 기준 샤딩
+
+모든 테이블이 user_id 로 (plans 하위 항목은 plans 를 거쳐) 묶여 있으므로 유저 한 명의 데이터는 한 샤드에 모은다.
+샤드 0 은 기존 DB (DB_HOST/DB_PORT/DB_NAME), 나머지는 DB_SHARDS 로 지정한다. 샤드가 하나면 아무것도 바뀌지 않는다.
+
+유저 → 샤드
+1. user_shard_overrides 에 있으면 그 샤드 (rebalance 로 옮긴 유저 등)
+2. id <= legacy_max_user_id 면 샤드 0 (샤딩 전부터 있던 유저)
+3. 그 외 id % shard_count
+   `init` 이 샤드 i 의 모든 id 시퀀스를 INCREMENT BY shard_count, 나머지 i 로 맞춰 두므로
+   샤드 i 에서 만든 유저는 저절로 샤드 i 로 라우팅되고, 어느 테이블이든 id 가 샤드끼리 겹치지 않는다 (옮길 때 id 그대로 복사).
+디렉터리(shard_layout, user_shard_overrides — 0004 마이그레이션)는 샤드 0 에 두고 워커마다 메모리에 올린다.
+바뀌면 무효화 버스로 "shard" 알림을 보내고, SHARD_DIRECTORY_REFRESH_SEC 마다 전체를 다시 읽는다.
+
+연결
+- 요청: get_db_connection 이 JWT 의 user_id 로 샤드를 고른다 (DB 조회 없이). 토큰이 없는 요청은 샤드 0.
+  replica (backend.replicas) 는 샤드 0 에만 적용된다.
+- /auth/anon: get_new_user_connection 이 샤드를 돌아가며 골라서 거기서 유저를 만든다.
+- 백그라운드 (스케줄러 / 잡): shard_router.acquire(user_id)
+
+운영 (python -m backend.shards ...)
+    migrate                  # 모든 샤드에 마이그레이션 적용
+    init                     # 샤드 배치 기록 + 시퀀스 interleave. 샤드를 추가/제거한 뒤에도 다시 실행 (점검 시간에)
+    status                   # 배치, 샤드별 유저 수 / 시퀀스, override 수
+    move USER_ID --to K      # 유저 한 명을 샤드 K 로 옮김 (--dry-run: 옮길 행 수만 출력)
+
+move 순서: 원본 샤드에서 유저의 행을 전부 FOR UPDATE 로 잠그고 읽기 → 대상 샤드에 같은 id 로 삽입(커밋)
+→ 디렉터리 override 기록 → 원본 삭제(커밋) → "shard"/"user" 알림. 잠금 동안 그 유저의 쓰기는 기다리고,
+옮긴 직후 알림이 도착하기 전의 짧은 순간에는 원본 샤드로 간 요청이 404/401 이 될 수 있다 (재시도하면 새 샤드).
+중간에 실패하면 다시 실행하면 된다 (대상 샤드의 잔여 행은 먼저 지운다).
+
+환경 변수
+- DB_SHARDS: 샤드 1.. 의 "host[:port][/dbname]" 쉼표 목록 (계정은 DB_USER/DB_PASS 공유, 비어 있으면 샤드 0 하나)
+- SHARD_DIRECTORY_REFRESH_SEC: 디렉터리 전체 재로딩 주기 (기본 60초)
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+import asyncpg
+from fastapi import Depends, HTTPException, Request
+from jose import JWTError
+
+from backend.auth import decode_token
+from backend.db import Database, connect, db
+from backend.invalidation import INVALIDATION_CHANNEL, invalidation_bus
+from backend.repository import PostgresRepository
+from backend.tracing import trace_request
+
+logger = logging.getLogger(__name__)
+
+DB_SHARDS = os.getenv("DB_SHARDS", "")
+SHARD_DIRECTORY_REFRESH_SEC = float(os.getenv("SHARD_DIRECTORY_REFRESH_SEC", "60"))
+
+# 유저 한 명의 데이터 (부모 → 자식 순서). 옮길 때 이 순서로 넣고, 지울 때는 users 의 CASCADE 로 지운다.
+# user_financial_summary 는 대상 샤드에서 트리거가 다시 만든다.
+USER_DATA = (
+    ("users", "id = $1"),
+    ("plans", "user_id = $1"),
+    ("savings", "user_id = $1"),
+    ("investments", "user_id = $1"),
+    ("assets", "user_id = $1"),
+    ("debts", "user_id = $1"),
+    ("revenues", "plan_id IN (SELECT id FROM plans WHERE user_id = $1)"),
+    ("expenses", "plan_id IN (SELECT id FROM plans WHERE user_id = $1)"),
+    ("taxes", "plan_id IN (SELECT id FROM plans WHERE user_id = $1)"),
+)
+
+Target = tuple[Optional[str], Optional[int], Optional[str]]
+
+
+def parse_shards(value: str) -> list[Target]:
+    """"host[:port][/dbname],..." → [(host, port, dbname)]"""
+    targets = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        address, _, database = item.partition("/")
+        host, _, port = address.partition(":")
+        targets.append((host, int(port) if port else None, database or None))
+    return targets
+
+
+# 샤드 0 은 기본 연결 설정 (None = DB_HOST/DB_PORT/DB_NAME)
+SHARD_TARGETS: list[Target] = [(None, None, None), *parse_shards(DB_SHARDS)]
+
+
+async def connect_shard(shard: int, init_hooks: bool = False) -> asyncpg.Connection:
+    host, port, database = SHARD_TARGETS[shard]
+    return await connect(init_hooks=init_hooks, host=host, port=port, database=database)
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        primary: Database,
+        targets: list[Target],
+        refresh_interval: float = SHARD_DIRECTORY_REFRESH_SEC,
+    ):
+        self.shards = [primary] + [
+            Database(host=host, port=port, database=database, role="shard", init_hooks=primary._init_hooks)
+            for host, port, database in targets
+        ]
+        self.refresh_interval = refresh_interval
+        self.legacy_max_user_id = 0
+        self.overrides: dict[int, int] = {}
+        # 워커마다 시작점을 달리해서 재시작 직후 샤드 0 에 몰리지 않게
+        start = random.randrange(len(self.shards))
+        self._new_user_shards = itertools.cycle([*range(start, len(self.shards)), *range(start)])
+        self._task: Optional[asyncio.Task] = None
+        self.routed = [0] * len(self.shards)
+        self.reloads = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.shards)
+
+    # ---------- 수명주기 ----------
+    async def start(self) -> None:
+        if self.count == 1:
+            return
+        for shard in self.shards[1:]:
+            await shard.start()
+        await self.reload()
+        self.shards[0].set_shard_router(self.route)
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        self.shards[0].set_shard_router(None)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for shard in self.shards[1:]:
+            await shard.stop()
+
+    # ---------- 디렉터리 ----------
+    async def reload(self) -> None:
+        async with self.shards[0].acquire() as conn:
+            layout = await conn.fetchrow("SELECT shard_count, legacy_max_user_id FROM shard_layout")
+            rows = await conn.fetch("SELECT user_id, shard FROM user_shard_overrides")
+        if layout is None:
+            raise RuntimeError("shard layout is missing: run `python -m backend.shards init`")
+        if layout["shard_count"] != self.count:
+            raise RuntimeError(
+                f"shard layout has {layout['shard_count']} shards but DB_SHARDS configures {self.count}: "
+                "run `python -m backend.shards init`"
+            )
+        self.legacy_max_user_id = layout["legacy_max_user_id"]
+        self.overrides = {r["user_id"]: r["shard"] for r in rows}
+        self.reloads += 1
+
+    async def _reload_user(self, user_id: int) -> None:
+        async with self.shards[0].acquire() as conn:
+            shard = await conn.fetchval("SELECT shard FROM user_shard_overrides WHERE user_id = $1", user_id)
+        if shard is None:
+            self.overrides.pop(user_id, None)
+        else:
+            self.overrides[user_id] = shard
+
+    def on_invalidation(self, kind: str, key: int) -> None:
+        """무효화 버스 구독자: 다른 워커 / move 도구가 디렉터리를 바꿨을 때"""
+        if self.count == 1:
+            return
+        if kind == "shard":
+            asyncio.create_task(self._reload_user(key))
+        elif kind == "all":
+            # 버스 재연결 등으로 알림을 놓쳤을 수 있다
+            asyncio.create_task(self.reload())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("shard directory reload failed")
+
+    # ---------- 라우팅 ----------
+    def shard_for(self, user_id: int) -> int:
+        shard = self.overrides.get(user_id)
+        if shard is not None:
+            return shard
+        if user_id <= self.legacy_max_user_id:
+            return 0
+        return user_id % self.count
+
+    def database_for(self, user_id: int) -> Database:
+        return self.shards[self.shard_for(user_id)]
+
+    @asynccontextmanager
+    async def acquire(self, user_id: int):
+        """풀 밖 작업(스케줄러 / 잡)용: 유저의 샤드에서 연결을 빌린다"""
+        async with self.database_for(user_id).acquire() as conn:
+            yield conn
+
+    def route(self, request: Request) -> Optional[Database]:
+        """db.set_shard_router 에 등록되는 함수. 토큰이 없거나 잘못됐으면 None (샤드 0, 인증은 get_current_user 가 거절)"""
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            user_id = decode_token(token)
+        except (JWTError, ValueError):
+            return None
+        shard = self.shard_for(user_id)
+        self.routed[shard] += 1
+        return self.shards[shard]
+
+    def next_new_user_shard(self) -> int:
+        return next(self._new_user_shards)
+
+    async def ensure_routed(self, user_id: int, shard: int) -> None:
+        """샤드 `shard` 에서 만든 유저가 규칙상 다른 샤드로 가면 (init 전 등) override 로 고정"""
+        if self.shard_for(user_id) == shard:
+            return
+        async with self.shards[0].acquire() as conn:
+            await set_override(conn, user_id, shard)
+        self.overrides[user_id] = shard
+        invalidation_bus.publish("shard", user_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shards": [
+                {"shard": i, "host": s.host, "port": s.port, "database": s.database, "routed": self.routed[i], "pool": s.stats()}
+                for i, s in enumerate(self.shards)
+            ],
+            "legacy_max_user_id": self.legacy_max_user_id,
+            "overrides": len(self.overrides),
+            "reloads": self.reloads,
+        }
+
+
+async def set_override(conn: asyncpg.Connection, user_id: int, shard: int) -> None:
+    await conn.execute(
+        """
+        INSERT INTO user_shard_overrides (user_id, shard) VALUES ($1, $2)
+        ON CONFLICT (user_id) DO UPDATE SET shard = EXCLUDED.shard, moved_at = now()
+        """,
+        user_id, shard,
+    )
+
+
+# 싱글톤 인스턴스
+shard_router = ShardRouter(db, SHARD_TARGETS[1:])
+invalidation_bus.add_subscriber(shard_router.on_invalidation)
+
+
+async def get_new_user_connection(request: Request):
+    """
+    FastAPI 의존성 (/auth/anon): 새 유저를 만들 샤드를 돌아가며 골라 연결을 빌린다.
+    고른 샤드는 request.state.shard 에 남긴다 (유저를 만든 뒤 shard_router.ensure_routed 에 넘김).
+    """
+    trace_request(request)
+    shard = shard_router.next_new_user_shard()
+    target = shard_router.shards[shard]
+    request.state.shard = shard
+    try:
+        conn = await target._acquire()
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy", headers={"Retry-After": "1"})
+    try:
+        yield conn
+    finally:
+        await target._release(conn)
+
+
+async def get_new_user_repository(conn: asyncpg.Connection = Depends(get_new_user_connection)):
+    """FastAPI 의존성 (/auth/anon): 새 유저를 만들 샤드의 연결을 감싼 PostgresRepository"""
+    return PostgresRepository(conn)
+
+
+# ==========================
+# CLI
+# ==========================
+async def _table_ids(conn: asyncpg.Connection, table: str) -> tuple[str, int]:
+    """(id 시퀀스 이름, 지금까지 쓴 가장 큰 id — 행이 지워졌어도 시퀀스 값까지 포함)"""
+    seq = await conn.fetchval("SELECT pg_get_serial_sequence($1, 'id')", table)
+    used = await conn.fetchval(
+        f"SELECT GREATEST((SELECT COALESCE(max(id), 0) FROM {table}), (SELECT last_value FROM {seq}))"
+    )
+    return seq, used
+
+
+async def init_layout(conns: list[asyncpg.Connection]) -> dict[str, Any]:
+    n = len(conns)
+    tables = [table for table, _ in USER_DATA]
+
+    used: dict[str, int] = {}
+    for conn in conns:
+        for table in tables:
+            _, value = await _table_ids(conn, table)
+            used[table] = max(used.get(table, 0), value)
+
+    # 샤드 i 의 다음 id 가 used 보다 크고 i (mod n) 이 되도록
+    for i, conn in enumerate(conns):
+        async with conn.transaction():
+            for table in tables:
+                seq, _ = await _table_ids(conn, table)
+                last = used[table] + (i - used[table]) % n
+                if last < 1:
+                    last += n
+                await conn.execute(f"ALTER SEQUENCE {seq} INCREMENT BY {n}")
+                await conn.execute("SELECT setval($1, $2, true)", seq, last)
+
+    # 지금까지의 유저는 규칙상 전부 샤드 0 이 되므로, 다른 샤드에 있는 유저는 override 로 남긴다
+    overrides: list[tuple[int, int]] = []
+    for i, conn in enumerate(conns[1:], start=1):
+        overrides += [(r["id"], i) for r in await conn.fetch("SELECT id FROM users")]
+
+    directory = conns[0]
+    async with directory.transaction():
+        await directory.execute(
+            """
+            INSERT INTO shard_layout (singleton, shard_count, legacy_max_user_id) VALUES (true, $1, $2)
+            ON CONFLICT (singleton) DO UPDATE SET
+                shard_count = EXCLUDED.shard_count,
+                legacy_max_user_id = EXCLUDED.legacy_max_user_id,
+                updated_at = now()
+            """,
+            n, used["users"],
+        )
+        await directory.execute("TRUNCATE user_shard_overrides")
+        await directory.executemany(
+            "INSERT INTO user_shard_overrides (user_id, shard) VALUES ($1, $2)", overrides
+        )
+    await _notify(directory, [("all", 0)])
+    return {"shard_count": n, "legacy_max_user_id": used["users"], "overrides": len(overrides)}
+
+
+async def _load_router(directory: asyncpg.Connection) -> ShardRouter:
+    router = ShardRouter(db, SHARD_TARGETS[1:])
+    layout = await directory.fetchrow("SELECT shard_count, legacy_max_user_id FROM shard_layout")
+    if layout is None or layout["shard_count"] != router.count:
+        raise SystemExit("shard layout is missing or out of date: run `python -m backend.shards init` first")
+    router.legacy_max_user_id = layout["legacy_max_user_id"]
+    router.overrides = {
+        r["user_id"]: r["shard"] for r in await directory.fetch("SELECT user_id, shard FROM user_shard_overrides")
+    }
+    return router
+
+
+async def _notify(conn: asyncpg.Connection, events: list[tuple[str, int]]) -> None:
+    """실행 중인 워커들에게 알림 (무효화 버스와 같은 채널 / 형식)"""
+    payloads = [f"shards-cli:{kind}:{key}" for kind, key in events]
+    await conn.execute("SELECT pg_notify($1, p) FROM unnest($2::text[]) AS p", INVALIDATION_CHANNEL, payloads)
+
+
+async def move_user(
+    conns: list[asyncpg.Connection],
+    user_id: int,
+    to: int,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    directory = conns[0]
+    router = await _load_router(directory)
+    source = router.shard_for(user_id)
+    if source == to:
+        return {"user_id": user_id, "moved": False, "reason": f"already on shard {to}"}
+    src, dst = conns[source], conns[to]
+
+    async with src.transaction():
+        # 유저 행을 잠그면 (FK 의 KEY SHARE 와 충돌해서) 하위 항목 삽입도 기다린다. 기존 행은 FOR UPDATE 로 잠근다
+        if not await src.fetchval("SELECT true FROM users WHERE id = $1 FOR UPDATE", user_id):
+            raise SystemExit(f"user {user_id} not found on shard {source}")
+        payload = []
+        for table, where in USER_DATA:
+            rows = await src.fetchval(
+                f"SELECT COALESCE(jsonb_agg(t), '[]')::text FROM (SELECT * FROM {table} WHERE {where} FOR UPDATE) t",
+                user_id,
+            )
+            payload.append((table, rows))
+        counts = {table: await src.fetchval("SELECT jsonb_array_length($1::jsonb)", rows) for table, rows in payload}
+        if dry_run:
+            return {"user_id": user_id, "from": source, "to": to, "moved": False, "rows": counts}
+
+        async with dst.transaction():
+            # 이전에 중간에 실패한 이동의 잔여 행
+            await dst.execute("DELETE FROM users WHERE id = $1", user_id)
+            for table, rows in payload:
+                await dst.execute(
+                    f"INSERT INTO {table} SELECT * FROM jsonb_populate_recordset(NULL::{table}, $1::jsonb)",
+                    rows,
+                )
+
+        router.overrides.pop(user_id, None)
+        if router.shard_for(user_id) == to:
+            await directory.execute("DELETE FROM user_shard_overrides WHERE user_id = $1", user_id)
+        else:
+            await set_override(directory, user_id, to)
+
+        await src.execute("DELETE FROM users WHERE id = $1", user_id)
+
+    await _notify(directory, [("shard", user_id), ("user", user_id)])
+    return {"user_id": user_id, "from": source, "to": to, "moved": True, "rows": counts}
+
+
+async def shard_status(conns: list[asyncpg.Connection]) -> dict[str, Any]:
+    directory = conns[0]
+    layout = await directory.fetchrow("SELECT shard_count, legacy_max_user_id, updated_at FROM shard_layout")
+    overrides = await directory.fetch("SELECT shard, count(*) AS n FROM user_shard_overrides GROUP BY shard")
+    shards = []
+    for i, conn in enumerate(conns):
+        seq, used = await _table_ids(conn, "users")
+        increment = await conn.fetchval("SELECT increment_by FROM pg_sequences WHERE format('%I.%I', schemaname, sequencename) = $1", seq)
+        shards.append({
+            "shard": i,
+            "target": SHARD_TARGETS[i],
+            "users": await conn.fetchval("SELECT count(*) FROM users"),
+            "users_last_id": used,
+            "users_id_increment": increment,
+        })
+    return {
+        "configured_shards": len(conns),
+        "layout": dict(layout) if layout else None,
+        "overrides": {r["shard"]: r["n"] for r in overrides},
+        "shards": shards,
+    }
+
+
+async def _run(args: argparse.Namespace) -> int:
+    conns = [await connect_shard(i) for i in range(len(SHARD_TARGETS))]
+    try:
+        if args.command == "migrate":
+            from backend.migrate import migrate
+
+            for i, conn in enumerate(conns):
+                done = await migrate(conn)
+                print(f"shard {i}: " + (", ".join(f"{m.version:04d}_{m.name}" for m in done) or "already up to date"))
+            return 0
+        if args.command == "init":
+            print(await init_layout(conns))
+            return 0
+        if args.command == "status":
+            print(await shard_status(conns))
+            return 0
+        if not 0 <= args.to < len(conns):
+            print(f"--to must be between 0 and {len(conns) - 1}", file=sys.stderr)
+            return 1
+        print(await move_user(conns, args.user_id, args.to, dry_run=args.dry_run))
+        return 0
+    finally:
+        for conn in conns:
+            await conn.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m backend.shards", description="user_id 샤드 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="모든 샤드에 마이그레이션 적용")
+    sub.add_parser("init", help="샤드 배치 기록 + id 시퀀스 interleave (샤드 구성을 바꾼 뒤 점검 시간에)")
+    sub.add_parser("status", help="배치 / 샤드별 유저 수 / override 수")
+    move = sub.add_parser("move", help="유저 한 명을 다른 샤드로 옮김")
+    move.add_argument("user_id", type=int)
+    move.add_argument("--to", type=int, required=True, help="대상 샤드 번호")
+    move.add_argument("--dry-run", action="store_true", help="옮길 행 수만 출력")
+    args = parser.parse_args(argv)
+
+    sys.exit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
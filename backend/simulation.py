@@ -1,6 +1,6 @@
 from datetime import date
 from dateutil.relativedelta import relativedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable
 from backend.schemas.simulation import SimulationRequest, SimulationResult, SimulationPoint, SimulationAsset
 
 def f(x) -> float:
@@ -74,7 +74,16 @@ class AssetTracker:
             interest=round(self.interest, 2)
         )
 
-def run_simulation(snapshot: dict, req: SimulationRequest, start_date: date) -> SimulationResult:
+def run_simulation(
+    snapshot: dict,
+    req: SimulationRequest,
+    start_date: date,
+    progress: Optional[Callable[[float], None]] = None,
+) -> SimulationResult:
+    """
+    progress: 1년(12개월) 진행할 때마다 진행률(0~1)로 호출되는 콜백.
+              콜백에서 예외를 던지면 시뮬레이션이 중단된다 (작업 취소용).
+    """
     # --- [1단계: 트래커 및 설정 초기화] ---
     default_roi = float(req.default_value.default_roi or 0.0)
     default_dividend = float(req.default_value.default_dividend or 0.0)
@@ -195,6 +204,7 @@ def run_simulation(snapshot: dict, req: SimulationRequest, start_date: date) ->
     # --- [3단계: 시뮬레이션 루프] ---
     points = []
     current_date = start_date
+    total_months = max(1, (req.expected_death_year - start_date.year) * 12 + 13 - start_date.month)
 
     while current_date.year <= req.expected_death_year:
         # 1. 만기 처리 (만기된 자산을 잉여 저축으로 이동)
@@ -314,6 +324,11 @@ def run_simulation(snapshot: dict, req: SimulationRequest, start_date: date) ->
             }
         ))
         current_date += relativedelta(months=1)
+        if progress is not None and len(points) % 12 == 0:
+            progress(min(1.0, len(points) / total_months))
+
+    if progress is not None:
+        progress(1.0)
 
     return SimulationResult(
         plan_id=req.plan_id, 
@@ -364,7 +379,6 @@ def get_yearly_summary(sim_result):
             yearly_map[year]["total_tax"] += float(p.buckets.get("total_tax", 0)) # ✅ 세금 합산
 
     sorted_years = sorted(yearly_map.keys())
-    print(yearly_map)
     # 리턴 딕셔너리에 상세 지표 리스트 추가
     return {
         "labels": [yearly_map[y]["date"] for y in sorted_years],
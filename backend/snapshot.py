@@ -1,103 +1,111 @@
 import asyncpg
+import json
+from datetime import date
 from typing import Any
 
-async def load_user_snapshot(conn: asyncpg.Connection, user_id: int) -> dict[str, Any]:
-    # 1. 저축 (Savings): deposit, frequency, maturity_date 추가 / currency 제거
-    savings = await conn.fetch("""
-        SELECT 
-            category::text AS category,
-            amount::float AS amount, 
-            interest_rate::float AS interest_rate,
-            compound::text AS compound,
-            deposit::float AS deposit,                         -- ✅ 추가
-            deposit_frequency::text AS deposit_frequency,       -- ✅ 추가
-            maturity_date                                       -- ✅ 추가
-        FROM savings
-        WHERE user_id = $1
-        ORDER BY created_at DESC
-    """, user_id)
-
-    # 2. 투자 (Investments): deposit, frequency, maturity_date 추가 / currency 제거
-    investments = await conn.fetch("""
-        SELECT 
-            category::text AS category,
-            amount::float AS amount, 
-            roi::float AS roi,
-            dividend::float AS dividend,
-            deposit::float AS deposit,                         -- ✅ 추가
-            deposit_frequency::text AS deposit_frequency,       -- ✅ 추가
-            maturity_date                                       -- ✅ 추가
-        FROM investments
-        WHERE user_id = $1
-        ORDER BY created_at DESC
-    """, user_id)
-
-    # 3. 고정 자산 (Assets): currency 제거
-    assets = await conn.fetch("""
-        SELECT
-            category::text AS category,
-            interest_rate::float AS interest_rate,
-            roi::float           AS roi,
-            dividend::float      AS dividend,
-            amount::float        AS amount,
-            loan_amount::float   AS loan_amount,
-            repay_amount::float  AS repay_amount
-            -- currency 제거됨
-        FROM assets
-        WHERE user_id = $1
-        ORDER BY created_at DESC
-    """, user_id)
-
-    # 4. 부채 (Debts): currency 제거
-    debts = await conn.fetch("""
-        SELECT
-            category::text AS category,
-            loan_amount::float   AS loan_amount,
-            repay_amount::float  AS repay_amount,
-            interest_rate::float AS interest_rate,
-            compound::text       AS compound
-            -- currency 제거됨
-        FROM debts
-        WHERE user_id = $1
-        ORDER BY created_at DESC
-    """, user_id)
-
-    return {
-        "savings": [dict(r) for r in savings],
-        "investments": [dict(r) for r in investments],
-        "debts": [dict(r) for r in debts],
-        "assets": [dict(r) for r in assets]
-    }
+from backend.cache import snapshot_cache
+from backend.statements import statements
+
+# ==========================
+# 스냅샷 항목 정의
+# 테이블마다 run_simulation 이 읽는 컬럼만 뽑는다. 항목 목록은 json_agg 로 묶어서
+# 스냅샷 전체(플랜 row + 하위 항목 포함)를 쿼리 한 번(왕복 1회)으로 가져온다.
+# ==========================
+
+# 유저 재정 상태 (user_id 기준)
+USER_ITEMS = {
+    # 1. 저축 (Savings)
+    "savings": ("savings", ("category", "amount", "interest_rate", "compound", "deposit", "deposit_frequency", "maturity_date")),
+    # 2. 투자 (Investments)
+    "investments": ("investments", ("category", "amount", "roi", "dividend", "deposit", "deposit_frequency", "maturity_date")),
+    # 3. 고정 자산 (Assets)
+    "assets": ("assets", ("category", "interest_rate", "roi", "dividend", "amount", "loan_amount", "repay_amount")),
+    # 4. 부채 (Debts)
+    "debts": ("debts", ("category", "loan_amount", "repay_amount", "interest_rate", "compound")),
+}
+
+# 플랜 하위 항목 (plan_id 기준)
+PLAN_ITEMS = {
+    "revenues": ("revenues", ("category", "amount", "frequency", "start_date", "end_date")),
+    "expenses": ("expenses", ("category", "amount", "frequency", "start_date", "end_date")),
+    "taxes": ("taxes", ("category", "rate", "frequency")),
+}
+
+# JSON 안에서는 numeric 이 숫자, enum 이 문자열로 나오므로 캐스트가 필요 없다. 날짜만 문자열이라 되돌린다
+_DATE_KEYS = ("maturity_date", "start_date", "end_date")
+
+
+def _json_list(table: str, columns: tuple[str, ...], where: str) -> str:
+    """항목 목록을 JSON 배열 하나로. 정렬은 기존 로더와 같은 created_at DESC (동률은 id DESC)"""
+    build_args = ", ".join(f"'{c}', {c}" for c in columns)
+    return f"""(
+        SELECT COALESCE(json_agg(json_build_object({build_args}) ORDER BY created_at DESC, id DESC), '[]'::json)
+        FROM {table} WHERE {where}
+    )"""
+
+
+def snapshot_columns(user_id_expr: str | None, plan_id_expr: str | None = None) -> str:
+    """SELECT 절에 넣을 스냅샷 컬럼들 (항목 이름 = 컬럼 이름, 값은 json 배열). 식이 None 인 쪽 항목은 빠진다"""
+    cols = []
+    if user_id_expr is not None:
+        cols += [
+            f"{_json_list(table, columns, f'user_id = {user_id_expr}')} AS {key}"
+            for key, (table, columns) in USER_ITEMS.items()
+        ]
+    if plan_id_expr is not None:
+        cols += [
+            f"{_json_list(table, columns, f'plan_id = {plan_id_expr}')} AS {key}"
+            for key, (table, columns) in PLAN_ITEMS.items()
+        ]
+    return ",\n".join(cols)
+
+
+def _decode_items(value: Any) -> list[dict[str, Any]]:
+    items = json.loads(value, parse_int=float) if isinstance(value, str) else (value or [])
+    for item in items:
+        for k in _DATE_KEYS:
+            if isinstance(item.get(k), str):
+                item[k] = date.fromisoformat(item[k])
+    return items
+
+
+def decode_snapshot(row, keys) -> dict[str, Any]:
+    """snapshot_columns 로 가져온 row → run_simulation 이 기대하는 {항목: [dict, ...]}"""
+    return {k: _decode_items(row[k]) for k in keys}
+
+
+PLAN_SNAPSHOT = statements.register("snapshot.plan", f"SELECT {snapshot_columns('$1', '$2')}")
+
+
+async def load_user_snapshot(repo, user_id: int) -> dict[str, Any]:
+    """유저 재정 상태 (repo: backend.repository.Repository). snapshot_cache 에 현재 버전이 있으면 쿼리 없이 반환 (공유 객체 — 수정 금지)"""
+    snapshot = snapshot_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    version = snapshot_cache.version(user_id)
+    snapshot = await repo.user_snapshot(user_id)
+    snapshot_cache.put(user_id, version, snapshot)
+    return snapshot
+
 
 async def load_plan_snapshot(conn: asyncpg.Connection, user_id: int, plan_id: int) -> dict[str, Any]:
-    # 기본 user 재정 상태 로드 (Savings, Investments, Assets, Debts 등)
-    user_snapshot = await load_user_snapshot(conn, user_id)
-
-    # 플랜 수입(revenues) 로드: start_date, end_date 추가
-    revenues = await conn.fetch("""
-        SELECT category::text AS category,
-               amount::float AS amount,
-               frequency::text AS frequency,
-               start_date,
-               end_date
-        FROM revenues
-        WHERE plan_id = $1
-        ORDER BY created_at DESC
-    """, plan_id)
-
-    # 플랜 지출(expenses) 로드: start_date, end_date 추가
-    expenses = await conn.fetch("""
-        SELECT category::text AS category,
-               amount::float AS amount,
-               frequency::text AS frequency,
-               start_date,
-               end_date
-        FROM expenses
-        WHERE plan_id = $1
-        ORDER BY created_at DESC
-    """, plan_id)
-    return {
-        **user_snapshot,
-        "revenues": [dict(r) for r in revenues],
-        "expenses": [dict(r) for r in expenses],
-    }
\ No newline at end of file
+    # 유저 재정 상태 + 플랜 수입/지출/세금을 한 번에 로드
+    row = await PLAN_SNAPSHOT.fetchrow(conn, user_id, plan_id)
+    return decode_snapshot(row, (*USER_ITEMS, *PLAN_ITEMS))
+
+
+# ==========================
+# 유저 재정 요약 (user_financial_summary — migrations/0003 의 트리거가 증감분으로 유지)
+# 합계/개수가 필요한 곳 (대시보드, 목록 헤더) 은 항목을 전부 더하지 않고 이 한 행만 읽는다.
+# ==========================
+SUMMARY_TOTALS = ("savings_total", "investments_total", "assets_total", "asset_loans_total", "debts_total", "monthly_repayment")
+SUMMARY_COUNTS = ("savings_count", "investments_count", "assets_count", "debts_count")
+
+
+async def load_financial_summary(repo, user_id: int) -> dict[str, Any]:
+    """보유 항목이 한 번도 없었던 유저는 행이 없으므로 0 으로 채워 반환 (version 0)"""
+    summary = await repo.financial_summary(user_id)
+    if summary is None:
+        return {**{k: 0.0 for k in SUMMARY_TOTALS}, **{k: 0 for k in SUMMARY_COUNTS}, "version": 0, "updated_at": None}
+    return summary
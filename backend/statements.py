@@ -0,0 +1,178 @@
+# backend/statements.py
+"""
+SQL statement 레지스트리
+
+자주 실행되는 쿼리는 모듈 로드 시 statements.register("이름", sql) 로 등록하고
+`await STATEMENT.fetch(conn, *args)` 형태로 실행한다.
+
+- 풀에 새 연결이 생길 때(init 훅) 등록된 statement 를 전부 conn.prepare() 한다.
+  인자/결과 타입 introspection 결과가 연결의 코덱 캐시에 남아서 새 연결의 첫 요청에서 introspection 왕복이 빠지고,
+  SQL 오류(마이그레이션 누락 등)는 연결 생성 시점에 warm_failures 로 드러난다.
+  fetch/execute 가 쓰는 statement 캐시는 asyncpg 가 첫 실행 때 채운다.
+- 실행 통계 (호출 / 에러 / 시간 백분위 / 행 수 / 호출 라우트) 는 풀 연결에서 backend.tracing 이 모은다 (/api/debug/queries).
+  등록된 SQL 은 거기서 등록 이름으로 보인다. /api/debug/statements 는 등록 수와 warm_failures 만.
+- 등록 목록이 곧 핫 쿼리 목록이다. 요청마다 SQL 이 바뀌는 동적 쿼리는 등록하지 않는다.
+  PATCH 처럼 보낸 컬럼만 바꾸는 UPDATE 는 partial_update() 로 고정 SQL 한 문장을 만든다.
+- 등록하는 모듈은 REGISTERING_MODULES 에 적는다. 앱은 라우터를 import 하면서 전부 등록되고,
+  앱 밖 (python -m backend.migrate check 등) 에서 전체 목록이 필요하면 load_registered() 를 부른다.
+"""
+import importlib
+import logging
+from typing import Any, Optional, Sequence
+
+import asyncpg
+
+from backend.db import db
+from backend.tracing import query_tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Statement:
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        # 쿼리 트레이싱(/api/debug/queries)에서 이 이름으로 집계되도록
+        query_tracer.name(sql, name)
+
+    async def fetch(self, conn: asyncpg.Connection, *args) -> list[asyncpg.Record]:
+        return await conn.fetch(self.sql, *args)
+
+    async def fetchrow(self, conn: asyncpg.Connection, *args) -> asyncpg.Record | None:
+        return await conn.fetchrow(self.sql, *args)
+
+    async def fetchval(self, conn: asyncpg.Connection, *args) -> Any:
+        return await conn.fetchval(self.sql, *args)
+
+    async def execute(self, conn: asyncpg.Connection, *args) -> str:
+        return await conn.execute(self.sql, *args)
+
+
+class PartialUpdate:
+    """
+    PATCH 용 UPDATE 한 문장 (조회 없이 왕복 1회).
+
+    컬럼마다 (플래그, 값) 파라미터 쌍을 두고 `col = CASE WHEN $플래그 THEN $값 ELSE col END` 로
+    요청에 있는 컬럼만 바꾼다. 보낸 컬럼 조합과 상관없이 SQL 이 같아서 prepare/캐시된다.
+    check 는 바뀐 뒤의 값으로 평가하는 조건이다 ({컬럼} 자리에 새 값 식이 들어감). 거짓이면 행이 갱신되지 않고
+    None 이 반환되므로, 호출한 쪽에서 없는 행인지 검증 실패인지 가려서 에러를 낸다.
+    where 는 보통 컬럼 이름 (`컬럼 = $n`) 이고, "{}" 가 들어 있으면 그 자리에 $n 을 넣은 조건식 그대로 쓴다
+    (예: 플랜 하위 항목의 소유자 확인 "plan_id IN (SELECT id FROM plans WHERE user_id = {})").
+    """
+
+    def __init__(
+        self,
+        registry: "StatementRegistry",
+        name: str,
+        table: str,
+        columns: Sequence[str],
+        where: Sequence[str],
+        returning: str,
+        check: Optional[str] = None,
+    ):
+        self.columns = tuple(columns)
+        n = 2 * len(self.columns)
+        sets = [f"{c} = {self.new(c)}" for c in self.columns]
+        conds = [
+            c.format(f"${n + i + 1}") if "{}" in c else f"{c} = ${n + i + 1}"
+            for i, c in enumerate(where)
+        ]
+        if check:
+            conds.append(f"({check.format(**{c: self.new(c) for c in self.columns})})")
+        self.statement = registry.register(name, f"""
+    UPDATE {table}
+    SET {", ".join(sets)}, updated_at = now()
+    WHERE {" AND ".join(conds)}
+    RETURNING {returning}
+""")
+
+    def new(self, column: str) -> str:
+        """컬럼의 갱신 후 값 식"""
+        i = self.columns.index(column)
+        return f"(CASE WHEN ${2 * i + 1}::boolean THEN ${2 * i + 2} ELSE {column} END)"
+
+    def changes(self, data: dict[str, Any]) -> bool:
+        return any(c in data for c in self.columns)
+
+    def args(self, data: dict[str, Any], *where_args) -> list[Any]:
+        """data 에 있는 키만 갱신 (값이 None 이면 NULL 로). 그 외 키는 무시"""
+        out: list[Any] = []
+        for c in self.columns:
+            out += [c in data, data.get(c)]
+        return [*out, *where_args]
+
+    async def fetchrow(self, conn: asyncpg.Connection, data: dict[str, Any], *where_args) -> asyncpg.Record | None:
+        return await self.statement.fetchrow(conn, *self.args(data, *where_args))
+
+
+class StatementRegistry:
+    def __init__(self):
+        self._statements: dict[str, Statement] = {}
+        self.warm_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def register(self, name: str, sql: str) -> Statement:
+        existing = self._statements.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"statement {name!r} is already registered with different SQL")
+            return existing
+        stmt = Statement(name, sql)
+        self._statements[name] = stmt
+        return stmt
+
+    def partial_update(
+        self,
+        name: str,
+        table: str,
+        columns: Sequence[str],
+        where: Sequence[str],
+        returning: str,
+        check: Optional[str] = None,
+    ) -> PartialUpdate:
+        return PartialUpdate(self, name, table, columns, where, returning, check)
+
+    def get(self, name: str) -> Statement:
+        return self._statements[name]
+
+    async def warm(self, conn: asyncpg.Connection) -> None:
+        """연결 init 훅: 등록된 statement 를 prepare 해서 타입 introspection 을 미리 끝내 둔다"""
+        for stmt in self._statements.values():
+            try:
+                await conn.prepare(stmt.sql)
+            except asyncpg.PostgresError as e:
+                # 마이그레이션 전이라 테이블이 없거나 하는 경우: 연결 생성은 막지 않고 첫 실행 때 다시 prepare 된다
+                self.warm_failures += 1
+                logger.warning(f"statement warm-up failed: {stmt.name}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {"registered": len(self._statements), "warm_failures": self.warm_failures}
+
+
+# 싱글톤 인스턴스
+statements = StatementRegistry()
+
+# import 할 때 statements 에 등록하는 모듈
+REGISTERING_MODULES = (
+    "backend.repository",
+    "backend.snapshot",
+    "backend.routes.assets",
+    "backend.routes.debts",
+    "backend.routes.investments",
+    "backend.routes.me",
+    "backend.routes.plans",
+    "backend.routes.savings",
+    "backend.routes.users",
+)
+
+
+def load_registered() -> StatementRegistry:
+    """REGISTERING_MODULES 를 모두 import 해서 등록이 끝난 레지스트리를 돌려준다"""
+    for module in REGISTERING_MODULES:
+        importlib.import_module(module)
+    return statements
+
+# 타입 코덱 훅 뒤에 실행되어야 한다 (코덱을 바꾸면 asyncpg 가 statement 캐시를 비움)
+db.add_init_hook(statements.warm)
@@ -0,0 +1,94 @@
+# backend/tests/test_admission.py
+import asyncio
+
+import pytest
+
+from backend.admission import AdmissionCancelled, AdmissionController, AdmissionRejected
+
+pytestmark = pytest.mark.anyio
+
+
+def accounting(controller: AdmissionController) -> tuple[int, int, int]:
+    stats = controller.stats()
+    return stats["inflight"], stats["cost"], stats["users"]
+
+
+async def test_admit_and_release():
+    controller = AdmissionController()
+    async with controller.admit(1, 100):
+        async with controller.admit(2, 50):
+            assert accounting(controller) == (2, 150, 2)
+        assert accounting(controller) == (1, 100, 1)
+    assert accounting(controller) == (0, 0, 0)
+    assert controller.stats()["admitted"] == 2
+
+
+async def test_release_on_error():
+    controller = AdmissionController()
+    with pytest.raises(RuntimeError):
+        async with controller.admit(1, 100):
+            raise RuntimeError()
+    assert accounting(controller) == (0, 0, 0)
+
+
+async def test_user_limit_rejects():
+    controller = AdmissionController(user_max_concurrency=1)
+    async with controller.admit(1, 10):
+        with pytest.raises(AdmissionRejected) as e:
+            async with controller.admit(1, 10, wait=0):
+                pass
+        assert e.value.retry_after >= 1.0
+        # 다른 유저는 들어간다
+        async with controller.admit(2, 10, wait=0):
+            assert accounting(controller) == (2, 20, 2)
+    assert controller.stats()["rejected"] == 1
+    assert accounting(controller) == (0, 0, 0)
+
+
+async def test_cost_limit():
+    controller = AdmissionController(global_max_cost=100, user_max_cost=100)
+    # 상한보다 큰 요청도 혼자면 들어간다
+    async with controller.admit(1, 500):
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit(2, 1, wait=0):
+                pass
+    async with controller.admit(1, 60):
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit(2, 60, wait=0):
+                pass
+
+
+async def test_waiter_admitted_after_release():
+    controller = AdmissionController(global_max_concurrency=1)
+    order = []
+
+    async def waiter():
+        async with controller.admit(2, 10, wait=None):
+            order.append("waiter")
+
+    async with controller.admit(1, 10):
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        order.append("holder")
+    await asyncio.wait_for(task, 1)
+    assert order == ["holder", "waiter"]
+    assert accounting(controller) == (0, 0, 0)
+
+
+async def test_cancel_while_waiting():
+    controller = AdmissionController(global_max_concurrency=1)
+    cancelled = False
+
+    async def waiter():
+        async with controller.admit(2, 10, wait=None, cancelled=lambda: cancelled):
+            pass
+
+    async with controller.admit(1, 10):
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0.05)
+        cancelled = True
+        with pytest.raises(AdmissionCancelled):
+            await asyncio.wait_for(task, 1)
+        assert accounting(controller) == (1, 10, 1)
+    assert controller.stats()["admitted"] == 1
@@ -0,0 +1,93 @@
+# backend/tests/test_api.py
+"""인메모리 저장소로 돌리는 API 테스트 (인증, 목록 페이지, 조건부 GET, 플랜 라우트)"""
+from backend.conditional import ETAG_HEADER
+from backend.jobs import job_manager
+from backend.pagination import NEXT_CURSOR_HEADER
+
+
+def test_requires_token(client, user):
+    assert client.get("/api/savings/").status_code == 401
+    assert client.get("/api/savings/", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+
+def test_list_follows_cursor(client, user):
+    full = client.get("/api/savings/", headers=user["headers"]).json()
+    assert len(full) == 5
+    # 최신순
+    assert [r["amount"] for r in full] == [5_000_000.0, 4_000_000.0, 3_000_000.0, 2_000_000.0, 1_000_000.0]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/api/savings/", params=params, headers=user["headers"])
+        assert r.status_code == 200
+        pages.append(r.json())
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [r["id"] for p in pages for r in p] == [r["id"] for r in full]
+
+
+def test_list_fields_and_bad_cursor(client, user):
+    r = client.get("/api/savings/", params={"limit": 1, "fields": "id,amount"}, headers=user["headers"])
+    assert r.json() == [{"id": r.json()[0]["id"], "amount": 5_000_000.0}]
+
+    r = client.get("/api/savings/", params={"cursor": "not-a-cursor"}, headers=user["headers"])
+    assert r.status_code == 400
+
+
+def test_snapshot_etag(client, store, user):
+    r = client.get("/api/me/snapshot", headers=user["headers"])
+    assert r.status_code == 200
+    etag = r.headers[ETAG_HEADER]
+
+    r = client.get("/api/me/snapshot", headers={**user["headers"], "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers[ETAG_HEADER] == etag
+
+    # 보유 항목이 바뀌면 새 태그로 200
+    store.insert("savings", user_id=user["id"], category="CASH", amount=1)
+    r = client.get("/api/me/snapshot", headers={**user["headers"], "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers[ETAG_HEADER] != etag
+
+
+def test_plan_detail_etag(client, store, user):
+    path = f"/api/plans/{user['plan_id']}"
+    r = client.get(path, headers=user["headers"])
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["net_worth"]) == len(body["labels"]) > 0
+    etag = r.headers[ETAG_HEADER]
+
+    assert client.get(path, headers={**user["headers"], "If-None-Match": etag}).status_code == 304
+    assert client.get(path, headers={**user["headers"], "If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+    store.insert("expenses", plan_id=user["plan_id"], category="EXPENSE", amount=100_000, frequency="MONTHLY")
+    r = client.get(path, headers={**user["headers"], "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers[ETAG_HEADER] != etag
+
+
+def test_plan_titles(client, user):
+    r = client.get("/api/plans/titles", headers=user["headers"])
+    assert r.status_code == 200
+    assert r.json() == {"titles": ["Plan 1"]}
+
+
+def test_other_users_plan_is_not_found(client, store, user, auth_headers):
+    other = auth_headers(store.add_user())
+    plan_id = user["plan_id"]
+    assert client.get(f"/api/plans/{plan_id}", headers=other).status_code == 404
+    assert client.get(f"/api/plans/{plan_id}/expenses", headers=other).status_code == 404
+    assert client.get(f"/api/plans/{plan_id}/expenses", headers=user["headers"]).status_code == 200
+
+
+def test_job_from_another_worker(client, user):
+    r = client.get("/api/jobs/0000beef-" + "0" * 32, headers=user["headers"])
+    assert r.status_code == 421
+    r = client.get(f"/api/jobs/{job_manager.instance_id}-" + "0" * 32, headers=user["headers"])
+    assert r.status_code == 404
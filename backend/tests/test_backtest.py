@@ -0,0 +1,145 @@
+# backend/tests/test_backtest.py
+from datetime import date
+
+import numpy as np
+import pytest
+
+from backend.backtest import (
+    BacktestDataError,
+    load_series,
+    rolling_windows,
+    run_backtest,
+    summarize_backtest,
+    write_series,
+)
+from backend.schemas.priority import PlanPriority
+from backend.schemas.simulation import SimulationDefault, SimulationRequest
+from backend.simulation import _monthly_rate, run_simulation
+
+START = date(2025, 3, 1)
+DEATH_YEAR = 2040
+MONTHS = (DEATH_YEAR - START.year) * 12 + 13 - START.month
+ROI, INFLATION = 7.0, 2.5
+
+
+@pytest.fixture
+def series_path(tmp_path):
+    """1989-11 부터 시작하는 상수 수익률/물가 파일 (1월 시작 window 3개)"""
+    path = str(tmp_path / "returns.bin")
+    # run_simulation 은 실질 연이율을 roi - inflation 으로 잡으므로 월 실질 수익률이 같아지도록 명목값을 맞춘다
+    monthly_inflation = _monthly_rate(INFLATION)
+    monthly_return = (1.0 + _monthly_rate(ROI - INFLATION)) * (1.0 + monthly_inflation) - 1.0
+    n = MONTHS + 2 + 24
+    write_series(path, 1989, 11, np.full(n, monthly_return), np.full(n, monthly_inflation))
+    return path
+
+
+def snapshot() -> dict:
+    return {
+        "savings": [
+            {"amount": 10_000_000, "interest_rate": 3, "deposit": 300_000},
+            {"amount": 5_000_000, "interest_rate": 2, "compound": "SIMPLE", "maturity_date": date(2030, 1, 1)},
+        ],
+        "investments": [{"amount": 20_000_000, "roi": ROI, "dividend": 1.5, "deposit": 200_000}],
+        "debts": [{"loan_amount": 30_000_000, "interest_rate": 4.5, "repay_amount": 400_000}],
+        "assets": [],
+        "revenues": [
+            {"category": "SALARY", "amount": 4_500_000, "frequency": "MONTHLY", "end_date": date(2045, 12, 31)},
+            {"category": "INCOME", "amount": 9_999_999, "frequency": "MONTHLY"},
+            {"category": "BONUS", "amount": 6_000_000, "frequency": "YEARLY"},
+        ],
+        "expenses": [
+            {"category": "LIVING", "amount": 2_500_000, "frequency": "MONTHLY"},
+            # 몇 년 동안은 적자 → 비상 부채
+            {"category": "TUITION", "amount": 3_000_000, "frequency": "MONTHLY",
+             "start_date": date(2027, 1, 1), "end_date": date(2028, 12, 31)},
+        ],
+    }
+
+
+def request() -> SimulationRequest:
+    return SimulationRequest(
+        plan_id=1,
+        default_value=SimulationDefault(default_interest=3, default_roi=ROI, default_dividend=1, inflation=INFLATION),
+        expected_death_year=DEATH_YEAR,
+        priority=PlanPriority(allocations=[
+            {"bucket": "savings", "type": "SAVINGS", "weight": 0.3},
+            {"bucket": "invest", "type": "INVEST", "weight": 0.5},
+            {"bucket": "debt", "type": "DEBT", "weight": 0.2},
+        ]),
+    )
+
+
+def test_load_series_is_memmap(series_path):
+    series = load_series(series_path)
+    assert (series.start_year, series.start_month) == (1989, 11)
+    assert series.months == MONTHS + 26
+    assert isinstance(series.data.base, np.memmap)
+
+
+def test_load_series_errors(tmp_path):
+    with pytest.raises(BacktestDataError):
+        load_series(str(tmp_path / "missing.bin"))
+
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(np.array([2000, 13], dtype="<i4").tobytes() + np.zeros(2).tobytes())
+    with pytest.raises(BacktestDataError):
+        load_series(str(bad))
+
+
+def test_matches_run_simulation_with_constant_series(series_path):
+    """과거 수익률/물가가 상수면 모든 window 가 run_simulation 의 연말 순자산과 같다"""
+    start_years, returns, inflation = rolling_windows(load_series(series_path), MONTHS)
+    assert start_years == [1990, 1991, 1992]
+
+    result = run_backtest(snapshot(), request(), START, returns, inflation)
+
+    points = run_simulation(snapshot(), request(), START).points
+    year_end = {}
+    for p in points:
+        year_end[str(p.date.year)] = p.net_worth
+    assert result["labels"] == list(year_end)
+    assert result["net_worth"].shape == (3, len(year_end))
+    # 적자 구간(비상 부채)이 실제로 있었는지
+    assert any(p.debts[-1].amount > 0 for p in points)
+    for row in result["net_worth"]:
+        assert row == pytest.approx(list(year_end.values()), rel=1e-9, abs=0.01)
+
+
+def test_rolling_windows_start_each_january(tmp_path):
+    path = str(tmp_path / "returns.bin")
+    # 1999-10 부터 40개월: 첫 1월은 인덱스 3
+    write_series(path, 1999, 10, np.arange(40) / 1000, np.arange(40) / 10000)
+    series = load_series(path)
+
+    start_years, returns, inflation = rolling_windows(series, 12)
+    assert start_years == [2000, 2001, 2002]
+    assert returns.shape == inflation.shape == (3, 12)
+    assert returns[0, 0] == pytest.approx(0.003)
+    assert returns[1, 0] == pytest.approx(0.015)
+    assert inflation[2, -1] == pytest.approx(0.0038)
+    # 복사 없이 memmap 을 가리키는 view
+    assert np.shares_memory(returns, series.data)
+
+    assert rolling_windows(series, 37)[0] == [2000]
+    assert rolling_windows(series, 38)[0] == []
+    assert rolling_windows(series, 0)[0] == []
+
+
+def test_summarize_worst_median_best():
+    start_years = [2000, 2001, 2002, 2003, 2004]
+    net_worth = np.array([
+        [1.0, 30.0],
+        [1.0, 10.0],
+        [1.0, 20.0],
+        [1.0, 10.0],
+        [1.0, 50.0],
+    ])
+    summary = summarize_backtest(start_years, {"labels": ["2025", "2026"], "net_worth": net_worth})
+
+    assert summary["windows"] == 5
+    assert summary["labels"] == ["2025", "2026"]
+    # 최종 순자산 정렬 [10(2001), 10(2003), 20, 30, 50]: 같은 값은 앞 window 가 먼저
+    assert summary["worst"] == {"start_year": 2001, "final_net_worth": 10.0, "net_worth": [1.0, 10.0]}
+    assert summary["median"]["start_year"] == 2002
+    assert summary["best"]["start_year"] == 2004
@@ -0,0 +1,62 @@
+# backend/tests/test_conditional.py
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from starlette.requests import Request
+
+from backend.conditional import etag_matches, is_fresh, make_etag, not_modified, validator_headers
+
+
+def request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+ETAG = make_etag("plan", 1, 2)
+MODIFIED = datetime(2025, 5, 1, 9, 30, 15, 500000, tzinfo=timezone.utc)
+
+
+def test_make_etag_is_stable_and_quoted():
+    assert ETAG == make_etag("plan", 1, 2)
+    assert ETAG != make_etag("plan", 1, 3)
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+
+
+@pytest.mark.parametrize("header, matches", [
+    (ETAG, True),
+    (f"W/{ETAG}", True),
+    (f'"other", {ETAG}', True),
+    ("*", True),
+    ('"other"', False),
+    (ETAG.strip('"'), False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(request(if_none_match=header), ETAG) is matches
+
+
+def test_no_validators_is_not_fresh():
+    assert not is_fresh(request(), ETAG, MODIFIED)
+
+
+def test_if_modified_since():
+    # Last-Modified 는 초 단위: 같은 초면 fresh
+    assert is_fresh(request(if_modified_since=format_datetime(MODIFIED, usegmt=True)), ETAG, MODIFIED)
+    earlier = format_datetime(MODIFIED - timedelta(seconds=1), usegmt=True)
+    assert not is_fresh(request(if_modified_since=earlier), ETAG, MODIFIED)
+    assert not is_fresh(request(if_modified_since="yesterday"), ETAG, MODIFIED)
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    since = format_datetime(MODIFIED, usegmt=True)
+    assert not is_fresh(request(if_none_match='"other"', if_modified_since=since), ETAG, MODIFIED)
+
+
+def test_not_modified_response():
+    response = not_modified(ETAG, MODIFIED, vary=("Accept",))
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == ETAG
+    assert response.headers["vary"] == "Authorization, Accept"
+    assert response.headers["last-modified"] == "Thu, 01 May 2025 09:30:15 GMT"
+    assert validator_headers(ETAG)["Cache-Control"] == "private, no-cache"
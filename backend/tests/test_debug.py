@@ -0,0 +1,32 @@
+# backend/tests/test_debug.py
+"""/api/debug/* 운영 통계는 X-Debug-Token 이 DEBUG_TOKEN 과 맞을 때만 보인다"""
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import auth
+from backend.main import app
+
+client = TestClient(app)
+
+DEBUG_PATHS = sorted(
+    route.path for route in app.routes
+    if route.path.startswith("/api/debug/") and route.path != "/api/debug/whoami"
+)
+
+
+@pytest.mark.parametrize("path", DEBUG_PATHS)
+def test_hidden_without_token(monkeypatch, path):
+    monkeypatch.setattr(auth, "DEBUG_TOKEN", "")
+    assert client.get(path).status_code == 404
+    assert client.get(path, headers={"X-Debug-Token": ""}).status_code == 404
+
+    monkeypatch.setattr(auth, "DEBUG_TOKEN", "secret")
+    assert client.get(path).status_code == 404
+    assert client.get(path, headers={"X-Debug-Token": "wrong"}).status_code == 404
+
+
+def test_visible_with_token(monkeypatch):
+    monkeypatch.setattr(auth, "DEBUG_TOKEN", "secret")
+    r = client.get("/api/debug/admission", headers={"X-Debug-Token": "secret"})
+    assert r.status_code == 200
+    assert r.json()["inflight"] == 0
@@ -0,0 +1,112 @@
+# backend/tests/test_financial_summary.py
+"""user_financial_summary (migrations/0003): 대시보드 컨텍스트, 트리거 합계 = 원본 테이블 집계"""
+import pytest
+from fastapi.responses import HTMLResponse
+
+from backend import main
+from backend.migrate import migrate
+from backend.snapshot import SUMMARY_COUNTS, SUMMARY_TOTALS
+
+# 0003 의 초기값 집계와 같은 식을 원본 테이블에서 매번 새로 계산
+FRESH_AGGREGATE = """
+    SELECT
+        u.id AS user_id,
+        COALESCE(s.total, 0) AS savings_total, COALESCE(s.n, 0) AS savings_count,
+        COALESCE(i.total, 0) AS investments_total, COALESCE(i.n, 0) AS investments_count,
+        COALESCE(a.total, 0) AS assets_total, COALESCE(a.n, 0) AS assets_count, COALESCE(a.loans, 0) AS asset_loans_total,
+        COALESCE(d.total, 0) AS debts_total, COALESCE(d.n, 0) AS debts_count,
+        COALESCE(a.repay, 0) + COALESCE(d.repay, 0) AS monthly_repayment
+    FROM users u
+    LEFT JOIN (SELECT user_id, sum(amount) AS total, count(*) AS n FROM savings GROUP BY user_id) s ON s.user_id = u.id
+    LEFT JOIN (SELECT user_id, sum(amount) AS total, count(*) AS n FROM investments GROUP BY user_id) i ON i.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, sum(amount) AS total, count(*) AS n,
+               sum(COALESCE(loan_amount, 0)) AS loans, sum(COALESCE(repay_amount, 0)) AS repay
+        FROM assets GROUP BY user_id
+    ) a ON a.user_id = u.id
+    LEFT JOIN (
+        SELECT user_id, sum(loan_amount) AS total, count(*) AS n, sum(repay_amount) AS repay
+        FROM debts GROUP BY user_id
+    ) d ON d.user_id = u.id
+    ORDER BY u.id
+"""
+COLUMNS = ("user_id", *SUMMARY_TOTALS, *SUMMARY_COUNTS)
+
+
+def test_dashboard_context_keeps_holding_lists(client, user, monkeypatch):
+    captured = {}
+
+    def render(name, context):
+        captured.update(context, template=name)
+        return HTMLResponse("")
+
+    monkeypatch.setattr(main.templates, "TemplateResponse", render)
+    assert client.get("/dashboard", headers=user["headers"]).status_code == 200
+
+    assert captured["template"] == "dashboard.html"
+    assert len(captured["savings"]) == 5 and len(captured["investments"]) == 1
+    assert captured["assets"] == [] and captured["debts"] == []
+    assert captured["summary"]["savings_total"] == sum(r["amount"] for r in captured["savings"])
+    assert [p["title"] for p in captured["plans"]] == ["Plan 1"]
+
+
+async def summaries(conn) -> list[tuple]:
+    rows = await conn.fetch(f"""
+        SELECT u.id AS user_id, {", ".join(f"COALESCE(s.{c}, 0) AS {c}" for c in (*SUMMARY_TOTALS, *SUMMARY_COUNTS))}
+        FROM users u LEFT JOIN user_financial_summary s ON s.user_id = u.id
+        ORDER BY u.id
+    """)
+    return [tuple(r[c] for c in COLUMNS) for r in rows]
+
+
+async def fresh(conn) -> list[tuple]:
+    return [tuple(r[c] for c in COLUMNS) for r in await conn.fetch(FRESH_AGGREGATE)]
+
+
+@pytest.mark.anyio
+async def test_trigger_totals_match_fresh_aggregate(fresh_db):
+    conn = fresh_db
+    await migrate(conn, target=2)
+    alice, bob, carol = [
+        await conn.fetchval("INSERT INTO users (username) VALUES ($1) RETURNING id", name)
+        for name in ("alice", "bob", "carol")
+    ]
+    # 0003 이전 데이터는 초기값 집계로 채워진다
+    await conn.executemany(
+        "INSERT INTO savings (user_id, category, amount) VALUES ($1, 'DEPOSIT', $2)",
+        [(alice, 100 * n) for n in range(1, 6)],
+    )
+    await conn.execute(
+        "INSERT INTO assets (user_id, category, amount, loan_amount, repay_amount) VALUES ($1, 'HOUSE', 500000, NULL, 1000)",
+        alice,
+    )
+    await migrate(conn, target=3)
+    assert (await summaries(conn))[0][:2] == (alice, 1500)
+    assert await summaries(conn) == await fresh(conn)
+
+    # 이후 쓰기는 트리거가 증감분으로 반영
+    await conn.executemany(
+        "INSERT INTO investments (user_id, category, amount) VALUES ($1, 'STOCK', $2)",
+        [(bob, 1000.5), (bob, 2000.25), (alice, 10)],
+    )
+    await conn.executemany(
+        "INSERT INTO debts (user_id, category, loan_amount, repay_amount) VALUES ($1, 'MORTGAGE', $2, $3)",
+        [(bob, 300000, 1500), (carol, 1000, 10)],
+    )
+    await conn.execute("INSERT INTO assets (user_id, category, amount, loan_amount) VALUES ($1, 'JEWELRY', 800, 200)", bob)
+    await conn.execute("UPDATE savings SET amount = amount * 2 WHERE user_id = $1 AND amount > 200", alice)
+    await conn.execute("UPDATE assets SET loan_amount = 50, repay_amount = NULL WHERE user_id = $1", alice)
+    await conn.execute("DELETE FROM savings WHERE user_id = $1 AND amount = 100", alice)
+    # 다른 유저로 옮기면 양쪽 모두 반영
+    await conn.execute("UPDATE investments SET user_id = $1 WHERE user_id = $2 AND amount = 10", carol, alice)
+    # 트랜잭션이 롤백되면 요약도 그대로
+    with pytest.raises(RuntimeError):
+        async with conn.transaction():
+            await conn.execute("DELETE FROM debts WHERE user_id = $1", bob)
+            raise RuntimeError()
+    assert await summaries(conn) == await fresh(conn)
+
+    # 유저 삭제 CASCADE 는 요약 행도 지운다
+    await conn.execute("DELETE FROM users WHERE id = $1", bob)
+    assert await summaries(conn) == await fresh(conn)
+    assert await conn.fetchval("SELECT count(*) FROM user_financial_summary WHERE user_id = $1", bob) == 0
@@ -0,0 +1,81 @@
+# backend/tests/test_jobs.py
+import asyncio
+
+import pytest
+
+from backend.jobs import JobLimitExceeded, JobManager, sweep_variations
+
+pytestmark = pytest.mark.anyio
+
+
+def make_manager(**kwargs) -> JobManager:
+    # 워커 없이 큐만 붙인다: 제출된 작업은 QUEUED 로 남는다
+    m = JobManager(**kwargs)
+    m._queue = asyncio.Queue()
+    return m
+
+
+async def test_sweep_variations():
+    assert sweep_variations([5, 7], [2]) == [{"roi": 5, "inflation": 2}, {"roi": 7, "inflation": 2}]
+    assert sweep_variations([], []) == [{}]
+
+
+async def test_active_job_limit():
+    m = make_manager(max_active_per_user=2)
+    first = m.submit(1, "plan", [1])
+    m.submit(1, "plan", [1])
+    with pytest.raises(JobLimitExceeded):
+        m.submit(1, "plan", [1])
+    # 다른 유저는 별도로 센다
+    m.submit(2, "plan", [1])
+
+    # 끝난 작업은 상한에서 빠진다
+    m.cancel(first)
+    assert first.status == "CANCELLED"
+    m.submit(1, "plan", [1])
+
+
+async def test_too_many_simulations():
+    m = make_manager(max_simulations=4)
+    with pytest.raises(JobLimitExceeded):
+        m.submit(1, "sweep", [1, 2, 3], sweep_variations([5, 7], []))
+    assert not m._jobs
+
+
+async def test_get_is_scoped_to_user():
+    m = make_manager()
+    job = m.submit(1, "plan", [1])
+    assert m.get(job.id, 1) is job
+    assert m.get(job.id, 2) is None
+    assert m.get("unknown", 1) is None
+
+
+def finished_users(manager: JobManager) -> list[int]:
+    return sorted(j.user_id for j in manager._jobs.values())
+
+
+async def test_retained_results_are_capped():
+    manager = make_manager(max_active_per_user=10, max_retained=3, max_retained_per_user=2)
+    for user_id in (1, 1, 1, 2, 2, 3):
+        manager.cancel(manager.submit(user_id, "plan", [1]))
+
+    # 유저별 2개 → 전체 3개: 먼저 끝난 것부터 버린다
+    assert finished_users(manager) == [2, 2, 3]
+
+
+async def test_active_jobs_are_not_evicted():
+    manager = make_manager(max_retained=0, max_retained_per_user=0)
+    queued = manager.submit(1, "plan", [1])
+    manager.cancel(manager.submit(1, "plan", [2]))
+    assert manager.get(queued.id, 1) is queued
+    assert len(manager._jobs) == 1
+
+
+async def test_job_ids_name_their_process():
+    first, second = make_manager(), make_manager()
+    job = first.submit(1, "plan", [1])
+    assert job.id.startswith(first.instance_id + "-")
+    assert first.owns(job.id)
+    # 다른 프로세스(인스턴스)의 작업은 찾지 못하고, 자기 것이 아니라는 것도 안다
+    assert second.get(job.id, 1) is None
+    assert not second.owns(job.id)
@@ -0,0 +1,94 @@
+# backend/tests/test_migrate.py
+import pytest
+
+from backend.migrate import discover, migrate, status
+
+SCHEMA_TABLES = ("users", "savings", "investments", "assets", "debts", "plans", "revenues", "expenses", "taxes")
+
+
+def write(tmp_path, name: str, sql: str):
+    (tmp_path / name).write_text(sql, encoding="utf-8")
+
+
+def test_discover_order_and_modes(tmp_path):
+    write(tmp_path, "0002_second.sql", "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY IF NOT EXISTS a ON t (x);\n")
+    write(tmp_path, "0001_first.sql", "CREATE TABLE t (x int);\n")
+
+    first, second = discover(tmp_path)
+    assert (first.version, first.name, first.transactional) == (1, "first", True)
+    assert (second.version, second.name, second.transactional) == (2, "second", False)
+
+
+def test_no_transaction_statements(tmp_path):
+    write(tmp_path, "0001_indexes.sql", (
+        "-- 설명; 세미콜론이 있어도 주석\n"
+        "-- migrate:no-transaction\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS a_idx\n"
+        "    ON a (x);  -- 줄 끝 주석\n"
+        "\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS b_idx ON b (y);\n"
+    ))
+    (m,) = discover(tmp_path)
+    assert m.statements() == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS a_idx\n    ON a (x);",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS b_idx ON b (y);",
+    ]
+
+
+@pytest.mark.parametrize("sql", [
+    "-- migrate:no-transaction\nDO $$ BEGIN PERFORM 1; END $$;\n",
+    "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY a_idx ON a (x)\n",
+])
+def test_no_transaction_rejects_unsplittable(tmp_path, sql):
+    write(tmp_path, "0001_bad.sql", sql)
+    with pytest.raises(ValueError):
+        discover(tmp_path)[0].statements()
+
+
+def test_access_path_indexes_are_concurrent():
+    m = next(m for m in discover() if m.name == "access_path_indexes")
+    assert not m.transactional
+    statements = m.statements()
+    assert len(statements) == 8
+    assert all(s.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS") for s in statements)
+
+
+@pytest.mark.anyio
+async def test_migrate_fresh_database(fresh_db):
+    done = await migrate(fresh_db)
+    assert [m.version for m in done] == [m.version for m in discover()]
+    assert await migrate(fresh_db) == []
+    assert all(s["applied"] and not s["modified"] for s in await status(fresh_db))
+
+    for table in SCHEMA_TABLES:
+        assert await fresh_db.fetchval("SELECT to_regclass($1) IS NOT NULL", table), table
+    invalid = await fresh_db.fetchval("SELECT count(*) FROM pg_index WHERE NOT indisvalid")
+    assert invalid == 0
+
+
+@pytest.mark.anyio
+async def test_baseline_is_noop_on_existing_schema(fresh_db):
+    # 마이그레이션 도입 전 DB: users 만 있어도 0001 은 아무것도 만들지 않고 기록만 남긴다
+    await fresh_db.execute("CREATE TABLE users (id BIGSERIAL PRIMARY KEY)")
+    await migrate(fresh_db, target=1)
+
+    assert await fresh_db.fetchval("SELECT to_regclass('savings')") is None
+    assert await fresh_db.fetchval("SELECT version FROM schema_migrations") == 1
+
+
+@pytest.mark.anyio
+async def test_invalid_concurrent_index_is_rebuilt(fresh_db):
+    await migrate(fresh_db, target=1)
+    # 실패한 CONCURRENTLY 빌드가 남긴 것과 같은 INVALID 인덱스
+    await fresh_db.execute("CREATE INDEX savings_user_created_idx ON savings (user_id)")
+    await fresh_db.execute(
+        "UPDATE pg_index SET indisvalid = false WHERE indexrelid = 'savings_user_created_idx'::regclass"
+    )
+
+    await migrate(fresh_db, target=2)
+    valid, definition = await fresh_db.fetchrow(
+        "SELECT i.indisvalid, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+        "WHERE i.indexrelid = 'savings_user_created_idx'::regclass"
+    )
+    assert valid
+    assert "created_at DESC" in definition
@@ -0,0 +1,146 @@
+# backend/tests/test_pagination.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.memory_repository import MemoryRepository, MemoryStore
+from backend.migrate import migrate
+from backend.pagination import KeysetList, decode_cursor, encode_cursor
+from backend.repository import PostgresRepository
+from backend.routes.assets import LIST_ASSETS
+
+
+@pytest.fixture(scope="module")
+def listing() -> KeysetList:
+    return KeysetList("tests.pagination", "things", "user_id", {
+        "id": "id",
+        "created_at": "created_at",
+        "amount": "COALESCE(amount, 0)",
+        "note": "note",
+    })
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 45, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 42)
+    # URL 에 그대로 넣을 수 있도록 패딩 없는 urlsafe base64
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_cursor_keeps_offset():
+    created_at = datetime(2025, 3, 1, 21, 0, tzinfo=timezone(timedelta(hours=9)))
+    decoded, _ = decode_cursor(encode_cursor(created_at, 1))
+    assert decoded == created_at
+    assert decoded.utcoffset() == timedelta(hours=9)
+
+
+def test_cursor_without_created_at():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(datetime(2025, 1, 1), 1)[:-3], "fA"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_sql(listing):
+    first = " ".join(listing.first.sql.split())
+    after = " ".join(listing.after.sql.split())
+    select = "SELECT id, created_at, COALESCE(amount, 0) AS amount, note FROM things"
+    assert first == (
+        f"({select} WHERE user_id = $1 AND created_at IS NOT NULL ORDER BY created_at DESC, id DESC LIMIT $2) "
+        f"UNION ALL ({select} WHERE user_id = $1 AND created_at IS NULL ORDER BY created_at DESC, id DESC LIMIT $2) "
+        "ORDER BY created_at DESC NULLS LAST, id DESC LIMIT $2"
+    )
+    assert "WHERE user_id = $1 AND (created_at, id) < ($2, $3) ORDER BY created_at DESC, id DESC LIMIT $4)" in after
+    assert "WHERE user_id = $1 AND created_at IS NULL AND ($2::timestamptz IS NOT NULL OR id < $3)" in after
+    assert after.endswith("ORDER BY created_at DESC NULLS LAST, id DESC LIMIT $4")
+
+
+def test_fields_projection(listing):
+    # 커서 키는 항상 읽고, 순서가 달라도 같은 SQL
+    assert listing.selected(["amount"]) == ("id", "created_at", "amount")
+    first, _ = listing.statements_for(["amount"])
+    assert " ".join(first.sql.split()).startswith("(SELECT id, created_at, COALESCE(amount, 0) AS amount FROM")
+    assert listing.statements_for(["amount", "id"]) is listing.statements_for(["id", "amount"])
+
+    with pytest.raises(ValueError):
+        listing.selected(["amount", "secret"])
+
+
+def test_finish_cuts_page_at_limit(listing):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = [{"id": i, "created_at": base - timedelta(days=i), "amount": float(i)} for i in range(1, 4)]
+
+    page, cursor = listing.finish(rows, 2, ["amount"])
+    assert page == [{"amount": 1.0}, {"amount": 2.0}]
+    assert decode_cursor(cursor) == (rows[1]["created_at"], 2)
+
+    page, cursor = listing.finish(rows, 3, None)
+    assert page == rows and cursor is None
+
+
+def test_finish_cursor_on_null_created_at(listing):
+    rows = [{"id": 3, "created_at": None}, {"id": 2, "created_at": None}]
+    _, cursor = listing.finish(rows, 1, None)
+    assert decode_cursor(cursor) == (None, 3)
+
+
+# 마이그레이션 도입 전 데이터: created_at 이 NULL 인 행 (id 1, 3, 5, 6) 이 섞인 자산
+ASSET_DATES = [None, 3, None, 1, None, None, 3, 2]
+
+
+def asset_created_at(day):
+    return None if day is None else datetime(2025, 1, day, tzinfo=timezone.utc)
+
+
+def expected_asset_ids() -> list[int]:
+    dated = sorted(
+        ((day, i) for i, day in enumerate(ASSET_DATES, 1) if day is not None), reverse=True
+    )
+    undated = sorted((i for i, day in enumerate(ASSET_DATES, 1) if day is None), reverse=True)
+    return [i for _, i in dated] + undated
+
+
+async def page_through(repo, user_id: int, limit: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        rows, cursor = await repo.fetch_page(LIST_ASSETS, user_id, limit, cursor, ["id"])
+        ids += [r["id"] for r in rows]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+async def test_memory_pages_put_null_created_at_last(limit):
+    store = MemoryStore()
+    user_id = store.add_user()
+    for day in ASSET_DATES:
+        store.insert("assets", user_id=user_id, category="HOUSE", created_at=asset_created_at(day))
+
+    repo = MemoryRepository(store)
+    assert await page_through(repo, user_id, limit) == expected_asset_ids()
+    rows, _ = await repo.fetch_page(LIST_ASSETS, user_id)
+    assert [r["id"] for r in rows] == expected_asset_ids()
+
+
+@pytest.mark.anyio
+async def test_postgres_pages_put_null_created_at_last(fresh_db):
+    conn = fresh_db
+    await migrate(conn)
+    # 운영 DB 처럼 created_at 이 NULL 인 행을 허용
+    await conn.execute("ALTER TABLE assets ALTER COLUMN created_at DROP NOT NULL")
+    user_id = await conn.fetchval("INSERT INTO users (username) VALUES ('u') RETURNING id")
+    await conn.executemany(
+        "INSERT INTO assets (user_id, category, created_at) VALUES ($1, 'HOUSE', $2)",
+        [(user_id, asset_created_at(day)) for day in ASSET_DATES],
+    )
+
+    repo = PostgresRepository(conn)
+    for limit in (1, 2, 3, 100):
+        assert await page_through(repo, user_id, limit) == expected_asset_ids()
+    rows, _ = await repo.fetch_page(LIST_ASSETS, user_id)
+    assert [r["id"] for r in rows] == expected_asset_ids()
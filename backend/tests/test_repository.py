@@ -0,0 +1,87 @@
+# backend/tests/test_repository.py
+from datetime import date
+
+import pytest
+
+from backend.db import register_type_codecs
+from backend.memory_repository import MemoryRepository, MemoryStore, UnsupportedExpression
+from backend.migrate import migrate
+from backend.pagination import KeysetList
+from backend.repository import PostgresRepository, Repository
+from backend.routes.me import SNAPSHOT_LISTS
+
+pytestmark = pytest.mark.anyio
+
+
+def test_repository_is_abstract():
+    class Partial(Repository):
+        async def user_exists(self, user_id: int) -> bool:
+            return True
+
+    with pytest.raises(TypeError):
+        Repository()
+    with pytest.raises(TypeError, match="fetch_page"):
+        Partial()
+    # 두 구현은 인터페이스를 전부 채운다
+    assert not PostgresRepository.__abstractmethods__
+    assert not MemoryRepository.__abstractmethods__
+
+
+async def test_memory_coalesce_default():
+    store = MemoryStore()
+    user_id = store.add_user()
+    store.insert("assets", user_id=user_id, category="HOUSE", loan_amount=None, repay_amount=None)
+    listing = KeysetList("tests.repository.assets", "assets", "user_id", {
+        "id": "id",
+        "created_at": "created_at",
+        "loan_amount": "COALESCE(loan_amount, 0)",
+        "repay_amount": "COALESCE(repay_amount, -1.5)",
+    })
+
+    rows, _ = await MemoryRepository(store).fetch_page(listing, user_id, fields=["loan_amount", "repay_amount"])
+    assert rows == [{"loan_amount": 0.0, "repay_amount": -1.5}]
+
+
+@pytest.mark.parametrize("expr", ["amount::float", "COALESCE(category, 0)", "missing", "COALESCE(missing, 0)"])
+async def test_memory_rejects_unsupported_expression(expr):
+    store = MemoryStore()
+    user_id = store.add_user()
+    listing = KeysetList(f"tests.repository.bad[{expr}]", "assets", "user_id", {
+        "id": "id",
+        "created_at": "created_at",
+        "value": expr,
+    })
+
+    # 고른 fields 에 없어도 목록 정의 전체를 본다
+    with pytest.raises(UnsupportedExpression):
+        await MemoryRepository(store).fetch_page(listing, user_id, fields=["id"])
+
+
+async def test_postgres_versioned_lists_match_list_pages(fresh_db):
+    conn = fresh_db
+    await migrate(conn)
+    await register_type_codecs(conn)
+    await conn.execute("ALTER TABLE assets ALTER COLUMN created_at DROP NOT NULL")
+    user_id = await conn.fetchval("INSERT INTO users (username) VALUES ('u') RETURNING id")
+    other_id = await conn.fetchval("INSERT INTO users (username) VALUES ('other') RETURNING id")
+    await conn.executemany(
+        "INSERT INTO savings (user_id, category, amount, deposit, maturity_date) VALUES ($1, 'DEPOSIT', $2, NULL, $3)",
+        [(user_id, 1000.5, date(2030, 1, 1)), (user_id, 0, None), (other_id, 7, None)],
+    )
+    await conn.execute(
+        "INSERT INTO assets (user_id, category, loan_amount, created_at) VALUES ($1, 'HOUSE', NULL, NULL), ($1, 'JEWELRY', 5, now())",
+        user_id,
+    )
+    await conn.execute("INSERT INTO plans (user_id, title, retirement_year) VALUES ($1, 'P', 2050)", user_id)
+
+    repo = PostgresRepository(conn)
+    version, lists = await repo.versioned_lists(user_id, SNAPSHOT_LISTS)
+    assert version == await repo.data_version(user_id)
+    for key, listing in SNAPSHOT_LISTS.lists.items():
+        rows, _ = await repo.fetch_page(listing, user_id)
+        assert lists[key] == rows, key
+        # 같은 값, 같은 타입 (numeric 은 float, NULL 대신 COALESCE 기본값 등)
+        assert [{k: type(v) for k, v in r.items()} for r in lists[key]] == [
+            {k: type(v) for k, v in r.items()} for r in rows
+        ], key
+    assert [len(lists[k]) for k in ("savings", "investments", "assets", "debts", "plans")] == [2, 0, 2, 0, 1]
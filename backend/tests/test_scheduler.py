@@ -0,0 +1,122 @@
+# backend/tests/test_scheduler.py
+import asyncio
+import time
+import zlib
+from datetime import date
+
+import pytest
+
+from backend import scheduler as scheduler_module
+from backend.cache import ProjectionCache
+from backend.projection import month_key
+from backend.scheduler import ProjectionRefreshScheduler
+
+pytestmark = pytest.mark.anyio
+
+THIS_MONTH = month_key(date.today())
+LAST_MONTH = (THIS_MONTH[0] - 1, 12) if THIS_MONTH[1] == 1 else (THIS_MONTH[0], THIS_MONTH[1] - 1)
+KEYS = [(1, 1), (1, 2), (2, 7), (3, 1), (40, 9)]
+
+
+@pytest.fixture
+def cache(monkeypatch) -> ProjectionCache:
+    cache = ProjectionCache()
+    for user_id, plan_id in KEYS:
+        cache.put(user_id, plan_id, LAST_MONTH, {"plan": plan_id}, cache.ticket(user_id, plan_id))
+    monkeypatch.setattr(scheduler_module, "projection_cache", cache)
+    return cache
+
+
+def test_offset_is_stable_crc32_slot():
+    scheduler = ProjectionRefreshScheduler(window_seconds=7200)
+    for user_id, plan_id in KEYS:
+        offset = scheduler.offset_for(user_id, plan_id)
+        assert offset == 7200 * (zlib.crc32(f"{user_id}:{plan_id}".encode()) % 10_000) / 10_000
+        assert 0 <= offset < 7200
+        assert offset == ProjectionRefreshScheduler(window_seconds=7200).offset_for(user_id, plan_id)
+    # 엔트리마다 슬롯이 흩어진다
+    assert len({scheduler.offset_for(*k) for k in KEYS}) == len(KEYS)
+
+
+async def test_refresh_runs_in_offset_order(cache, monkeypatch):
+    scheduler = ProjectionRefreshScheduler(window_seconds=0.2, concurrency=1)
+    done = []
+
+    async def refresh_one(user_id, plan_id):
+        done.append(((user_id, plan_id), time.monotonic()))
+
+    monkeypatch.setattr(scheduler, "refresh_one", refresh_one)
+    started = time.monotonic()
+    assert await scheduler.refresh_all(THIS_MONTH) == len(KEYS)
+
+    assert [k for k, _ in done] == sorted(KEYS, key=lambda k: scheduler.offset_for(*k))
+    for key, at in done:
+        assert at - started >= scheduler.offset_for(*key) - 0.01
+    assert not scheduler._pending
+
+
+async def test_refresh_skips_entries_filled_by_requests(cache, monkeypatch):
+    scheduler = ProjectionRefreshScheduler(window_seconds=0)
+    done = []
+
+    async def refresh_one(user_id, plan_id):
+        done.append((user_id, plan_id))
+
+    monkeypatch.setattr(scheduler, "refresh_one", refresh_one)
+    cache.put(1, 2, THIS_MONTH, {"plan": 2}, cache.ticket(1, 2))
+    await scheduler.refresh_all(THIS_MONTH)
+    assert sorted(done) == [k for k in KEYS if k != (1, 2)]
+
+
+async def test_rollover_is_detected_once(monkeypatch):
+    scheduler = ProjectionRefreshScheduler(check_interval=0.01)
+    scheduler._month = LAST_MONTH
+    months = []
+
+    async def refresh_all(month):
+        months.append(month)
+        return 0
+
+    monkeypatch.setattr(scheduler, "refresh_all", refresh_all)
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+    assert months == [THIS_MONTH]
+    assert scheduler._month == THIS_MONTH
+
+
+async def test_serving_previous_is_off_by_default(cache):
+    scheduler = ProjectionRefreshScheduler()
+    scheduler._month = LAST_MONTH
+    scheduler._task = asyncio.create_task(asyncio.sleep(0))
+    try:
+        assert not scheduler.serving_previous(1, 1)
+    finally:
+        await scheduler._task
+
+
+async def test_serving_previous_is_limited_to_window(cache, monkeypatch):
+    scheduler = ProjectionRefreshScheduler(window_seconds=3600, serve_previous_seconds=60)
+    scheduler._task = asyncio.create_task(asyncio.sleep(0))
+    try:
+        # 스케줄러가 없으면 인라인 계산
+        assert ProjectionRefreshScheduler(serve_previous_seconds=60).serving_previous(1, 1) is False
+
+        # 감지 전에는 모든 엔트리
+        scheduler._month = LAST_MONTH
+        assert scheduler.serving_previous(1, 1)
+
+        scheduler._month = THIS_MONTH
+        refresh = asyncio.create_task(scheduler.refresh_all(THIS_MONTH))
+        await asyncio.sleep(0.01)
+        assert scheduler.serving_previous(1, 1)
+        assert not scheduler.serving_previous(99, 99)
+
+        # serve_previous_seconds 가 지나면 아직 갱신 전이어도 인라인 계산
+        monkeypatch.setattr(scheduler, "_refresh_started", time.monotonic() - 61)
+        assert not scheduler.serving_previous(1, 1)
+        refresh.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await refresh
+    finally:
+        await scheduler._task
@@ -0,0 +1,87 @@
+# backend/tests/test_series_codec.py
+import json
+import math
+import struct
+
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+from backend.series_codec import SERIES_MAGIC, SERIES_MEDIA_TYPE, SERIES_VERSION, encode, negotiate
+
+
+def decode(frame: bytes) -> dict:
+    """frontend/src/utils/seriesCodec.ts 의 decodeSeries 와 같은 해석 (배열은 list)"""
+    magic, version, itemsize, reserved, header_length = struct.unpack_from("<4sBBHI", frame)
+    assert (magic, version, reserved) == (SERIES_MAGIC, SERIES_VERSION, 0)
+    header = json.loads(frame[12:12 + header_length])
+    body = header["body"]
+    for path, offset, length in header["series"]:
+        assert offset % 8 == 0
+        *parents, leaf = path.split(".")
+        node = body
+        for key in parents:
+            node = node[key]
+        node[leaf] = np.frombuffer(frame, dtype="<f8" if itemsize == 8 else "<f4", count=length, offset=offset).tolist()
+    return body
+
+
+def request(accept: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept, dtype", [
+    (SERIES_MEDIA_TYPE, "f64"),
+    (f"{SERIES_MEDIA_TYPE}; dtype=f32, application/json;q=0.9", "f32"),
+    (f"application/json, {SERIES_MEDIA_TYPE};q=0", None),
+    (f"{SERIES_MEDIA_TYPE}; dtype=f16", None),
+    ("application/json", None),
+    ("*/*", None),
+])
+def test_negotiate(accept, dtype):
+    assert negotiate(request(accept)) == dtype
+
+
+def test_frame_round_trip():
+    content = {
+        "plan": {"title": "P"},
+        "labels": [2025, 2026, 2027],
+        "net_worth": [1.5, -2.25, 1e12 + 0.1],
+        "odd": [1.0],
+        "worst": {"net_worth": [0.1, None]},
+    }
+    frame = encode(content, ("net_worth", "odd", "worst.net_worth", "missing", "plan.title.x"))
+
+    decoded = decode(frame)
+    assert decoded["net_worth"] == content["net_worth"]
+    assert decoded["odd"] == [1.0]
+    assert decoded["worst"]["net_worth"][0] == 0.1
+    assert math.isnan(decoded["worst"]["net_worth"][1])
+    assert decoded["labels"] == [2025, 2026, 2027]
+    assert decoded["plan"] == {"title": "P"}
+    # 입력은 그대로
+    assert content["worst"] == {"net_worth": [0.1, None]}
+
+
+def test_frame_float32():
+    frame = encode({"net_worth": [1.1, 2.2, 3.3]}, ("net_worth",), "f32")
+    assert struct.unpack_from("<B", frame, 5) == (4,)
+    assert decode(frame)["net_worth"] == pytest.approx([1.1, 2.2, 3.3], rel=1e-6)
+
+
+def test_plan_detail_binary_matches_json(client, user):
+    path = f"/api/plans/{user['plan_id']}"
+    as_json = client.get(path, headers=user["headers"])
+    binary = client.get(path, headers={**user["headers"], "Accept": SERIES_MEDIA_TYPE})
+
+    assert binary.status_code == 200
+    assert binary.headers["content-type"].startswith(SERIES_MEDIA_TYPE)
+    assert "Accept" in binary.headers["vary"]
+    # 형식마다 ETag 가 다르다 (같은 URL, 다른 본문)
+    assert binary.headers["etag"] != as_json.headers["etag"]
+
+    decoded = decode(binary.content)
+    expected = as_json.json()
+    assert decoded["net_worth"] == expected["net_worth"]
+    assert decoded["labels"] == expected["labels"]
+    assert set(decoded) == set(expected)
@@ -0,0 +1,63 @@
+# backend/tests/test_statements.py
+import subprocess
+import sys
+
+import pytest
+
+from backend.statements import StatementRegistry
+
+
+@pytest.fixture
+def registry() -> StatementRegistry:
+    return StatementRegistry()
+
+
+def test_register_is_idempotent(registry):
+    stmt = registry.register("things.get", "SELECT 1")
+    assert registry.register("things.get", "SELECT 1") is stmt
+    assert len(registry) == 1
+    assert registry.stats() == {"registered": 1, "warm_failures": 0}
+    with pytest.raises(ValueError):
+        registry.register("things.get", "SELECT 2")
+
+
+def test_partial_update_sql(registry):
+    update = registry.partial_update(
+        "things.update",
+        "things",
+        ("amount", "note"),
+        where=("id", "plan_id IN (SELECT id FROM plans WHERE user_id = {})"),
+        returning="id, amount, note",
+        check="{amount} >= 0",
+    )
+    sql = " ".join(update.statement.sql.split())
+    assert sql == (
+        "UPDATE things "
+        "SET amount = (CASE WHEN $1::boolean THEN $2 ELSE amount END), "
+        "note = (CASE WHEN $3::boolean THEN $4 ELSE note END), updated_at = now() "
+        "WHERE id = $5 AND plan_id IN (SELECT id FROM plans WHERE user_id = $6) "
+        "AND ((CASE WHEN $1::boolean THEN $2 ELSE amount END) >= 0) "
+        "RETURNING id, amount, note"
+    )
+    assert registry.get("things.update") is update.statement
+
+
+def test_partial_update_args(registry):
+    update = registry.partial_update("things.update", "things", ("amount", "note"), where=("id",), returning="*")
+
+    # 보낸 키만 플래그가 참, None 은 NULL 로 갱신, 모르는 키는 무시
+    assert update.args({"note": None, "other": 1}, 7) == [False, None, True, None, 7]
+    assert update.args({"amount": 3.5}, 7) == [True, 3.5, False, None, 7]
+    assert update.changes({"note": None})
+    assert not update.changes({"other": 1})
+
+
+def test_load_registered_has_checked_statements():
+    # 앱을 import 하지 않은 새 프로세스에서 (python -m backend.migrate check 와 같은 조건)
+    code = (
+        "from backend.migrate import CHECKED_STATEMENTS\n"
+        "from backend.statements import load_registered\n"
+        "registry = load_registered()\n"
+        "for name in CHECKED_STATEMENTS: registry.get(name)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
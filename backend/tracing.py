@@ -0,0 +1,170 @@
+# backend/tracing.py
+"""
+쿼리 트레이싱
+
+풀 연결(backend.db.PoolConnection)의 모든 쿼리를 statement 별로 집계한다.
+- 이름: 레지스트리에 등록된 SQL 은 등록 이름 (backend.statements), 그 외에는 SQL 앞부분.
+- statement 별: 호출 수, 에러 수, 반환/변경 행 수, 최근 QUERY_TRACE_WINDOW 번의 시간으로 계산한 p50/p95/p99/max,
+  어느 라우트에서 불렸는지 (라우트별 호출 수).
+- 라우트는 get_db_connection 이 "GET /api/plans/{plan_id}" 형태로 남긴다. 요청 밖(스케줄러/잡)은 "background".
+- SLOW_QUERY_MS 를 넘긴 쿼리는 경고 로그를 남긴다. 파라미터 값은 남기지 않고 타입(과 길이)만 남긴다.
+- /api/debug/queries 에서 총 시간 순으로 볼 수 있다.
+
+asyncpg 의 add_query_logger 는 반환 행 수를 주지 않아서 연결 클래스에서 직접 잰다.
+
+환경 변수
+- SLOW_QUERY_MS: 느린 쿼리 로그 기준 (기본 200ms, 0 이면 끔)
+- QUERY_TRACE_WINDOW: 백분위 계산에 쓰는 최근 실행 수 (기본 1000)
+"""
+import logging
+import os
+import re
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+QUERY_TRACE_WINDOW = int(os.getenv("QUERY_TRACE_WINDOW", "1000"))
+
+# 이름 없는 SQL 이 요청마다 달라도 집계 항목이 끝없이 늘지 않도록
+MAX_TRACKED_STATEMENTS = 500
+OTHER = "(other)"
+BACKGROUND = "background"
+
+_route: ContextVar[str] = ContextVar("trace_route", default=BACKGROUND)
+
+_WS = re.compile(r"\s+")
+
+
+def set_route(label: str) -> None:
+    """지금 요청(태스크)에서 실행하는 쿼리에 붙일 라우트 이름"""
+    _route.set(label)
+
+
+def trace_request(request) -> None:
+    """연결을 빌려 주는 의존성에서 호출: 라우트 경로 템플릿으로 이름을 붙인다"""
+    route = request.scope.get("route")
+    set_route(f"{request.method} {getattr(route, 'path', request.url.path)}")
+
+
+def redact(args: Sequence[Any]) -> list[str]:
+    """로그용 파라미터: 값 대신 타입 (문자열/리스트는 길이까지)"""
+    out = []
+    for a in args:
+        if a is None:
+            out.append("null")
+        elif isinstance(a, (str, bytes, list, tuple)):
+            out.append(f"{type(a).__name__}[{len(a)}]")
+        else:
+            out.append(type(a).__name__)
+    return out
+
+
+def status_rows(status: str) -> int:
+    """execute 의 상태 문자열 ("UPDATE 3", "INSERT 0 1") → 영향받은 행 수"""
+    last = status.rsplit(" ", 1)[-1] if status else ""
+    return int(last) if last.isdigit() else 0
+
+
+class _Trace:
+    def __init__(self, window: int):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.slow = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+        self.routes: Counter[str] = Counter()
+
+    def stats(self, name: str) -> dict[str, Any]:
+        recent = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3)
+
+        return {
+            "name": name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "slow": self.slow,
+            "rows": self.rows,
+            "avg_rows": round(self.rows / self.calls, 2) if self.calls else 0.0,
+            "total_ms": round(self.total_time * 1000, 3),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_time * 1000, 3),
+            "routes": dict(self.routes.most_common(5)),
+        }
+
+
+class QueryTracer:
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, window: int = QUERY_TRACE_WINDOW):
+        self.slow_sec = slow_ms / 1000
+        self.window = window
+        self._names: dict[str, str] = {}
+        self._traces: dict[str, _Trace] = {}
+
+    def name(self, sql: str, name: str) -> None:
+        """SQL 에 이름 붙이기 (Statement 생성 시)"""
+        self._names[sql] = name
+
+    def _label(self, sql: str) -> str:
+        name = self._names.get(sql)
+        if name is None:
+            name = _WS.sub(" ", sql).strip()[:80]
+        return name
+
+    def record(
+        self,
+        sql: str,
+        args: Sequence[Any],
+        elapsed: float,
+        rows: int = 0,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        name = self._label(sql)
+        trace = self._traces.get(name)
+        if trace is None:
+            if len(self._traces) >= MAX_TRACKED_STATEMENTS:
+                name = OTHER
+                trace = self._traces.get(name)
+            if trace is None:
+                trace = self._traces[name] = _Trace(self.window)
+
+        route = _route.get()
+        trace.calls += 1
+        trace.rows += rows
+        trace.total_time += elapsed
+        trace.recent.append(elapsed)
+        if elapsed > trace.max_time:
+            trace.max_time = elapsed
+        trace.routes[route] += 1
+        if error is not None:
+            trace.errors += 1
+
+        if self.slow_sec > 0 and elapsed >= self.slow_sec:
+            trace.slow += 1
+            logger.warning(
+                f"slow query {name} {elapsed * 1000:.1f}ms rows={rows} route={route} "
+                f"params={redact(args)}" + (f" error={type(error).__name__}" if error is not None else "")
+            )
+
+    def stats(self) -> list[dict[str, Any]]:
+        return sorted(
+            (t.stats(name) for name, t in self._traces.items()),
+            key=lambda s: s["total_ms"],
+            reverse=True,
+        )
+
+    def reset(self) -> None:
+        self._traces.clear()
+
+
+# 싱글톤 인스턴스
+query_tracer = QueryTracer()
@@ -668,12 +668,13 @@ async function loadAll(
   setAssetData: (v: Record<string, any>) => void,
   setSelectedAssets: (v: Set<string> | ((prev: Set<string>) => Set<string>)) => void
 ) {
-  const [savingsRows, investmentRows, assetRows, debtRows] = await Promise.all([
-    fetchJson(`${API}/savings/`, API),
-    fetchJson(`${API}/investments/`, API),
-    fetchJson(`${API}/assets/`, API),
-    fetchJson(`${API}/debts/`, API),
-  ])
+  // 목록 4개를 한 번에 (ETag 로 브라우저 캐시가 재검증 — 안 바뀌었으면 304)
+  const {
+    savings: savingsRows,
+    investments: investmentRows,
+    assets: assetRows,
+    debts: debtRows,
+  } = await fetchJson(`${API}/me/snapshot`, API)
 
   const savingsLabelMap: Record<string, string> = {
     DEPOSIT: '일반 예금',
@@ -1,4 +1,5 @@
 import React, { useEffect, useMemo, useRef, useState } from 'react'
+import type { Series } from '../utils/seriesCodec'
 
 type Marker = {
   label: string
@@ -8,7 +9,7 @@ type Marker = {
 
 interface PlanLineChartProps {
   labels: string[]
-  values: number[] // 만원 단위 등 동일 스케일 값
+  values: Series // 만원 단위 등 동일 스케일 값 (바이너리 응답의 Float64Array 그대로도 가능)
   height?: number
   paddingX?: number
   paddingY?: number
@@ -77,7 +78,7 @@ const PlanLineChart: React.FC<PlanLineChartProps> = ({
     const innerWidth = Math.max(0, width - plotLeft - plotRight)
     const innerHeight = Math.max(0, height - paddingY * 2)
     const sliceLabels = labels.slice(0, len)
-    const sliceValues = values.slice(0, len)
+    const sliceValues = Array.from(values).slice(0, len)
 
     // 연도 숫자 추출
     const yearNums = sliceLabels.map((l) => {
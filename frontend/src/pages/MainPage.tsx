@@ -1,6 +1,7 @@
 import { useState, useEffect, useRef } from 'react'
 import type { PlanDetailResponse } from '../types/plan'
 import { fetchPlanDetail } from '../utils/planApi'
+import { isSeries } from '../utils/seriesCodec'
 import StatusBar from '../components/StatusBar'
 import ContentBlueButton from '../components/ContentBlueButton'
 import NavigationBar from '../components/NavigationBar'
@@ -192,8 +193,8 @@ const MainPage = ({ assetData, planId, onPlanClick, onNavigate, API = '/api' }:
   const chartLabels = planDetail?.labels || []
   const chartValues = (() => {
     if (!planDetail || !planDetail.labels) return []
-    const netWorthArray = Array.isArray(planDetail.net_worth) ? planDetail.net_worth : (planDetail?.net_worth !== undefined ? [planDetail.net_worth] : [])
-    const totalAssetsArray = Array.isArray(planDetail?.total_assets) ? planDetail.total_assets : []
+    const netWorthArray = isSeries(planDetail.net_worth) ? Array.from(planDetail.net_worth) : (planDetail?.net_worth !== undefined ? [planDetail.net_worth] : [])
+    const totalAssetsArray = isSeries(planDetail?.total_assets) ? Array.from(planDetail.total_assets) : []
     const source =
       netWorthArray.length > 0 && netWorthArray.some((v) => v !== 0)
         ? netWorthArray
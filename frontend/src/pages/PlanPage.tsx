@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import type { PlanState, PlanDetailResponse } from '../types/plan'
 import { fetchPlanDetail } from '../utils/planApi'
+import { isSeries } from '../utils/seriesCodec'
 import StatusBar from '../components/StatusBar'
 import NavigationBar from '../components/NavigationBar'
 import PlanLineChart from '../components/PlanLineChart'
@@ -42,8 +43,8 @@ const PlanPage = ({ planState, planId, API = '/api', onEditPlan, onBack, onNavig
   const chartLabels = planDetail?.labels || []
   const chartValues = (() => {
     if (!planDetail || !planDetail.labels) return []
-    const netWorthArray = Array.isArray(planDetail.net_worth) ? planDetail.net_worth : (planDetail?.net_worth !== undefined ? [planDetail.net_worth] : [])
-    const totalAssetsArray = Array.isArray(planDetail?.total_assets) ? planDetail.total_assets : []
+    const netWorthArray = isSeries(planDetail.net_worth) ? Array.from(planDetail.net_worth) : (planDetail?.net_worth !== undefined ? [planDetail.net_worth] : [])
+    const totalAssetsArray = isSeries(planDetail?.total_assets) ? Array.from(planDetail.total_assets) : []
     const source =
       netWorthArray.length > 0 && netWorthArray.some((v) => v !== 0)
         ? netWorthArray
@@ -1,4 +1,5 @@
 // src/types/plan.ts
+import type { Series } from '../utils/seriesCodec'
 
 // ===== Goal =====
 export interface PlanGoalData {
@@ -126,13 +127,14 @@ export type PlanDetailResponse = {
   expenses: PlanExpense[]
 
   labels: string[] // summary["labels"]가 문자열 배열이라고 가정
-  net_worth: number[] // 연도별 net_worth 배열
-  net_cash_flow: number[]
-  total_repayment: number[]
-  total_savings: number[]
-  total_investments: number[]
-  total_debts: number[]
-  total_assets: number[]
+  // 연도별 시리즈: JSON 이면 number[], 바이너리 응답(seriesCodec)이면 Float64Array
+  net_worth: Series // 연도별 net_worth 배열
+  net_cash_flow: Series
+  total_repayment: Series
+  total_savings: Series
+  total_investments: Series
+  total_debts: Series
+  total_assets: Series
 
   retirement_year: number
   expected_death_year: number
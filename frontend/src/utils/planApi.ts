@@ -1,15 +1,18 @@
 import type { PlanDetailResponse } from '../types/plan'
 import { ensureToken } from './auth'
+import { SERIES_MEDIA_TYPE, decodeSeries } from './seriesCodec'
 export async function fetchPlanDetail(
   API: string,
   planId: number
-) {
+): Promise<PlanDetailResponse> {
   const token = await ensureToken(API);
 
+  // 시리즈는 바이너리(float64 배열)로 받는다. 서버가 모르면 JSON 으로 온다
   const res = await fetch(`${API}/plans/${planId}`, {
     method: "GET",
     headers: {
       Authorization: `Bearer ${token}`,
+      Accept: `${SERIES_MEDIA_TYPE}, application/json;q=0.9`,
     },
   });
 
@@ -18,6 +21,9 @@ export async function fetchPlanDetail(
     throw new Error(`GET ${API}/plans/${planId} failed (${res.status}) ${text}`);
   }
 
+  if (res.headers.get("content-type")?.startsWith(SERIES_MEDIA_TYPE)) {
+    return decodeSeries<PlanDetailResponse>(await res.arrayBuffer());
+  }
   return res.json();
 }
 
@@ -0,0 +1,61 @@
+// src/utils/seriesCodec.ts
+// 시뮬레이션 시리즈 바이너리 프레임 디코더 (서버: backend/series_codec.py)
+//
+// Accept 에 SERIES_MEDIA_TYPE 을 보내면 서버가 연도별 시리즈를 리틀 엔디안 float 배열로 보낸다.
+// 배열은 8바이트 정렬이라 복사 없이 Float64Array / Float32Array 로 바로 읽는다 (텍스트 → 숫자 파싱 없음).
+//
+// 프레임: [매직 "MCSF"][버전 u8][원소 크기 u8][예약 u16][헤더 길이 u32][헤더 JSON][패딩][시리즈 데이터]
+// 헤더 JSON: { body: 시리즈를 뺀 나머지 응답, series: [[경로, 바이트 오프셋, 원소 수], ...] }
+
+export const SERIES_MEDIA_TYPE = 'application/vnd.moneycoach.series'
+
+// 차트 값: JSON 이면 number[], 바이너리면 typed array
+export type Series = number[] | Float64Array | Float32Array
+
+const MAGIC = 'MCSF'
+const VERSION = 1
+const PREAMBLE_SIZE = 12
+
+// 브라우저 대부분이 리틀 엔디안: 그대로 뷰를 만들고, 아니면 DataView 로 읽어서 복사
+const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1
+
+export function isSeries(value: unknown): value is Series {
+  return Array.isArray(value) || value instanceof Float64Array || value instanceof Float32Array
+}
+
+function readArray(buffer: ArrayBuffer, size: number, offset: number, length: number): Float64Array | Float32Array {
+  if (LITTLE_ENDIAN) {
+    return size === 8 ? new Float64Array(buffer, offset, length) : new Float32Array(buffer, offset, length)
+  }
+  const view = new DataView(buffer, offset, length * size)
+  const out = size === 8 ? new Float64Array(length) : new Float32Array(length)
+  for (let i = 0; i < length; i++) {
+    out[i] = size === 8 ? view.getFloat64(i * 8, true) : view.getFloat32(i * 4, true)
+  }
+  return out
+}
+
+export function decodeSeries<T = Record<string, unknown>>(buffer: ArrayBuffer): T {
+  const view = new DataView(buffer)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4))
+  const version = view.getUint8(4)
+  if (magic !== MAGIC || version !== VERSION) {
+    throw new Error(`unsupported series frame (${magic} v${version})`)
+  }
+  const size = view.getUint8(5)
+  const headerLength = view.getUint32(8, true)
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_SIZE, headerLength))) as {
+    body: Record<string, any>
+    series: [string, number, number][]
+  }
+
+  const body = header.body
+  for (const [path, offset, length] of header.series) {
+    const keys = path.split('.')
+    const leaf = keys.pop() as string
+    let node = body
+    for (const key of keys) node = node[key]
+    node[leaf] = readArray(buffer, size, offset, length)
+  }
+  return body as T
+}